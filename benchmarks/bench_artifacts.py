@@ -0,0 +1,42 @@
+import itertools
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import analysis
+from src import aws_utils as aws
+
+FIGURE_ROWS = 20_000
+
+@pytest.fixture
+def s3_config(config, monkeypatch):
+    """The aws configuration against a moto S3 bucket, re-uploading unchanged files."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        aws_config = {**config["aws"], "bucket_name": "benchmark-bucket", "skip_unchanged": False}
+        boto3.client("s3").create_bucket(Bucket=aws_config["bucket_name"])
+        yield aws_config
+
+@pytest.fixture
+def artifacts(features, tmp_path):
+    """Run directory with the enriched dataset as CSV and a few figures."""
+    features.to_csv(tmp_path / "enriched_clouds.csv", index=False)
+    (tmp_path / "figures").mkdir()
+    for i in range(8):
+        (tmp_path / "figures" / f"figure_{i}.png").write_bytes(b"png" * 50_000)
+    return tmp_path
+
+def bench_save_figures(measure, dataset, config, tmp_path):
+    """Render the EDA figures of a sample of the dataset."""
+    sample = dataset.sample(min(FIGURE_ROWS, len(dataset)), random_state=0)
+    paths = measure(analysis.save_figures, sample, tmp_path / "figures", config["analysis"]["n_workers"],
+                    rows=len(sample), rounds=1)
+    assert paths
+
+def bench_upload_artifacts(measure, artifacts, s3_config, features):
+    """Upload a run directory to the S3 stand-in."""
+    timestamps = itertools.count()
+    measure(lambda: aws.upload_artifacts(artifacts, s3_config, next(timestamps)), rows=len(features), rounds=3)
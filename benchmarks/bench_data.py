@@ -0,0 +1,22 @@
+from benchmarks.synthetic import COLUMNS
+from src import create_dataset as cd
+from src import generate_features as gf
+from src import validate_data as vd
+
+def bench_create_dataset(measure, raw_data, n_rows, config):
+    """Parse the raw file into the dataset."""
+    path, class_indices = raw_data
+    dataset = measure(cd.create_dataset, path, class_indices, COLUMNS, config["create_dataset"]["chunk_size"],
+                      rows=n_rows)
+    assert len(dataset) == n_rows
+
+def bench_generate_features(measure, dataset, config):
+    """Add the configured features to the dataset."""
+    features = measure(gf.generate_features, dataset, config["generate_features"], rows=len(dataset))
+    assert set(config["train_model"]["selected_features"]) <= set(features.columns)
+
+def bench_validate_data(measure, dataset, config):
+    """Check the dataset for the inputs of the configured features."""
+    plan = gf.compile_feature_plan(config["generate_features"], list(dataset.columns))
+    report = measure(vd.validate_for_features, dataset, plan, rows=len(dataset))
+    assert report["passed"]
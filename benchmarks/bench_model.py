@@ -0,0 +1,36 @@
+from src import evaluate_performance as ep
+from src import score_model as sm
+from src import train_model as tm
+
+def bench_train_model(measure, split, config):
+    """Fit the random forest with the configured hyperparameters."""
+    X_train, _, y_train, _ = split
+    train_config = config["train_model"]
+    measure(tm.train_model, X_train, y_train, train_config["selected_features"], n_jobs=train_config.get("n_jobs"),
+            rows=len(X_train), rounds=3, **train_config["hyperparameters"])
+
+def bench_score_model(measure, model, split, config):
+    """Score the test split in batches."""
+    _, X_test, _, y_test = split
+    scores = measure(sm.score_model, X_test, y_test, model, config["train_model"]["selected_features"],
+                     config["score_model"]["threshold"], config["score_model"].get("batch_size"), rows=len(X_test))
+    assert len(scores) == len(X_test)
+
+def bench_evaluate_performance(measure, scores, config):
+    """Compute the configured metrics."""
+    measure(ep.evaluate_performance, scores, config["evaluate_performance"], rows=len(scores))
+
+def bench_bootstrap_metrics(measure, scores, config):
+    """Compute bootstrap confidence intervals of the metrics."""
+    measure(ep.bootstrap_metrics, scores["true_labels"], scores["predicted_probabilities"],
+            n_resamples=config["bootstrap_evaluation"]["n_resamples"], random_state=0, rows=len(scores), rounds=3)
+
+def bench_train_model_out_of_core(measure, features, config, tmp_path):
+    """Fit the random forest out of core from the enriched dataset on disk."""
+    train_config = config["train_model"]
+    out_of_core_config = train_config["out_of_core"]
+    features.to_csv(tmp_path / "enriched_clouds.csv", index=False)
+    measure(tm.train_model_out_of_core, [tmp_path / "enriched_clouds.csv"], train_config["selected_features"],
+            trees_per_batch=out_of_core_config["trees_per_batch"], sample_rows=out_of_core_config["sample_rows"],
+            chunk_size=out_of_core_config["chunk_size"], holdout_path=tmp_path / "holdout.csv",
+            n_jobs=train_config.get("n_jobs"), rows=len(features), rounds=3, **train_config["hyperparameters"])
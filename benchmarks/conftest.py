@@ -0,0 +1,99 @@
+import logging
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+import yaml
+
+from benchmarks.synthetic import generate_clouds, write_clouds_data
+from src import generate_features as gf
+from src import score_model as sm
+from src import train_model as tm
+
+# Keep stage logging out of the timings
+logging.getLogger("src").setLevel(logging.WARNING)
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "config" / "config.yaml"
+
+def pytest_addoption(parser):
+    parser.addoption("--rows", type=int, default=int(os.environ.get("BENCH_ROWS", 100_000)),
+                     help="Rows of synthetic cloud data (default 100000, or $BENCH_ROWS)")
+    parser.addoption("--skip-memory", action="store_true",
+                     help="Do not run each benchmark once more under tracemalloc to record its peak memory")
+
+@pytest.fixture(scope="session")
+def config():
+    """The pipeline configuration."""
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+@pytest.fixture(scope="session")
+def n_rows(request):
+    """Number of synthetic rows, from ``--rows``."""
+    return request.config.getoption("--rows")
+
+@pytest.fixture(scope="session")
+def raw_data(n_rows, tmp_path_factory):
+    """Raw file in the cloud.data layout and its class indices."""
+    path = tmp_path_factory.mktemp("raw") / "clouds.data"
+    return path, write_clouds_data(path, n_rows)
+
+@pytest.fixture(scope="session")
+def dataset(n_rows):
+    """Dataset as returned by create_dataset."""
+    return generate_clouds(n_rows)
+
+@pytest.fixture(scope="session")
+def features(dataset, config):
+    """Dataset with the configured features."""
+    return gf.generate_features(dataset, config["generate_features"])
+
+@pytest.fixture(scope="session")
+def split(features, config):
+    """X_train, X_test, y_train and y_test of the features."""
+    return tm.split_data(features.drop(columns="class"), features["class"], config["split_data"]["test_size"])
+
+@pytest.fixture(scope="session")
+def model(split, config):
+    """Model trained with the configured hyperparameters."""
+    X_train, _, y_train, _ = split
+    train_config = config["train_model"]
+    return tm.train_model(X_train, y_train, train_config["selected_features"], n_jobs=train_config.get("n_jobs"),
+                          **train_config["hyperparameters"])
+
+@pytest.fixture(scope="session")
+def scores(model, split, config):
+    """Scores of the model on the test split."""
+    _, X_test, _, y_test = split
+    return sm.score_model(X_test, y_test, model, config["train_model"]["selected_features"])
+
+def _peak_memory(func, args, kwargs) -> int:
+    """Return the peak bytes allocated by Python and NumPy during one call."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@pytest.fixture
+def measure(benchmark, request):
+    """Benchmark a call and record its throughput and peak memory in the benchmark's extra info.
+
+    Returns a function ``measure(func, *args, rows, rounds=None, **kwargs)``; with
+    ``rounds`` the call is timed exactly that many times, for stages too slow
+    for pytest-benchmark's automatic calibration.
+    """
+    def run(func, *args, rows, rounds=None, **kwargs):
+        if not request.config.getoption("--skip-memory"):
+            benchmark.extra_info["peak_memory_mb"] = round(_peak_memory(func, args, kwargs) / 1e6, 2)
+        if rounds:
+            result = benchmark.pedantic(func, args, kwargs, rounds=rounds, iterations=1)
+        else:
+            result = benchmark(func, *args, **kwargs)
+        benchmark.extra_info["rows"] = rows
+        if benchmark.stats:
+            benchmark.extra_info["rows_per_s"] = round(rows / benchmark.stats.stats.mean)
+        return result
+    return run
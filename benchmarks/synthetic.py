@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "visible_mean",
+    "visible_max",
+    "visible_min",
+    "visible_mean_distribution",
+    "visible_contrast",
+    "visible_entropy",
+    "visible_second_angular_momentum",
+    "IR_mean",
+    "IR_max",
+    "IR_min",
+]
+HEADER_LINES = 53
+GAP_LINES = 5
+
+def _class_values(rng: np.random.Generator, n_rows: int, label: int) -> np.ndarray:
+    """Draw ``n_rows`` rows of one class; the two classes differ in brightness and texture."""
+    shift = 20.0 * label
+    visible_min = rng.uniform(0, 60, n_rows) + shift
+    visible_max = visible_min + rng.uniform(20, 150, n_rows)
+    visible_mean = visible_min + (visible_max - visible_min) * rng.uniform(0.2, 0.8, n_rows)
+    ir_min = rng.uniform(100, 180, n_rows) - shift
+    ir_max = ir_min + rng.uniform(10, 80, n_rows)
+    ir_mean = ir_min + (ir_max - ir_min) * rng.uniform(0.2, 0.8, n_rows)
+    return np.column_stack([
+        visible_mean,
+        visible_max,
+        visible_min,
+        rng.gamma(2.0, 2.0 + label, n_rows),
+        rng.gamma(3.0, 40.0 + 30.0 * label, n_rows),
+        rng.uniform(0.5, 2.5, n_rows) + 0.4 * label,
+        rng.uniform(1, 60, n_rows),
+        ir_mean,
+        ir_max,
+        ir_min,
+    ])
+
+def generate_clouds(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a clouds dataset as created by create_dataset, half of the rows in each class.
+
+    Args:
+        n_rows (int): Total number of rows.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: The ``COLUMNS`` and a ``class`` column.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = (n_rows // 2, n_rows - n_rows // 2)
+    frames = []
+    for label, size in enumerate(sizes):
+        frame = pd.DataFrame(_class_values(rng, size, label), columns=COLUMNS)
+        frame["class"] = label
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def write_clouds_data(path: Path, n_rows: int, seed: int = 0, chunk_rows: int = 500_000) -> list:
+    """Write a raw file with the header, class blocks and separator lines of cloud.data.
+
+    Rows are generated and written ``chunk_rows`` at a time, so files of
+    millions of rows are written in bounded memory.
+
+    Args:
+        path (Path): File to write.
+        n_rows (int): Total number of rows.
+        seed (int): Seed of the random generator.
+        chunk_rows (int): Rows generated at a time.
+
+    Returns:
+        list: The ``create_dataset.class_indices`` of the written file.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = (n_rows // 2, n_rows - n_rows // 2)
+    class_indices = []
+    line = 0
+    with open(path, "w") as f:
+        for i in range(HEADER_LINES):
+            f.write(f"header {i}\n")
+        line += HEADER_LINES
+        for label, size in enumerate(sizes):
+            class_indices.append([line, line + size])
+            for start in range(0, size, chunk_rows):
+                np.savetxt(f, _class_values(rng, min(chunk_rows, size - start), label), fmt="%.3f")
+            line += size
+            for i in range(GAP_LINES):
+                f.write(f"separator {i}\n")
+            line += GAP_LINES
+    return class_indices
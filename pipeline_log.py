@@ -1,19 +1,34 @@
 import argparse
 import datetime
+import json
 import logging.config
 from pathlib import Path
 import os
 import shutil
+import time
 import yaml
 
-import src.acquire_data as ad
-import src.analysis as eda
-import src.create_dataset as cd
-import src.generate_features as gf
-import src.train_model as tm
-import src.score_model as sm
-import src.evaluate_performance as ep
-import src.aws_utils as aws
+import src.stage_cache as sc
+import src.profiling as prof
+from src.dag import Stage, run_dag, subgraph
+from src.lazy_import import import_times, lazy_import
+
+# Stage modules are imported on first use, so each command only imports the libraries
+# its stages need (e.g. the upload command never imports scikit-learn or matplotlib)
+ad = lazy_import("src.acquire_data")
+eda = lazy_import("src.analysis")
+cd = lazy_import("src.create_dataset")
+gf = lazy_import("src.generate_features")
+vd = lazy_import("src.validate_data")
+inc = lazy_import("src.incremental")
+tm = lazy_import("src.train_model")
+tune = lazy_import("src.tune_model")
+sm = lazy_import("src.score_model")
+ep = lazy_import("src.evaluate_performance")
+rp = lazy_import("src.reporting")
+aws = lazy_import("src.aws_utils")
+store = lazy_import("src.artifact_store")
+cmp = lazy_import("src.compare_models")
 
 def setup_logging():
     """Set up logging configuration."""
@@ -29,95 +44,625 @@ def setup_logging():
     logging.info("New logging session started")
     logging.info("========================================")
 
-def main():
-    """Main function to run the data processing pipeline."""
-    # Set up logging
-    setup_logging()
+def cache_lookup(cache_config: dict, stage: str, config_section, inputs: list, artifacts: Path) -> tuple:
+    """Compute a stage's cache key and restore its outputs when the key is cached.
+
+    Args:
+        cache_config (dict): The ``run_config.cache`` section.
+        stage (str): Name of the stage.
+        config_section: Config values that affect the stage's output.
+        inputs (list): Input files or upstream stage keys.
+        artifacts (Path): Run directory to restore cached outputs into.
+
+    Returns:
+        tuple: The stage key (None if caching is disabled) and whether it was a cache hit.
+    """
+    if not cache_config.get("enabled", False):
+        return None, False
+    key = sc.stage_key(stage, config_section, inputs)
+    if stage not in cache_config.get("stages", []):
+        return key, False
+    hit = sc.restore(cache_config.get("dir", ".cache/stages"), stage, key, artifacts)
+    if hit:
+        logging.getLogger("pipeline_logger").info("Stage %s restored from cache; skipping.", stage)
+    return key, hit
+
+def cache_store(cache_config: dict, stage: str, key: str, outputs: list, artifacts: Path) -> None:
+    """Store a stage's outputs in the stage cache if caching is enabled for the stage."""
+    if key is not None and stage in cache_config.get("stages", []):
+        sc.store(cache_config.get("dir", ".cache/stages"), stage, key, outputs, artifacts)
+
+def build_stages(config: dict, artifacts: Path, report: dict, cprofile_dir: Path = None,
+                 stages: list = None) -> list:
+    """Build the stage graph of the pipeline.
+
+    Each stage is profiled into ``report`` and reuses cached outputs when the
+    stage cache is enabled. Writing the dataset and the enriched dataset are
+    separate stages so that they overlap with the stages that use the data,
+    and the EDA figures are rendered alongside the train, score and evaluate chain.
+
+    Args:
+        config (dict): The pipeline configuration.
+        artifacts (Path): Run directory for the artifacts.
+        report (dict): Run profile from :func:`src.profiling.new_report`.
+        cprofile_dir (Path): Directory for per-stage cProfile dumps; ``None`` disables cProfile.
+        stages (list): Names of the stages to run; the results of the stages they depend on are
+            loaded from the run directory instead. ``None`` runs every stage.
+
+    Returns:
+        list[Stage]: The stages of the pipeline.
+    """
     logger = logging.getLogger("pipeline_logger")
+    run_config = config.get("run_config", {})
+    artifact_format = run_config.get("artifact_format", "csv")
+    compression = run_config.get("artifact_compression")
 
-    try:
-        parser = argparse.ArgumentParser(
-            description="Acquire, clean, and create features from clouds data"
-        )
-        parser.add_argument(
-            "--config", default="config/config.yaml", help="Path to configuration file"
-        )
-        args = parser.parse_args()
+    # Stage cache settings; keys are computed for every stage so they can chain
+    cache_config = run_config.get("cache", {})
+    artifact_settings = {"format": artifact_format, "compression": compression}
+    selected_features = config["train_model"]["selected_features"]
+    score_config = config.get("score_model", {})
+    tune_config = config.get("tune_model", {})
+    bootstrap_config = config.get("bootstrap_evaluation", {})
+    split_config = config.get("split_data") or {}
+    incremental_config = config.get("incremental_ingestion", {})
+    incremental = incremental_config.get("enabled", False)
+    incremental_dir = Path(incremental_config.get("store_dir", ".cache/incremental"))
+    fetch_appended = incremental and incremental_config.get("fetch", "full") == "range"
+    memmap_split = split_config.get("mode", "frames") == "memmap"
+    out_of_core_config = config["train_model"].get("out_of_core", {})
+    out_of_core = out_of_core_config.get("enabled", False)
+    compare_config = config.get("compare_models", {})
+    reporting_config = config.get("reporting", {})
+    report_formats = reporting_config.get("formats", ["png"])
+    validate_config = config.get("validate_data", {})
+    validate = validate_config.get("enabled", True)
+    n_eda_workers = config.get("analysis", {}).get("n_workers", 1)
 
-        # Load configuration file for parameters and run config
-        with open(args.config, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
+    dataset_path = store.artifact_path(artifacts, "clouds", artifact_format)
+    features_path = store.artifact_path(artifacts, "enriched_clouds", artifact_format)
+    figures = artifacts / "figures"
+    model_path = artifacts / "trained_model_object.pkl"
+    split_dir = artifacts / "split"
+    holdout_path = artifacts / "holdout.csv"
+    # Out-of-core scoring appends the scores of each batch to a CSV file
+    scores_path = store.artifact_path(artifacts, "scores", "csv" if out_of_core else artifact_format)
 
-        run_config = config.get("run_config", {})
+    def test_split_files():
+        # Files holding the test rows saved by train_model
+        if out_of_core:
+            return [holdout_path]
+        if memmap_split:
+            return [split_dir / name for name in ("features.npy", "labels.npy", "rows.npy", "split.json")]
+        return [store.artifact_path(artifacts, name, artifact_format) for name in ("X_test", "y_test")]
 
-        # Set up output directory for saving artifacts
-        now = int(datetime.datetime.now().timestamp())
-        artifacts = Path(run_config.get("output", "runs")) / str(now)
-        artifacts.mkdir(parents=True)
+    def read_test_split():
+        # Out-of-core scoring reads the holdout rows from disk itself
+        if out_of_core:
+            return None, None
+        if memmap_split:
+            _, X_test, _, y_test = tm.open_split(split_dir)
+            return X_test, y_test
+        X_path, y_path = test_split_files()
+        return store.read_table(X_path, selected_features), store.read_table(y_path)["class"]
 
-        # Save config file to artifacts directory for traceability
-        with (artifacts / "config.yaml").open("w") as f:
-            yaml.dump(config, f)
-        logger.info("Configuration file saved to artifacts directory.")
+    def incremental_key(stage, config_section, manifest):
+        # Downstream cache keys chain from the contents of the incremental store
+        if not cache_config.get("enabled", False):
+            return None
+        return sc.stage_key(stage, [config_section, artifact_settings], [inc.store_fingerprint(manifest)])
 
+    def acquire(inputs):
         # Acquire data from online repository and save to disk
-        ad.acquire_data(run_config["data_source"], artifacts / "clouds.data")
+        with prof.profile_stage(report, "acquire_data", cprofile_dir) as record:
+            key, hit = cache_lookup(cache_config, "acquire_data", config.get("data_acquisition"),
+                                    [run_config["data_source"]], artifacts)
+            acquisition_config = config.get("data_acquisition", {})
+            raw_copy = incremental_dir / "clouds.data"
+            appended = False
+            if not hit and fetch_appended and raw_copy.exists():
+                # Fetch only what an append-only source gained since the last run
+                appended = ad.download_appended(run_config["data_source"], raw_copy, artifacts / "clouds.data",
+                                                incremental_config.get("overlap_bytes", 1 << 16),
+                                                acquisition_config.get("chunk_size", 1 << 20))
+            if not hit and not appended:
+                ad.acquire_data(run_config["data_source"], artifacts / "clouds.data",
+                                attempts=acquisition_config.get("retries", 4),
+                                wait=acquisition_config.get("initial_wait", 3),
+                                wait_multiple=acquisition_config.get("wait_multiple", 2),
+                                stream=acquisition_config.get("stream", False),
+                                chunk_size=acquisition_config.get("chunk_size", 1 << 20),
+                                checksum=acquisition_config.get("checksum"))
+            if not hit:
+                cache_store(cache_config, "acquire_data", key, [artifacts / "clouds.data"], artifacts)
+            if incremental:
+                incremental_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(artifacts / "clouds.data", raw_copy)
+            record["cached"] = hit
+            record["bytes_out"] = prof.path_size(artifacts / "clouds.data")
         logger.info("Data acquisition completed successfully.")
+        return {"key": key}
 
+    def create_dataset(inputs):
         # Create structured dataset from raw data
-        data = cd.create_dataset(
-            artifacts / "clouds.data",
-            config["create_dataset"]["class_indices"],
-            config["create_dataset"]["columns"])
-        cd.save_dataset(data, artifacts / "clouds.csv")
+        with prof.profile_stage(report, "create_dataset", cprofile_dir) as record:
+            record["bytes_in"] = prof.path_size(artifacts / "clouds.data")
+            if incremental:
+                # Parse only the new or changed raw rows into the store, then read the whole store
+                manifest = inc.append_dataset(artifacts / "clouds.data", incremental_dir,
+                                              config["create_dataset"]["class_indices"],
+                                              config["create_dataset"]["columns"],
+                                              incremental_config.get("format", "parquet"), compression,
+                                              config["create_dataset"].get("chunk_size", 10000))
+                data = inc.read_store(incremental_dir, "dataset")
+                key = incremental_key("create_dataset", config["create_dataset"], manifest)
+                record["cached"] = False
+                record["rows_out"], record["bytes_out"] = prof.frame_size(data)
+                return {"key": key, "hit": False, "data": data, "manifest": manifest}
+            key, hit = cache_lookup(cache_config, "create_dataset",
+                                    [config["create_dataset"], artifact_settings],
+                                    [artifacts / "clouds.data"], artifacts)
+            if hit:
+                data = cd.read_dataset(dataset_path)
+            else:
+                data = cd.create_dataset(
+                    artifacts / "clouds.data",
+                    config["create_dataset"]["class_indices"],
+                    config["create_dataset"]["columns"],
+                    config["create_dataset"].get("chunk_size", 10000))
+            record["cached"] = hit
+            record["rows_out"], record["bytes_out"] = prof.frame_size(data)
         logger.info("Dataset creation completed successfully.")
+        return {"key": key, "hit": hit, "data": data}
+
+    def save_dataset(inputs):
+        dataset = inputs["create_dataset"]
+        if incremental:
+            # The partitions live in the store; the run keeps the manifest that lists them
+            with open(artifacts / "dataset_manifest.json", "w") as f:
+                json.dump(dataset["manifest"], f, indent=2)
+            return None
+        if dataset["hit"]:
+            return None
+        with prof.profile_stage(report, "save_dataset", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(dataset["data"])
+            cd.save_dataset(dataset["data"], dataset_path, compression)
+            cache_store(cache_config, "create_dataset", dataset["key"], [dataset_path], artifacts)
+            record["bytes_out"] = prof.path_size(dataset_path)
+        return None
 
-        # Generate features and save to disk
-        features = gf.generate_features(data, config["generate_features"])
-        gf.save_enriched_dataset(features, artifacts / "enriched_clouds.csv")
+    def validate_data(inputs):
+        # Check every input of the feature plan in one pass before any feature is computed
+        if not validate:
+            return None
+        data = inputs["create_dataset"]["data"]
+        with prof.profile_stage(report, "validate_data", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(data)
+            plan = gf.compile_feature_plan(config["generate_features"], list(data.columns))
+            quality = vd.validate_for_features(data, plan, validate_config.get("ranges"))
+            vd.save_report(quality, artifacts / "data_quality.json")
+            record["bytes_out"] = prof.path_size(artifacts / "data_quality.json")
+        vd.enforce(quality, validate_config.get("on_error", "raise"))
+        logger.info("Data validation completed successfully.")
+        return {"passed": quality["passed"]}
+
+    def generate_features(inputs):
+        # Generate features
+        data = inputs["create_dataset"]["data"]
+        # Validated data does not need to be scanned for zero means and missing values again
+        checked = (inputs["validate_data"] or {}).get("passed", False)
+        with prof.profile_stage(report, "generate_features", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(data)
+            if incremental:
+                # Featurize only the partitions added since the last run
+                manifest = inc.append_features(incremental_dir, config["generate_features"], compression)
+                features = inc.read_store(incremental_dir, "features")
+                key = incremental_key("generate_features", config["generate_features"], manifest)
+                record["cached"] = False
+                record["rows_out"], record["bytes_out"] = prof.frame_size(features)
+                return {"key": key, "hit": False, "data": features, "manifest": manifest}
+            key, hit = cache_lookup(cache_config, "generate_features",
+                                    [config["generate_features"], artifact_settings],
+                                    [inputs["create_dataset"]["key"]], artifacts)
+            if hit:
+                features = gf.read_enriched_dataset(features_path)
+            else:
+                features = gf.generate_features(data, config["generate_features"], checked)
+            record["cached"] = hit
+            record["rows_out"], record["bytes_out"] = prof.frame_size(features)
         logger.info("Feature generation completed successfully.")
+        return {"key": key, "hit": hit, "data": features}
+
+    def save_features(inputs):
+        features = inputs["generate_features"]
+        if features["hit"] or incremental:
+            return None
+        with prof.profile_stage(report, "save_features", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(features["data"])
+            gf.save_enriched_dataset(features["data"], features_path, compression)
+            cache_store(cache_config, "generate_features", features["key"], [features_path], artifacts)
+            record["bytes_out"] = prof.path_size(features_path)
+        return None
 
+    def analysis(inputs):
         # Perform exploratory data analysis and save figures
-        figures = artifacts / "figures"
-        figures.mkdir()
-        eda.save_figures(features, figures)
+        features = inputs["generate_features"]["data"]
+        with prof.profile_stage(report, "analysis", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(features)
+            key, hit = cache_lookup(cache_config, "analysis", config.get("matplotlib_defaults"),
+                                    [inputs["generate_features"]["key"]], artifacts)
+            if not hit:
+                figures.mkdir()
+                eda.save_figures(features, figures, n_eda_workers)
+                cache_store(cache_config, "analysis", key, [figures], artifacts)
+            record["cached"] = hit
+            record["bytes_out"] = prof.path_size(figures)
         logger.info("Exploratory data analysis completed successfully.")
+        return None
+
+    def save_feature_plan(data):
+        # Save the feature transforms the model needs next to it for serving
+        feature_plan = gf.prune_feature_plan(
+            gf.compile_feature_plan(config["generate_features"], list(data.columns)), selected_features)
+        gf.save_feature_plan(feature_plan, tm.feature_plan_path(model_path))
 
-        # Split data into training and testing sets
-        X_train, X_test, y_train, y_test = tm.split_data(features, features["class"])
+    def train_model(inputs):
+        # Split data, train model and save the trained model with the train and test datasets
+        features = inputs["generate_features"]["data"]
+        with prof.profile_stage(report, "train_model", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(features)
+            key, hit = cache_lookup(cache_config, "train_model",
+                                    [split_config, config["train_model"], tune_config,
+                                     artifact_settings],
+                                    [inputs["generate_features"]["key"]], artifacts)
+            if hit:
+                tmo = tm.load_model(model_path)
+                X_test, y_test = read_test_split()
+            elif out_of_core:
+                # Stream the enriched dataset from disk and fit the forest on bootstrap samples of it
+                if incremental:
+                    data_paths = [incremental_dir / partition["features"]
+                                  for partition in inputs["generate_features"]["manifest"]["partitions"]
+                                  if partition["features"]]
+                else:
+                    data_paths = [features_path]
+                if tune_config.get("enabled", False):
+                    logger.warning("Hyperparameter tuning needs the training set in memory; skipped out of core.")
+                tmo = tm.train_model_out_of_core(
+                    data_paths, selected_features, "class",
+                    trees_per_batch=out_of_core_config.get("trees_per_batch", 2),
+                    sample_rows=out_of_core_config.get("sample_rows", 100000),
+                    chunk_size=out_of_core_config.get("chunk_size", 100000),
+                    test_size=split_config.get("test_size", 0.4),
+                    random_state=split_config.get("random_state"),
+                    holdout_path=holdout_path,
+                    n_jobs=config["train_model"].get("n_jobs"),
+                    **config["train_model"].get("hyperparameters", {}))
+                tm.save_model(tmo, model_path, config["train_model"].get("model_compress", 0), selected_features)
+                save_feature_plan(inputs["create_dataset"]["data"])
+                cache_store(cache_config, "train_model", key,
+                            [model_path, tm.metadata_path(model_path), tm.feature_plan_path(model_path),
+                             holdout_path],
+                            artifacts)
+                X_test = y_test = None
+            else:
+                # Split data into training and testing sets
+                if memmap_split:
+                    # One memory-mapped file; train and test are zero-copy views of it
+                    tm.write_split(features[selected_features], features["class"], split_dir,
+                                   split_config.get("test_size", 0.4), split_config.get("random_state"))
+                    X_train, X_test, y_train, y_test = tm.open_split(split_dir)
+                    split_outputs = [split_dir]
+                else:
+                    X_train, X_test, y_train, y_test = tm.split_data(features, features["class"],
+                                                                     split_config.get("test_size", 0.4))
+                    split_outputs = [store.artifact_path(artifacts, name, artifact_format)
+                                     for name in ("X_train", "X_test", "y_train", "y_test")]
 
-        # Train model and save trained model
-        selected_features = config["train_model"]["selected_features"]
-        tmo = tm.train_model(X_train=X_train, y_train=y_train, initial_features=selected_features)
-        tm.save_model(tmo, artifacts / "trained_model_object.pkl")
-        # Save the train and test datasets
-        tm.save_data(X_train, X_test, y_train, y_test, artifacts)
+                # Search hyperparameters on the training set and train with the best ones
+                hyperparameters = dict(config["train_model"].get("hyperparameters", {}))
+                if tune_config.get("enabled", False):
+                    with prof.profile_stage(report, "tune_model", cprofile_dir) as tune_record:
+                        tune_record["rows_in"], tune_record["bytes_in"] = prof.frame_size(X_train)
+                        searcher = tune.tune_from_config(X_train, y_train, config, artifacts)
+                        tune.save_leaderboard(tune.leaderboard(searcher), artifacts / "tuning_leaderboard.csv")
+                    hyperparameters.update(searcher.best_params_)
+                    logger.info("Hyperparameter tuning completed successfully.")
+
+                # Train model and save trained model
+                tmo = tm.train_model(X_train=X_train, y_train=y_train, initial_features=selected_features,
+                                     n_jobs=config["train_model"].get("n_jobs"), **hyperparameters)
+                tm.save_model(tmo, model_path, config["train_model"].get("model_compress", 0), selected_features)
+                save_feature_plan(inputs["create_dataset"]["data"])
+                # Save the train and test datasets
+                if not memmap_split:
+                    tm.save_data(X_train, X_test, y_train, y_test, artifacts, artifact_format, compression)
+                tuning_outputs = [artifacts / "tuning_leaderboard.csv"] if tune_config.get("enabled", False) else []
+                cache_store(cache_config, "train_model", key,
+                            [model_path, tm.metadata_path(model_path), tm.feature_plan_path(model_path)] +
+                            tuning_outputs + split_outputs,
+                            artifacts)
+            record["cached"] = hit
+            record["bytes_out"] = prof.path_size(model_path)
         logger.info("Model training completed successfully.")
+        return {"key": key, "model": tmo, "X_test": X_test, "y_test": y_test}
 
+    def score_model(inputs):
         # Score model on test set and save scores
-        scores = sm.score_model(X_test, y_test, tmo, selected_features)
-        #scores = sm.score_model(features, tmo, config["train_model"]["selected_features"])
-        sm.save_scores(scores, artifacts / "scores.csv")
+        trained = inputs["train_model"]
+        with prof.profile_stage(report, "score_model", cprofile_dir) as record:
+            if out_of_core:
+                record["bytes_in"] = prof.path_size(holdout_path)
+            else:
+                record["rows_in"], record["bytes_in"] = prof.frame_size(trained["X_test"])
+            key, hit = cache_lookup(cache_config, "score_model", [score_config, artifact_settings],
+                                    [trained["key"]], artifacts)
+            if hit:
+                scores = sm.read_scores(scores_path)
+            elif out_of_core:
+                # Score the holdout rows batch by batch from disk
+                sm.score_file(holdout_path, scores_path, trained["model"], selected_features,
+                              threshold=score_config.get("threshold", 0.5),
+                              batch_size=score_config.get("batch_size") or 100000)
+                scores = sm.read_scores(scores_path)
+                cache_store(cache_config, "score_model", key, [scores_path], artifacts)
+            else:
+                scores = sm.score_model(trained["X_test"], trained["y_test"], trained["model"],
+                                        selected_features,
+                                        threshold=score_config.get("threshold", 0.5),
+                                        batch_size=score_config.get("batch_size"))
+                sm.save_scores(scores, scores_path, compression)
+                cache_store(cache_config, "score_model", key, [scores_path], artifacts)
+            record["cached"] = hit
+            record["rows_out"], record["bytes_out"] = prof.frame_size(scores)
         logger.info("Model scoring completed successfully.")
+        return {"key": key, "data": scores}
 
+    def evaluate_performance(inputs):
         # Evaluate model performance metrics and save metrics
-        evaluation_results = ep.evaluate_performance(scores, config["evaluate_performance"])
-        ep.save_metrics(evaluation_results, artifacts / "metrics.yaml")
+        scores = inputs["score_model"]["data"]
+        with prof.profile_stage(report, "evaluate_performance", cprofile_dir) as record:
+            record["rows_in"], record["bytes_in"] = prof.frame_size(scores)
+            key, hit = cache_lookup(cache_config, "evaluate_performance",
+                                    [config["evaluate_performance"], bootstrap_config, score_config,
+                                     reporting_config],
+                                    [inputs["score_model"]["key"]], artifacts)
+            if not hit:
+                bootstrap = None
+                if bootstrap_config.get("enabled", False):
+                    bootstrap = {"threshold": score_config.get("threshold", 0.5),
+                                 "n_resamples": bootstrap_config.get("n_resamples", 2000),
+                                 "confidence": bootstrap_config.get("confidence", 0.95),
+                                 "random_state": bootstrap_config.get("random_state")}
+                evaluation_results = ep.evaluate_performance(scores, config["evaluate_performance"], bootstrap)
+                ep.save_metrics(evaluation_results, artifacts / "metrics.yaml", plot=False)
+                outputs = [artifacts / "metrics.yaml"]
+                sweep = None
+                if report_formats or bootstrap_config.get("threshold_sweep", False):
+                    # One sort of the scores gives the saved sweep and the ROC and PR curves
+                    sweep = ep.threshold_sweep(scores["true_labels"], scores["predicted_probabilities"])
+                evaluation_report = rp.build_report(evaluation_results, sweep,
+                                                    reporting_config.get("max_points", 500))
+                # The figures render in a worker process while the other outputs are written
+                figures_done = rp.render_in_background(evaluation_report, artifacts) \
+                    if "png" in report_formats else None
+                outputs += rp.save_report(evaluation_report, artifacts,
+                                          [fmt for fmt in report_formats if fmt != "png"])
+                if bootstrap_config.get("threshold_sweep", False):
+                    ep.save_threshold_sweep(sweep, artifacts / "threshold_sweep.csv")
+                    outputs.append(artifacts / "threshold_sweep.csv")
+                if figures_done is not None:
+                    outputs += figures_done.result()
+                cache_store(cache_config, "evaluate_performance", key, outputs, artifacts)
+            record["cached"] = hit
+            record["bytes_out"] = prof.path_size(artifacts / "metrics.yaml")
         logger.info("Model evaluation completed successfully.")
+        return None
+
+    def compare_models(inputs):
+        # Score the test set with the run's model and the other models side by side
+        trained = inputs["train_model"]
+        with prof.profile_stage(report, "compare_models", cprofile_dir) as record:
+            if out_of_core:
+                holdout = store.read_table(holdout_path)
+                X_test, y_test = holdout[selected_features], holdout["class"]
+            else:
+                X_test, y_test = trained["X_test"], trained["y_test"]
+            record["rows_in"], record["bytes_in"] = prof.frame_size(X_test)
+            model_paths = {"current": model_path, **cmp.model_names(compare_config.get("models", []))}
+            scores, comparison, model_metrics = cmp.compare_models(
+                X_test, y_test, model_paths, config["evaluate_performance"],
+                threshold=score_config.get("threshold", 0.5),
+                batch_size=score_config.get("batch_size") or 100000,
+                n_workers=compare_config.get("n_workers"))
+            outputs = cmp.save_comparison(scores, comparison, model_metrics, artifacts, artifact_format, compression)
+            record["bytes_out"] = sum(prof.path_size(path) for path in outputs)
+        logger.info("Model comparison completed successfully.")
+        return None
+
+    def loaded_key(stage, files):
+        # Hash the loaded outputs so that downstream cache keys still follow their contents
+        if not cache_config.get("enabled", False):
+            return None
+        return sc.stage_key(stage, "loaded", files)
+
+    def load_dataset(inputs):
+        if incremental:
+            manifest = inc.load_manifest(incremental_dir)
+            return {"key": incremental_key("create_dataset", config["create_dataset"], manifest), "hit": True,
+                    "data": inc.read_store(incremental_dir, "dataset"), "manifest": manifest}
+        return {"key": loaded_key("create_dataset", [dataset_path]), "hit": True,
+                "data": cd.read_dataset(dataset_path)}
+
+    def load_features(inputs):
+        if incremental:
+            manifest = inc.load_manifest(incremental_dir)
+            return {"key": incremental_key("generate_features", config["generate_features"], manifest),
+                    "hit": True, "data": inc.read_store(incremental_dir, "features"), "manifest": manifest}
+        return {"key": loaded_key("generate_features", [features_path]), "hit": True,
+                "data": gf.read_enriched_dataset(features_path)}
+
+    def load_trained(inputs):
+        X_test, y_test = read_test_split()
+        return {"key": loaded_key("train_model", [model_path] + test_split_files()),
+                "model": tm.load_model(model_path), "X_test": X_test, "y_test": y_test}
+
+    def load_scores(inputs):
+        return {"key": loaded_key("score_model", [scores_path]), "data": sm.read_scores(scores_path)}
+
+    # pyplot is not thread-safe, so in-process EDA rendering holds it; the evaluation figures
+    # are drawn in their own process
+    graph = [
+        Stage("acquire_data", acquire),
+        Stage("create_dataset", create_dataset, ("acquire_data",)),
+        Stage("save_dataset", save_dataset, ("create_dataset",)),
+        Stage("validate_data", validate_data, ("create_dataset",)),
+        Stage("generate_features", generate_features, ("create_dataset", "validate_data")),
+        Stage("save_features", save_features, ("generate_features",)),
+        Stage("analysis", analysis, ("generate_features",),
+              ("pyplot",) if n_eda_workers <= 1 else ()),
+        Stage("train_model", train_model,
+              ("create_dataset", "generate_features") + (("save_features",) if out_of_core else ())),
+        Stage("score_model", score_model, ("train_model",)),
+        Stage("evaluate_performance", evaluate_performance, ("score_model",)),
+    ]
+    if compare_config.get("enabled", False) or "compare_models" in (stages or []):
+        graph.append(Stage("compare_models", compare_models, ("train_model",)))
+    if stages is None:
+        return graph
+    loaders = {
+        "acquire_data": lambda inputs: {"key": loaded_key("acquire_data", [artifacts / "clouds.data"])},
+        "create_dataset": load_dataset,
+        "validate_data": lambda inputs: None,
+        "generate_features": load_features,
+        "save_features": lambda inputs: None,
+        "train_model": load_trained,
+        "score_model": load_scores,
+    }
+    return subgraph(graph, stages, loaders)
+
+# Stages run by each command; the results of the stages they depend on are loaded from the run directory
+COMMANDS = {
+    "acquire": (["acquire_data"], "Download the raw data"),
+    "featurize": (["create_dataset", "save_dataset", "validate_data", "generate_features", "save_features"],
+                  "Create the dataset, check it and create its features from the raw data"),
+    "validate": (["validate_data"], "Check the dataset for the inputs the features need"),
+    "analyze": (["analysis"], "Save the EDA figures of the features"),
+    "train": (["train_model"], "Split the features and train the model"),
+    "score": (["score_model"], "Score the model on the test set"),
+    "evaluate": (["evaluate_performance"], "Evaluate the scores"),
+    "compare": (["compare_models"], "Score the test set with several models and compare them"),
+    "upload": ([], "Upload the run directory to S3"),
+}
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse the command line; without a command the whole pipeline runs."""
+    parser = argparse.ArgumentParser(
+        description="Acquire, clean, and create features from clouds data"
+    )
+    parser.add_argument(
+        "--config", help="Path to configuration file (default config/config.yaml, or the config.yaml of --run-dir)"
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=argparse.SUPPRESS, help="Path to configuration file")
+    common.add_argument("--run-dir", help="Run directory to read inputs from and write outputs to")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.add_parser("run", parents=[common], help="Run the whole pipeline (the default)")
+    for command, (_, description) in COMMANDS.items():
+        commands.add_parser(command, parents=[common], help=description)
+    args = parser.parse_args(argv)
+    args.command = args.command or "run"
+    args.run_dir = getattr(args, "run_dir", None)
+    if args.command not in ("run", "acquire") and not args.run_dir:
+        parser.error(f"the {args.command} command needs --run-dir")
+    return args
+
+def record_imports(report: dict, startup_cpu_time: float) -> None:
+    """Add the startup CPU time and the import time of each stage module used to the run profile."""
+    report["imports"] = {"startup_cpu_time_s": startup_cpu_time, "modules_s": import_times()}
+
+def main(argv: list = None):
+    """Main function to run the data processing pipeline, or one of its commands."""
+    # CPU time of interpreter startup and the eager imports, before any stage module is imported
+    startup_cpu_time = time.process_time()
+
+    # Set up logging
+    setup_logging()
+    logger = logging.getLogger("pipeline_logger")
+
+    try:
+        args = parse_args(argv)
+        command = args.command
+
+        # Commands on an existing run use its configuration unless another one is given
+        config_path = args.config or "config/config.yaml"
+        if not args.config and args.run_dir and (Path(args.run_dir) / "config.yaml").exists():
+            config_path = Path(args.run_dir) / "config.yaml"
+
+        # Load configuration file for parameters and run config
+        with open(config_path, "r") as f:
+            config = yaml.load(f, Loader=yaml.FullLoader)
+
+        run_config = config.get("run_config", {})
+
+        # Set up output directory for saving artifacts
+        now = int(datetime.datetime.now().timestamp())
+        if args.run_dir:
+            artifacts = Path(args.run_dir)
+            artifacts.mkdir(parents=True, exist_ok=True)
+            # Run directories are named after the timestamp that the upload uses as its S3 folder
+            timestamp = int(artifacts.name) if artifacts.name.isdigit() else now
+        else:
+            artifacts = Path(run_config.get("output", "runs")) / str(now)
+            artifacts.mkdir(parents=True)
+            timestamp = now
+
+        # Save config file to artifacts directory for traceability
+        if not (artifacts / "config.yaml").exists():
+            with (artifacts / "config.yaml").open("w") as f:
+                yaml.dump(config, f)
+            logger.info("Configuration file saved to artifacts directory.")
+
+        # Per-stage timing, CPU and memory profile of the run
+        profile_config = run_config.get("profile", {})
+        cprofile_dir = artifacts / "profiles" if profile_config.get("cprofile", False) else None
+        profile_path = artifacts / ("profile.json" if command == "run" else f"profile_{command}.json")
+        report = prof.new_report()
+
+        # Run the stages, each as soon as the stages it depends on have finished
+        stages = None if command == "run" else COMMANDS[command][0]
+        if stages != []:
+            run_dag(build_stages(config, artifacts, report, cprofile_dir, stages), run_config.get("max_workers", 4))
+
+            cache_config = run_config.get("cache", {})
+            if cache_config.get("enabled", False):
+                sc.evict(cache_config.get("dir", ".cache/stages"),
+                         int(cache_config.get("max_size_mb", 2048) * 1024 * 1024))
+
+        # Save the run profile before the upload so it is uploaded with the other artifacts
+        record_imports(report, startup_cpu_time)
+        prof.write_profile(report, profile_path)
 
         # Copy log file to artifacts directory
         log_file_path = Path("logs/pipeline.log")
-        if log_file_path.exists():
+        if command == "run" and log_file_path.exists():
             shutil.copy(log_file_path, artifacts / "pipeline.log")
             logger.info("Log file copied to artifacts directory.")
 
         # Upload all artifacts to S3
         aws_config = config.get("aws")
-        if aws_config.get("upload", False):
-            aws.upload_artifacts(artifacts, aws_config, now)
+        if command == "upload" or (command == "run" and aws_config.get("upload", False)):
+            with prof.profile_stage(report, "upload_artifacts", cprofile_dir) as record:
+                record["bytes_in"] = prof.path_size(artifacts)
+                aws.upload_artifacts(artifacts, aws_config, timestamp)
+            record_imports(report, startup_cpu_time)
+            prof.write_profile(report, profile_path)
             logger.info("Artifacts successfully uploaded to S3.")
 
-        logger.info("Pipeline completed - logging end.")
+        if command == "run":
+            logger.info("Pipeline completed - logging end.")
+        else:
+            logger.info("Command %s completed in %s.", command, artifacts)
 
     except Exception as e:
         logger.exception("An error occurred: %s", str(e))
@@ -1,23 +1,37 @@
+import hashlib
 import logging
+import os
+import shutil
 import sys
 import time
 from pathlib import Path
+from typing import Optional
 
 import requests
-from requests.exceptions import ConnectionError, Timeout, HTTPError
+from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout, HTTPError
 
 logger = logging.getLogger(__name__)
 
-def acquire_data(url: str, save_path: Path) -> None:
+def acquire_data(url: str, save_path: Path, attempts: int = 4, wait: int = 3, wait_multiple: int = 2,
+                 stream: bool = False, chunk_size: int = 1 << 20, checksum: Optional[str] = None) -> None:
     """Acquires data from specified URL.
 
     Args:
         url (str): URL from where data is to be acquired.
         save_path (Path): Local path to write data to.
+        attempts (int): Number of retry attempts in case of failure.
+        wait (int): Initial waiting time between retry attempts in seconds.
+        wait_multiple (int): Factor by which the wait time is multiplied after each attempt.
+        stream (bool): Stream the download to disk in chunks and resume it after failures.
+        chunk_size (int): Number of bytes written at a time when streaming.
+        checksum (str): Optional ``"<algorithm>:<hex digest>"`` the streamed file must match.
     """
-    url_contents = get_data(url)
     try:
-        write_data(url_contents, save_path)
+        if stream:
+            download_data(url, Path(save_path), attempts, wait, wait_multiple, chunk_size, checksum)
+        else:
+            url_contents = get_data(url, attempts, wait, wait_multiple)
+            write_data(url_contents, save_path)
         logger.info("Data written to %s", save_path)
     except FileNotFoundError:
         logger.error("Please provide a valid file location to save dataset to.")
@@ -62,6 +76,194 @@ def get_data(url: str, attempts: int = 4, wait: int = 3, wait_multiple: int = 2)
             wait *= wait_multiple  # Increase wait time exponentially for next attempt
     return b""  # Explicitly return empty bytes if all attempts fail
 
+def _verify_checksum(path: Path, checksum: str, chunk_size: int) -> None:
+    """Check a file against a ``"<algorithm>:<hex digest>"`` checksum.
+
+    Raises:
+        ValueError: If the file does not match the checksum.
+    """
+    algorithm, _, expected = checksum.rpartition(":")
+    digest = hashlib.new(algorithm or "sha256")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != expected.lower():
+        error_msg = f"Checksum mismatch for '{path}': expected {expected}, got {digest.hexdigest()}."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+def _validator(response: requests.Response) -> Optional[str]:
+    """Return the ETag of a response, or its Last-Modified date if it has none."""
+    return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+def _content_range_total(response: requests.Response) -> Optional[int]:
+    """Return the total length from a response's ``Content-Range`` header, if it states one."""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def download_data(url: str, save_path: Path, attempts: int = 4, wait: int = 3, wait_multiple: int = 2,
+                  chunk_size: int = 1 << 20, checksum: Optional[str] = None) -> Path:
+    """Streams data from URL to disk, resuming interrupted transfers.
+
+    The body is written in chunks to ``<save_path>.part`` and the response's
+    ETag (or Last-Modified date) to ``<save_path>.part.validator``. After a
+    failure the next attempt requests only the missing bytes with an HTTP Range
+    header and that validator as If-Range, so a source that changed in the
+    meantime is sent in full instead of being spliced onto the old bytes. A
+    partial file without a validator, e.g. from a server that sends neither
+    header, is not resumed. The finished file is checked against the optional
+    checksum and then renamed to ``save_path`` atomically.
+
+    Parameters:
+    url (str): The URL from which to acquire the data.
+    save_path (Path): Local path to write the data to.
+    attempts (int): Number of retry attempts in case of failure (default is 4).
+    wait (int): Initial waiting time between retry attempts in seconds (default is 3).
+    wait_multiple (int): Factor by which the wait time is multiplied after each attempt (default is 2).
+    chunk_size (int): Number of bytes written at a time.
+    checksum (str): Optional ``"<algorithm>:<hex digest>"``, e.g. ``"sha256:..."``.
+
+    Returns:
+    Path: The path the data was written to.
+
+    Raises:
+    ValueError: If the URL is invalid or the checksum does not match.
+    ConnectionError: If unable to establish a connection.
+    Timeout: If the request times out.
+    """
+    if not url.startswith("http"):
+        logger.error("Invalid URL. URL must start with 'http' or 'https'.")
+        raise ValueError("Invalid URL. URL must start with 'http' or 'https'.")
+
+    part_path = save_path.with_name(f"{save_path.name}.part")
+    validator_path = save_path.with_name(f"{save_path.name}.part.validator")
+
+    def discard_part():
+        part_path.unlink(missing_ok=True)
+        validator_path.unlink(missing_ok=True)
+
+    for attempt in range(1, attempts + 1):
+        validator = validator_path.read_text() if validator_path.exists() else None
+        if part_path.exists() and not validator:
+            logger.info("Discarding partial download of %s without a validator.", url)
+            discard_part()
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator} if offset else {}
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=10) as response:
+                if offset and response.status_code == 416:
+                    if _content_range_total(response) == offset:
+                        # Nothing left to send: the partial file is already complete
+                        logger.debug("Partial download of %s is already complete.", url)
+                        break
+                    discard_part()
+                    raise HTTPError(f"Partial download of {url} does not match the source's length.",
+                                    response=response)
+                response.raise_for_status()  # Raise error for non-200 status codes
+                resumed = offset and response.status_code == 206
+                if resumed and _validator(response) not in (None, validator):
+                    discard_part()
+                    raise HTTPError(f"Source {url} changed while resuming its download.", response=response)
+                if resumed:
+                    logger.info("Resuming download of %s at byte %d.", url, offset)
+                else:
+                    if offset:
+                        logger.info("Source changed or ignored the range request; restarting download of %s.",
+                                    url)
+                    discard_part()
+                    if _validator(response):
+                        validator_path.write_text(_validator(response))
+                with open(part_path, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+            logger.info("Data acquired successfully from %s", url)
+            break
+        except (ConnectionError, Timeout, HTTPError, ChunkedEncodingError) as e:
+            if attempt == attempts:
+                logger.error("Failed to acquire data from %s after %d attempts.", url, attempts)
+                raise e
+            logger.warning("Attempt %d/%d failed. Retrying in %d seconds...", attempt, attempts, wait)
+            time.sleep(wait)
+            wait *= wait_multiple  # Increase wait time exponentially for next attempt
+
+    if checksum:
+        try:
+            _verify_checksum(part_path, checksum, chunk_size)
+        except ValueError:
+            discard_part()
+            raise
+
+    os.replace(part_path, save_path)
+    validator_path.unlink(missing_ok=True)
+    return save_path
+
+def download_appended(url: str, previous_path: Path, save_path: Path, overlap: int = 1 << 16,
+                      chunk_size: int = 1 << 20) -> bool:
+    """Fetch only the bytes an append-only source has gained since ``previous_path`` was downloaded.
+
+    The request starts ``overlap`` bytes before the end of the previous copy. If
+    those bytes still match, the previous copy plus the new bytes is written to
+    ``save_path``; otherwise the source was rewritten and nothing is written.
+    The result is only kept if its size matches the total length in the
+    response's ``Content-Range``, so a transfer that ends early is not taken
+    as the new copy.
+
+    Parameters:
+    url (str): The URL from which to acquire the data.
+    previous_path (Path): Earlier complete download of the same URL.
+    save_path (Path): Local path to write the data to.
+    overlap (int): Number of already downloaded bytes fetched again to check that they are unchanged.
+    chunk_size (int): Number of bytes written at a time.
+
+    Returns:
+    bool: Whether ``save_path`` was written; if not, the source must be downloaded in full.
+    """
+    size = previous_path.stat().st_size
+    start = max(0, size - overlap)
+    part_path = save_path.with_name(f"{save_path.name}.part")
+    try:
+        with requests.get(url, headers={"Range": f"bytes={start}-"}, stream=True, timeout=10) as response:
+            if response.status_code != 206:
+                logger.info("Source %s did not answer the range request; downloading it in full.", url)
+                return False
+            total = _content_range_total(response)
+            if total is None or not response.headers["Content-Range"].startswith(f"bytes {start}-"):
+                logger.info("Source %s sent an unexpected Content-Range; downloading it in full.", url)
+                return False
+            chunks = response.iter_content(chunk_size=chunk_size)
+
+            # Compare the overlapping bytes with the tail of the previous copy
+            received = b""
+            for chunk in chunks:
+                received += chunk
+                if len(received) >= size - start:
+                    break
+            with open(previous_path, "rb") as f:
+                f.seek(start)
+                tail = f.read()
+            if received[:len(tail)] != tail:
+                logger.info("Source %s changed before byte %d; downloading it in full.", url, size)
+                return False
+
+            shutil.copyfile(previous_path, part_path)
+            with open(part_path, "ab") as f:
+                f.write(received[len(tail):])
+                for chunk in chunks:
+                    f.write(chunk)
+    except (ConnectionError, Timeout, HTTPError, ChunkedEncodingError) as e:
+        logger.warning("Fetching new bytes from %s failed (%s); downloading it in full.", url, e)
+        part_path.unlink(missing_ok=True)
+        return False
+    if part_path.stat().st_size != total:
+        logger.warning("Received %d of %d bytes from %s; downloading it in full.",
+                       part_path.stat().st_size, total, url)
+        part_path.unlink()
+        return False
+    appended = part_path.stat().st_size - size
+    os.replace(part_path, save_path)
+    logger.info("Fetched %d new bytes from %s.", appended, url)
+    return True
+
 class WriteDataError(Exception):
     """Exception raised when an error occurs while writing data to a file."""
     pass
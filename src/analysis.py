@@ -1,15 +1,25 @@
 import datetime
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from cycler import cycler
 
 logger = logging.getLogger(__name__)
 
+# Whether update_matplotlib_defaults already ran in this process
+_defaults_applied = False
+
 def update_matplotlib_defaults():
-    """Update matplotlib defaults to a predefined style."""
+    """Update matplotlib defaults to a predefined style, once per process."""
+    global _defaults_applied
+    if _defaults_applied:
+        return
     mpl_update = {
         "font.size": 16,
         "axes.prop_cycle": cycler("color", ["#0085ca", "#888b8d", "#00c389", "#f4364c", "#e56db1"]),
@@ -26,6 +36,7 @@ def update_matplotlib_defaults():
         "font.sans-serif": "Tahoma",
     }
     plt.rcParams.update(mpl_update)
+    _defaults_applied = True
     logger.debug("Matplotlib defaults updated.")
 
 
@@ -35,12 +46,56 @@ def dateplus(x: str) -> str:
     return f"{now}-{x}"
 
 
-def save_figures(data: pd.DataFrame, dir: Path) -> list[Path]:
+# Class split shared with the rendering worker processes, set by _init_worker
+_worker_split = None
+
+def _init_worker(class_0: pd.DataFrame, class_1: pd.DataFrame) -> None:
+    """Set up a rendering worker with the Agg backend and the shared class split."""
+    global _worker_split
+    matplotlib.use("Agg")
+    update_matplotlib_defaults()
+    _worker_split = (class_0, class_1)
+
+def _render_in_worker(feat: str, dir: Path) -> Path:
+    """Render one feature's histogram from the class split shared with this worker."""
+    class_0, class_1 = _worker_split
+    return render_histogram(feat, class_0[feat].values, class_1[feat].values, dir)
+
+def render_histogram(feat: str, class_0_values: np.ndarray, class_1_values: np.ndarray, dir: Path) -> Path:
+    """Draw and save the histogram of one feature split by class.
+
+    Args:
+        feat (str): Name of the feature.
+        class_0_values (np.ndarray): Values of the feature for class 0.
+        class_1_values (np.ndarray): Values of the feature for class 1.
+        dir (Path): Directory to save the figure to.
+
+    Returns:
+        Path: Path of the saved figure.
+    """
+    fig, ax = plt.subplots(figsize=(12, 8))
+    try:
+        ax.hist([class_0_values, class_1_values])
+        ax.set_xlabel(" ".join(feat.split("_")).capitalize())
+        ax.set_ylabel("Number of observations")
+
+        # Save the figure with prepended date
+        fig_path = dir / dateplus(f"{feat}.png")
+        fig.savefig(fig_path)
+        return fig_path
+    finally:
+        # Close the figure to release memory
+        plt.close(fig)
+
+def save_figures(data: pd.DataFrame, dir: Path, n_workers: int = 1) -> list[Path]:
     """Save figures for each feature in the DataFrame to the specified directory.
 
+    A figure that cannot be saved is logged and skipped; the others are still saved.
+
     Args:
         data (pd.DataFrame): DataFrame containing features.
         dir (Path): Directory to save the figures to.
+        n_workers (int): Number of processes rendering figures in parallel; 1 renders in-process.
 
     Returns:
         list[Path]: List of paths to the saved figures.
@@ -50,32 +105,33 @@ def save_figures(data: pd.DataFrame, dir: Path) -> list[Path]:
     # Create the directory if it doesn't exist
     dir.mkdir(parents=True, exist_ok=True)
 
-    # Update matplotlib defaults
-    update_matplotlib_defaults()
-
-    for feat in data.columns:
-        fig, ax = plt.subplots(figsize=(12, 8))
-        ax.hist(
-            [
-                data[feat][data["class"] == 0].values,
-                data[feat][data["class"] == 1].values,
-            ]
-        )
-        ax.set_xlabel(" ".join(feat.split("_")).capitalize())
-        ax.set_ylabel("Number of observations")
-
-        # Save the figure with prepended date
-        fig_name = dateplus(f"{feat}.png")
-        fig_path = dir / fig_name
-        try:
-            fig.savefig(fig_path)
-            saved_paths.append(fig_path)
-            logger.debug("Figure saved: %s", fig_path)
-        except Exception as e:
-            logger.error("Error occurred while saving figure %s: %s", fig_path, e)
-
-        # Close the figure to release memory
-        plt.close(fig)
+    # Split the data by class once for all features
+    class_0 = data[data["class"] == 0]
+    class_1 = data[data["class"] == 1]
+
+    if n_workers > 1:
+        logger.debug("Rendering %d figures on %d processes.", len(data.columns), n_workers)
+        # Spawn rather than fork: forking while other threads hold locks (e.g. logging) can deadlock
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(class_0, class_1)) as pool:
+            futures = {feat: pool.submit(_render_in_worker, feat, dir) for feat in data.columns}
+            for feat, future in futures.items():
+                try:
+                    saved_paths.append(future.result())
+                    logger.debug("Figure saved: %s", saved_paths[-1])
+                except Exception as e:
+                    logger.error("Error occurred while saving figure for %s: %s", feat, e)
+    else:
+        # Update matplotlib defaults
+        update_matplotlib_defaults()
+
+        for feat in data.columns:
+            try:
+                saved_paths.append(render_histogram(feat, class_0[feat].values, class_1[feat].values, dir))
+                logger.debug("Figure saved: %s", saved_paths[-1])
+            except Exception as e:
+                logger.error("Error occurred while saving figure for %s: %s", feat, e)
     logger.info("All figures saved successfully")
 
     if not saved_paths:
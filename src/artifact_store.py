@@ -0,0 +1,110 @@
+import logging
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# File suffix used for each supported artifact format
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+def artifact_path(directory: Path, name: str, fmt: str = "csv") -> Path:
+    """Build the path of a tabular artifact in the given format.
+
+    Args:
+        directory (Path): Directory holding the artifact.
+        name (str): Artifact name without suffix, e.g. ``"clouds"``.
+        fmt (str): One of ``"csv"``, ``"parquet"`` or ``"arrow"``.
+
+    Returns:
+        Path: Path with the suffix matching the format.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if fmt not in FORMATS:
+        error_msg = f"Unsupported artifact format '{fmt}'. Choose one of {list(FORMATS)}."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return Path(directory) / f"{name}{FORMATS[fmt]}"
+
+def format_of(path: Path) -> str:
+    """Infer the artifact format from a file suffix."""
+    suffix = Path(path).suffix
+    for fmt, fmt_suffix in FORMATS.items():
+        if suffix == fmt_suffix:
+            return fmt
+    error_msg = f"Cannot infer artifact format of '{path}'."
+    logger.error(error_msg)
+    raise ValueError(error_msg)
+
+def write_table(data: Union[pd.DataFrame, pd.Series], path: Path, compression: Optional[str] = None) -> None:
+    """Write a DataFrame or Series to disk in the format given by the path suffix.
+
+    Args:
+        data (pd.DataFrame | pd.Series): Data to write; the index is not stored.
+        path (Path): Destination path, see :func:`artifact_path`.
+        compression (str): Codec for columnar formats, e.g. ``"zstd"``,
+            ``"lz4"`` or ``"snappy"``. Ignored for CSV.
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    fmt = format_of(path)
+    logger.debug("Writing %s artifact to %s.", fmt, path)
+    if fmt == "csv":
+        data.to_csv(path, index=False)
+    elif fmt == "parquet":
+        data.to_parquet(path, index=False, compression=compression)
+    else:
+        data.reset_index(drop=True).to_feather(path, compression=compression or "uncompressed")
+
+def read_table(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a tabular artifact, optionally only some of its columns.
+
+    Args:
+        path (Path): Path of the artifact.
+        columns (List[str]): Columns to read; ``None`` reads all columns.
+
+    Returns:
+        pd.DataFrame: The stored data.
+    """
+    fmt = format_of(path)
+    logger.debug("Reading %s artifact from %s.", fmt, path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+def iter_table(path: Path, columns: Optional[List[str]] = None, chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+    """Read a tabular artifact in chunks of at most ``chunksize`` rows.
+
+    Args:
+        path (Path): Path of the artifact.
+        columns (List[str]): Columns to read; ``None`` reads all columns.
+        chunksize (int): Maximum number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the stored data.
+    """
+    fmt = format_of(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pyarrow as pa
+        # Memory-map the file so only the chunks being converted are resident
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(columns)
+            for batch in table.to_batches(max_chunksize=chunksize):
+                yield batch.to_pandas()
@@ -1,6 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+import hashlib
 import logging
+import time
 import boto3
+from boto3.s3.transfer import TransferConfig
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -10,16 +15,87 @@ logging.getLogger("botocore").setLevel(logging.WARN)
 logging.getLogger("boto3").setLevel(logging.WARN)
 logging.getLogger("s3transfer").setLevel(logging.WARN)
 
+def local_etag(file_path: Path, multipart_threshold: int, multipart_chunksize: int) -> str:
+    """Compute the ETag S3 assigns to a file uploaded with the given transfer settings.
+
+    Files below the multipart threshold get the MD5 of their contents; larger
+    files get the MD5 of the concatenated part digests followed by the part count.
+
+    Args:
+        file_path (Path): Local file.
+        multipart_threshold (int): Size in bytes from which uploads are multipart.
+        multipart_chunksize (int): Size in bytes of each multipart part.
+
+    Returns:
+        str: Expected ETag without surrounding quotes.
+    """
+    whole = hashlib.md5()
+    part_digests = []
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(multipart_chunksize), b""):
+            whole.update(chunk)
+            part_digests.append(hashlib.md5(chunk).digest())
+    if file_path.stat().st_size < multipart_threshold:
+        return whole.hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+def remote_objects(s3, bucket_name: str, prefix: str) -> dict:
+    """Return the ETag and size of every object under a prefix, from one paginated listing."""
+    objects = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket_name, Prefix=f"{prefix}/"):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = (obj["ETag"].strip('"'), obj["Size"])
+    return objects
+
+def upload_file(s3, file_path: Path, bucket_name: str, s3_key: str, transfer_config: TransferConfig,
+                existing: Optional[tuple] = None) -> bool:
+    """Upload a single file to S3 unless an identical object is already there.
+
+    Args:
+        s3: boto3 S3 client shared between uploads.
+        file_path (Path): Local file to upload.
+        bucket_name (str): Destination bucket.
+        s3_key (str): Destination key.
+        transfer_config (TransferConfig): Multipart chunk size and concurrency settings.
+        existing (tuple): ETag and size of the object already at ``s3_key``, if any; the
+            upload is skipped if they match the local file.
+
+    Returns:
+        bool: True if the file was uploaded, False if it was skipped.
+    """
+    size = file_path.stat().st_size
+    # Only files of the same size as the object are hashed
+    if existing is not None and existing[1] == size:
+        expected = local_etag(file_path, transfer_config.multipart_threshold,
+                              transfer_config.multipart_chunksize)
+        if existing[0] == expected:
+            logger.debug("Skipped unchanged file %s.", file_path)
+            return False
+
+    start_time = time.perf_counter()
+    s3.upload_file(str(file_path), bucket_name, s3_key, Config=transfer_config)
+    elapsed = max(time.perf_counter() - start_time, 1e-9)
+    logger.debug("Uploaded %s (%.2f MB) in %.2f seconds, %.2f MB/s.",
+                 file_path, size / 1e6, elapsed, size / 1e6 / elapsed)
+    return True
+
 def upload_artifacts(artifacts: Path, config: dict, timestamp: int) -> list[str]:
     """Upload all the artifacts in the specified directory to S3
 
+    Files are uploaded concurrently through one shared client, and large files
+    are sent as multipart uploads. With ``skip_unchanged`` the objects already
+    under the run's prefix are listed once, and files whose ETag matches their
+    object are skipped. This only saves work when the same run directory is
+    uploaded again, e.g. with ``pipeline_log.py upload --run-dir``; a new run's
+    prefix is empty, so no file is hashed.
+
     Args:
         artifacts: Directory containing all the artifacts from a given experiment
         config: Config required to upload artifacts to S3; see example config file for structure
         timestamp: Timestamp to use as a subfolder in S3
 
     Returns:
-        List of S3 uri's for each file that was uploaded
+        List of S3 uri's for each file that is in S3 after the sync
     """
     logger.debug("Uploading Artifacts to S3.")
     try:
@@ -39,16 +115,31 @@ def upload_artifacts(artifacts: Path, config: dict, timestamp: int) -> list[str]
         # Add the timestamp as a subfolder under the prefix
         prefix = f"{prefix}/{timestamp}"
 
-        uploaded_files = []
+        chunk_size = int(config.get("multipart_chunksize_mb", 8) * 1024 * 1024)
+        transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=config.get("max_concurrency", 4),
+        )
+        existing = remote_objects(s3, bucket_name, prefix) if config.get("skip_unchanged", True) else {}
+
+        files = [file_path for file_path in artifacts.glob("**/*") if file_path.is_file()]
+        s3_keys = [f"{prefix}/{file_path.relative_to(artifacts)}" for file_path in files]
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=config.get("max_workers", 8)) as pool:
+            futures = [
+                pool.submit(upload_file, s3, file_path, bucket_name, s3_key, transfer_config, existing.get(s3_key))
+                for file_path, s3_key in zip(files, s3_keys)
+            ]
+            uploaded = [future.result() for future in futures]
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
 
-        for file_path in artifacts.glob("**/*"):
-            if file_path.is_file():
-                s3_key = f"{prefix}/{file_path.relative_to(artifacts)}"
-                s3.upload_file(str(file_path), bucket_name, s3_key)
-                s3_uri = f"s3://{bucket_name}/{s3_key}"
-                uploaded_files.append(s3_uri)
+        uploaded_bytes = sum(f.stat().st_size for f, was_uploaded in zip(files, uploaded) if was_uploaded)
+        logger.info("Uploaded %d of %d files (%.2f MB) in %.2f seconds, %.2f MB/s.",
+                    sum(uploaded), len(files), uploaded_bytes / 1e6, elapsed, uploaded_bytes / 1e6 / elapsed)
 
-        return uploaded_files
+        return [f"s3://{bucket_name}/{s3_key}" for s3_key in s3_keys]
 
     except ValueError as ve:
         logger.error(f"ValueError: {ve}")
@@ -0,0 +1,349 @@
+import argparse
+import io
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.generate_features import apply_feature_plan, compile_feature_plan, load_feature_plan
+from src.score_model import labels_from_probabilities, predict_positive_probabilities
+from src.train_model import feature_plan_path, load_model
+
+logger = logging.getLogger(__name__)
+
+# Content types accepted by the HTTP endpoint, mapped to batch formats
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-parquet": "parquet",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+}
+
+# File suffixes accepted by the CLI, mapped to batch formats
+SUFFIXES = {".csv": "csv", ".parquet": "parquet", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+def load_scoring_bundle(run_dir: Path) -> dict:
+    """Load the trained model and the feature settings of a pipeline run.
+
+    If the run saved a feature plan next to the model (see
+    :func:`src.train_model.feature_plan_path`), that plan is used for every
+    batch; otherwise a plan is compiled from the run's config.
+
+    Args:
+        run_dir (Path): Run directory containing ``trained_model_object.pkl`` and ``config.yaml``.
+
+    Returns:
+        dict: Model, feature config, selected features, decision threshold and the feature plan(s).
+    """
+    run_dir = Path(run_dir)
+    with open(run_dir / "config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    model = load_model(run_dir / "trained_model_object.pkl")
+    plan_path = feature_plan_path(run_dir / "trained_model_object.pkl")
+    if not plan_path.exists():
+        # Runs before per-model plans saved one plan for the run
+        plan_path = run_dir / "feature_plan.json"
+    logger.info("Loaded model and feature config from %s.", run_dir)
+    return {
+        "model": model,
+        "feature_config": config["generate_features"],
+        "selected_features": config["train_model"]["selected_features"],
+        "threshold": config.get("score_model", {}).get("threshold", 0.5),
+        "plan": load_feature_plan(plan_path) if plan_path.exists() else None,
+        "plans": {},
+    }
+
+def score_batch(bundle: dict, batch: pd.DataFrame) -> np.ndarray:
+    """Apply the run's feature transforms to raw observations and score them.
+
+    The run's saved feature plan is used when available. Otherwise a plan is
+    compiled and cached per input column layout, so repeated batches with the
+    same columns skip config validation.
+
+    Args:
+        bundle (dict): Scoring bundle from :func:`load_scoring_bundle`.
+        batch (pd.DataFrame): Raw observations.
+
+    Returns:
+        np.ndarray: Positive-class probability for every row.
+    """
+    if bundle.get("plan") is not None:
+        plan = bundle["plan"]
+        features = apply_feature_plan(batch[plan.input_columns], plan)
+        return predict_positive_probabilities(bundle["model"], features[bundle["selected_features"]])
+
+    columns = tuple(batch.columns)
+    if columns not in bundle["plans"]:
+        plan = compile_feature_plan(bundle["feature_config"], list(columns))
+        derived = set(plan.derived_columns)
+        raw_selected = [f for f in bundle["selected_features"] if f not in derived]
+        needed = list(dict.fromkeys(plan.input_columns + raw_selected))
+        bundle["plans"][columns] = (plan, needed)
+    plan, needed = bundle["plans"][columns]
+
+    features = apply_feature_plan(batch[needed], plan)
+    return predict_positive_probabilities(bundle["model"], features[bundle["selected_features"]])
+
+def read_batch(payload: bytes, fmt: str) -> pd.DataFrame:
+    """Parse a CSV, Parquet or JSON-lines payload into a DataFrame."""
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(payload))
+    if fmt == "parquet":
+        return pd.read_parquet(io.BytesIO(payload))
+    if fmt == "jsonl":
+        return pd.read_json(io.BytesIO(payload), lines=True)
+    raise ValueError(f"Unsupported batch format '{fmt}'.")
+
+class LatencyTracker:
+    """Thread-safe window of recent request latencies."""
+
+    def __init__(self, window: int = 10000):
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of one request."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        """Return the p50, p95 and p99 latency in milliseconds over the window."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+        if latencies.size == 0:
+            return {}
+        p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+        return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "requests": int(latencies.size)}
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into micro-batches.
+
+    Requests are queued and a single worker thread scores everything that
+    arrives within ``max_wait_ms`` of the first request (up to
+    ``max_batch_rows`` rows) with one call to ``score_fn``. If that call
+    fails, the requests are scored one by one, so that an invalid request
+    does not fail the others.
+    """
+
+    def __init__(self, score_fn: Callable[[pd.DataFrame], np.ndarray], max_batch_rows: int = 10000,
+                 max_wait_ms: float = 5):
+        self._score_fn = score_fn
+        self._max_batch_rows = max_batch_rows
+        self._max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, batch: pd.DataFrame) -> Future:
+        """Queue a batch for scoring; the future resolves to its probabilities."""
+        future = Future()
+        self._queue.put((batch, future))
+        return future
+
+    def close(self) -> None:
+        """Stop the worker thread after the queued requests are scored."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            rows = len(item[0])
+            deadline = time.monotonic() + self._max_wait
+            while rows < self._max_batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                pending.append(item)
+                rows += len(item[0])
+            self._score(pending)
+
+    def _score(self, pending: List[tuple]) -> None:
+        # Requests with the same columns are scored together in one call
+        groups = {}
+        for batch, future in pending:
+            groups.setdefault(tuple(batch.columns), []).append((batch, future))
+        for group in groups.values():
+            try:
+                probabilities = self._score_fn(pd.concat([batch for batch, _ in group], ignore_index=True))
+            except Exception as e:
+                if len(group) == 1:
+                    group[0][1].set_exception(e)
+                else:
+                    # Score the requests one by one, so that only the bad ones fail
+                    self._score_each(group)
+                continue
+            start = 0
+            for batch, future in group:
+                future.set_result(probabilities[start:start + len(batch)])
+                start += len(batch)
+        logger.debug("Scored micro-batch of %d requests.", len(pending))
+
+    def _score_each(self, group: List[tuple]) -> None:
+        for batch, future in group:
+            try:
+                future.set_result(self._score_fn(batch))
+            except Exception as e:
+                future.set_exception(e)
+
+def make_handler(bundle: dict, batcher: MicroBatcher, tracker: LatencyTracker) -> type:
+    """Build an HTTP request handler serving ``POST /predict`` and ``GET /stats``."""
+
+    class BatchRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+                return
+            start_time = time.perf_counter()
+            content_type = self.headers.get("Content-Type", "text/csv").split(";")[0].strip()
+            fmt = CONTENT_TYPES.get(content_type)
+            if fmt is None:
+                self._send_json(415, {"error": f"Unsupported content type '{content_type}'."})
+                return
+            try:
+                payload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                probabilities = batcher.submit(read_batch(payload, fmt)).result()
+            except Exception as e:
+                logger.error("Error occurred while scoring request: %s", e)
+                self._send_json(400, {"error": str(e)})
+                return
+            tracker.record(time.perf_counter() - start_time)
+            labels = labels_from_probabilities(probabilities, bundle["model"].classes_, bundle["threshold"])
+            self._send_json(200, {
+                "probabilities": probabilities.tolist(),
+                "predicted_labels": labels.tolist(),
+                "latency": tracker.percentiles(),
+            })
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+                return
+            self._send_json(200, {"latency": tracker.percentiles()})
+
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return BatchRequestHandler
+
+def serve(bundle: dict, host: str = "127.0.0.1", port: int = 8080, max_batch_rows: int = 10000,
+          max_wait_ms: float = 5) -> ThreadingHTTPServer:
+    """Create the batch scoring HTTP server; call ``serve_forever`` to start it.
+
+    Args:
+        bundle (dict): Scoring bundle from :func:`load_scoring_bundle`.
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free port.
+        max_batch_rows (int): Maximum rows scored in one micro-batch.
+        max_wait_ms (float): Time the first request of a micro-batch waits for others.
+
+    Returns:
+        ThreadingHTTPServer: The configured server.
+    """
+    batcher = MicroBatcher(lambda batch: score_batch(bundle, batch), max_batch_rows, max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(bundle, batcher, LatencyTracker()))
+    logger.info("Batch scoring service listening on %s:%d.", *server.server_address[:2])
+    return server
+
+def score_path(bundle: dict, input_path: Path, output_path: Path, chunksize: int = 100000) -> Dict[str, float]:
+    """Score a CSV, Parquet or JSON-lines file in chunks and write the probabilities as CSV.
+
+    Args:
+        bundle (dict): Scoring bundle from :func:`load_scoring_bundle`.
+        input_path (Path): File with raw observations.
+        output_path (Path): CSV file to write probabilities and labels to.
+        chunksize (int): Rows scored at a time.
+
+    Returns:
+        dict: Latency percentiles per chunk and overall rows per second.
+    """
+    fmt = SUFFIXES.get(Path(input_path).suffix)
+    if fmt == "csv":
+        chunks = pd.read_csv(input_path, chunksize=chunksize)
+    elif fmt == "jsonl":
+        chunks = pd.read_json(input_path, lines=True, chunksize=chunksize)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        chunks = (b.to_pandas() for b in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize))
+    else:
+        raise ValueError(f"Cannot infer batch format of '{input_path}'.")
+
+    tracker = LatencyTracker()
+    n_rows = 0
+    start_time = time.perf_counter()
+    for i, chunk in enumerate(chunks):
+        chunk_start = time.perf_counter()
+        probabilities = score_batch(bundle, chunk)
+        tracker.record(time.perf_counter() - chunk_start)
+        labels = labels_from_probabilities(probabilities, bundle["model"].classes_, bundle["threshold"])
+        pd.DataFrame({"predicted_probabilities": probabilities, "predicted_labels": labels}).to_csv(
+            output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n_rows += len(chunk)
+
+    stats = tracker.percentiles()
+    stats["rows_per_second"] = n_rows / max(time.perf_counter() - start_time, 1e-9)
+    logger.info("Scored %d rows from %s at %.0f rows/s.", n_rows, input_path, stats["rows_per_second"])
+    return stats
+
+def main():
+    """Command line entry point: ``score`` a file or ``serve`` the HTTP endpoint."""
+    parser = argparse.ArgumentParser(description="Batch scoring of cloud observations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = subparsers.add_parser("score", help="Score a CSV, Parquet or JSON-lines file")
+    score_parser.add_argument("--run-dir", required=True, help="Pipeline run directory with the model")
+    score_parser.add_argument("--input", required=True, help="File with raw observations")
+    score_parser.add_argument("--output", required=True, help="CSV file to write scores to")
+    score_parser.add_argument("--chunksize", type=int, default=100000, help="Rows scored at a time")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve POST /predict over HTTP")
+    serve_parser.add_argument("--run-dir", required=True, help="Pipeline run directory with the model")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--max-batch-rows", type=int, default=10000)
+    serve_parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    bundle = load_scoring_bundle(Path(args.run_dir))
+    if args.command == "score":
+        stats = score_path(bundle, Path(args.input), Path(args.output), args.chunksize)
+        print(json.dumps(stats, indent=2))
+    else:
+        server = serve(bundle, args.host, args.port, args.max_batch_rows, args.max_wait_ms)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.artifact_store import artifact_path, read_table, write_table
+from src.evaluate_performance import evaluate_performance
+from src.score_model import labels_from_probabilities
+from src.train_model import load_model, metadata_path, open_split
+
+logger = logging.getLogger(__name__)
+
+# Shared memory blocks, feature matrix and probability matrix of a scoring worker, set by _init_worker
+_worker_state = None
+
+def model_names(model_paths: list) -> dict:
+    """Name each model after its file, or its directory and file when file names repeat.
+
+    Args:
+        model_paths (list): Paths of the model artifacts.
+
+    Returns:
+        dict: Model path for each name, in the given order.
+    """
+    paths = [Path(path) for path in model_paths]
+    stems = [path.stem for path in paths]
+    names = [f"{path.parent.name}_{path.stem}" if stems.count(path.stem) > 1 else path.stem for path in paths]
+    if len(set(names)) < len(names):
+        names = [f"{name}_{i}" for i, name in enumerate(names)]
+    return dict(zip(names, paths))
+
+def model_features(model_path: Path) -> list:
+    """Return the features of a saved model from its metadata file, or None if it has none."""
+    path = metadata_path(model_path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f).get("features") or None
+
+def _share(array: np.ndarray) -> tuple:
+    """Copy an array into a new shared memory block.
+
+    Returns:
+        tuple: The block and a description the workers attach to it with.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, {"name": block.name, "shape": array.shape, "dtype": array.dtype.str}
+
+def _attach(spec: dict) -> tuple:
+    """Attach to a shared memory block and view it as an array."""
+    block = shared_memory.SharedMemory(name=spec["name"])
+    return block, np.ndarray(spec["shape"], spec["dtype"], buffer=block.buf)
+
+def _init_worker(features_spec: dict, columns: list, probabilities_spec: dict) -> None:
+    """Set up a scoring worker with views of the shared feature and probability matrices."""
+    global _worker_state
+    features_block, features = _attach(features_spec)
+    probabilities_block, probabilities = _attach(probabilities_spec)
+    _worker_state = (features_block, probabilities_block, features, list(columns), probabilities)
+
+def _score_in_worker(index: int, model_path: str, batch_size: int, single_core: bool) -> dict:
+    """Score the shared feature matrix with one model and write its probabilities to row ``index``."""
+    _, _, features, columns, probabilities = _worker_state
+    start_time = time.perf_counter()
+    model = load_model(model_path)
+    if single_core and "n_jobs" in model.get_params():
+        # The pool already runs one model per core
+        model.set_params(n_jobs=1)
+    load_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    model_columns = list(getattr(model, "feature_names_in_", columns))
+    positions = [columns.index(column) for column in model_columns]
+    for start in range(0, len(features), batch_size):
+        # Only one batch of the model's columns is copied out of shared memory at a time
+        batch = pd.DataFrame(features[start:start + batch_size, positions], columns=model_columns)
+        probabilities[index, start:start + len(batch)] = model.predict_proba(batch)[:, 1]
+    return {"classes": np.asarray(model.classes_).tolist(), "load_time_s": load_time,
+            "score_time_s": time.perf_counter() - start_time}
+
+def score_models(features: pd.DataFrame, model_paths: dict, batch_size: int = 100000,
+                 n_workers: int = None) -> tuple:
+    """Score one feature matrix with several models in parallel worker processes.
+
+    The features are copied once into a shared memory block as float32, which
+    the forests predict on without converting, and every worker reads that
+    block directly instead of receiving a pickled copy. The workers write the
+    probabilities into a second shared block, one row per model.
+
+    Args:
+        features (pd.DataFrame): Features to score; must hold the features of every model.
+        model_paths (dict): Path of each model artifact, keyed by model name.
+        batch_size (int): Number of rows each worker scores at a time.
+        n_workers (int): Number of worker processes; defaults to one per model, up to the number of cores.
+
+    Returns:
+        tuple: Positive-class probabilities as a DataFrame with one column per model, and a dict
+            with the classes and the load and scoring times of each model.
+    """
+    columns = []
+    for path in model_paths.values():
+        for column in model_features(path) or features.columns:
+            if column not in columns:
+                columns.append(column)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(model_paths))
+    logger.debug("Scoring %d rows with %d models on %d worker(s).", len(features), len(model_paths), n_workers)
+
+    start_time = time.time()
+    features_block, features_spec = _share(np.ascontiguousarray(features[columns].to_numpy(dtype=np.float32)))
+    probabilities_block, probabilities_spec = _share(np.zeros((len(model_paths), len(features))))
+    try:
+        # Spawned workers do not inherit the locks of threads running other pipeline stages
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(features_spec, columns, probabilities_spec)) as pool:
+            futures = {name: pool.submit(_score_in_worker, i, str(path), batch_size, n_workers > 1)
+                       for i, (name, path) in enumerate(model_paths.items())}
+            info = {name: future.result() for name, future in futures.items()}
+        probabilities = np.ndarray(probabilities_spec["shape"], probabilities_spec["dtype"],
+                                   buffer=probabilities_block.buf)
+        scores = pd.DataFrame(probabilities.T.copy(), columns=list(model_paths), index=features.index)
+        # Release the view so the block can be closed
+        del probabilities
+    finally:
+        for block in (features_block, probabilities_block):
+            block.close()
+            block.unlink()
+    logger.info("Scored %d models.", len(model_paths))
+    logger.debug("Multi-model scoring completed in %.2f seconds.", time.time() - start_time)
+    return scores, info
+
+def compare_models(features: pd.DataFrame, y_true: pd.Series, model_paths: dict, evaluation_metrics: list,
+                   threshold: float = 0.5, batch_size: int = 100000, n_workers: int = None) -> tuple:
+    """Score several models on the same data and evaluate each of them.
+
+    Args:
+        features (pd.DataFrame): Features to score.
+        y_true (pd.Series): True labels.
+        model_paths (dict): Path of each model artifact, keyed by model name.
+        evaluation_metrics (list): Metrics to compute; see
+            :func:`src.evaluate_performance.evaluate_performance`.
+        threshold (float): Probability above which a row is labelled as the positive class.
+        batch_size (int): Number of rows each worker scores at a time.
+        n_workers (int): Number of worker processes.
+
+    Returns:
+        tuple: The probabilities of every model with the true labels, a comparison table
+            with one row per model, and the metrics of each model.
+    """
+    probabilities, info = score_models(features, model_paths, batch_size, n_workers)
+    model_metrics = {}
+    rows = []
+    for name, path in model_paths.items():
+        scores = pd.DataFrame({
+            "true_labels": y_true.to_numpy(),
+            "predicted_probabilities": probabilities[name].to_numpy(),
+            "predicted_labels": labels_from_probabilities(probabilities[name].to_numpy(),
+                                                          np.asarray(info[name]["classes"]), threshold),
+        })
+        model_metrics[name] = evaluate_performance(scores, evaluation_metrics)
+        scalars = {metric: value for metric, value in model_metrics[name].items() if np.isscalar(value)}
+        rows.append({"model": name, "path": str(path), **scalars, "load_time_s": info[name]["load_time_s"],
+                     "score_time_s": info[name]["score_time_s"]})
+    comparison = pd.DataFrame(rows)
+    if "auc" in comparison:
+        comparison = comparison.sort_values("auc", ascending=False, ignore_index=True)
+    scores = pd.concat([y_true.rename("true_labels"), probabilities], axis=1)
+    return scores, comparison, model_metrics
+
+def save_comparison(scores: pd.DataFrame, comparison: pd.DataFrame, model_metrics: dict, save_dir: Path,
+                    fmt: str = "csv", compression: str = None) -> list:
+    """Save the model scores, the comparison table and the metrics of each model.
+
+    Args:
+        scores (pd.DataFrame): True labels and the probabilities of every model.
+        comparison (pd.DataFrame): Comparison table from :func:`compare_models`.
+        model_metrics (dict): Metrics of each model.
+        save_dir (Path): Directory to save to.
+        fmt (str): Artifact format of the scores.
+        compression (str): Compression codec for columnar formats.
+
+    Returns:
+        list: The saved files and directories.
+    """
+    save_dir = Path(save_dir)
+    scores_path = artifact_path(save_dir, "model_scores", fmt)
+    metrics_dir = save_dir / "model_metrics"
+    try:
+        write_table(scores, scores_path, compression)
+        comparison.to_csv(save_dir / "model_comparison.csv", index=False)
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        for name, metrics in model_metrics.items():
+            with open(metrics_dir / f"{name}.yaml", "w") as f:
+                yaml.dump(metrics, f)
+        logger.info("Model comparison saved to %s", save_dir / "model_comparison.csv")
+    except Exception as e:
+        logger.error("Error occurred while saving the model comparison: %s", e)
+        raise
+    return [scores_path, save_dir / "model_comparison.csv", metrics_dir]
+
+def main():
+    """Command line entry point: compare models on the test split of an existing pipeline run."""
+    parser = argparse.ArgumentParser(description="Score and compare several models on the same test set")
+    parser.add_argument("--run-dir", required=True, help="Pipeline run directory with the test split")
+    parser.add_argument("--models", nargs="+", required=True, help="Model artifacts to compare")
+    parser.add_argument("--config", help="Configuration file; defaults to the run's config.yaml")
+    parser.add_argument("--workers", type=int, help="Worker processes; defaults to one per model")
+    parser.add_argument("--output", help="Output directory; defaults to the run directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run_dir = Path(args.run_dir)
+    with open(args.config or run_dir / "config.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.FullLoader)
+    fmt = config.get("run_config", {}).get("artifact_format", "csv")
+    if (run_dir / "split").exists():
+        _, X_test, _, y_test = open_split(run_dir / "split")
+    elif (run_dir / "holdout.csv").exists():
+        holdout = read_table(run_dir / "holdout.csv")
+        X_test, y_test = holdout.drop(columns="class"), holdout["class"]
+    else:
+        X_test = read_table(artifact_path(run_dir, "X_test", fmt))
+        y_test = read_table(artifact_path(run_dir, "y_test", fmt))["class"]
+
+    score_config = config.get("score_model", {})
+    scores, comparison, model_metrics = compare_models(
+        X_test, y_test, model_names(args.models), config["evaluate_performance"],
+        threshold=score_config.get("threshold", 0.5),
+        batch_size=score_config.get("batch_size") or 100000,
+        n_workers=args.workers)
+    save_comparison(scores, comparison, model_metrics, Path(args.output or run_dir), fmt)
+    print(comparison.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
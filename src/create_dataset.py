@@ -1,22 +1,28 @@
+import itertools
 import logging
+import math
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from src.artifact_store import read_table, write_table
+
 logger = logging.getLogger(__name__)
 
-def read_dataset(file_path: str) -> pd.DataFrame:
+def read_dataset(file_path: str, columns: list = None) -> pd.DataFrame:
     """Reads the structured dataset from disk.
 
     Args:
         file_path (str): Path to the file containing the structured dataset.
+        columns (list): Columns to read; ``None`` reads all columns.
 
     Returns:
         pd.DataFrame: DataFrame containing the structured dataset.
     """
     try:
         # Read the dataset from disk
-        dataset = pd.read_csv(file_path)
+        dataset = read_table(file_path, columns)
         return dataset
     except FileNotFoundError as e:
         error_msg = f"File '{file_path}' not found."
@@ -31,13 +37,113 @@ def read_dataset(file_path: str) -> pd.DataFrame:
         logger.error(error_msg)
         raise Exception(error_msg) from e
 
-def create_dataset(file_path: str, class_indices: tuple, columns: list) -> pd.DataFrame:
+def iter_class_rows(file_path: str, class_indices: tuple, n_columns: int,
+                    chunk_size: int = 10000, start_line: int = 0, start_offset: int = 0):
+    """Stream the rows of each class range from the raw data file in typed chunks.
+
+    Only lines inside a ``class_indices`` range are parsed; every other line is
+    skipped without being split, and reading stops after the last range. An end
+    index of ``None`` extends a range to the end of the file, for feeds that
+    append rows to their last class.
+
+    Args:
+        file_path (str): Path to the file containing the data.
+        class_indices (tuple): Start and end line indices of each class.
+        n_columns (int): Number of whitespace-delimited values per row.
+        chunk_size (int): Maximum number of rows parsed per yielded chunk.
+        start_line (int): Index of the line at ``start_offset``; earlier lines are not read.
+        start_offset (int): Byte offset of the first line to read.
+
+    Yields:
+        tuple: Class label and a float64 array of shape (rows, n_columns).
+
+    Raises:
+        ValueError: If a row inside a class range has the wrong number of values.
+    """
+    ranges = sorted(
+        (start, math.inf if end is None else end, label)
+        for label, (start, end) in enumerate(class_indices)
+    )
+    last_line = max(end for _, end, _ in ranges)
+
+    def parse(lines: list) -> np.ndarray:
+        # Check every row, so that ragged rows cannot add up to the expected total
+        rows = list(map(str.split, lines))
+        if set(map(len, rows)) != {n_columns}:
+            raise ValueError(
+                f"Rows in '{file_path}' do not all have {n_columns} values."
+            )
+        values = np.array(list(itertools.chain.from_iterable(rows)), dtype=np.float64)
+        return values.reshape(len(lines), n_columns)
+
+    with open(file_path, "r") as f:
+        f.seek(start_offset)
+        range_pos = 0
+        buffer = []
+        for line_no, line in enumerate(f, start_line):
+            if line_no >= last_line:
+                break
+            while range_pos < len(ranges) and line_no >= ranges[range_pos][1]:
+                if buffer:
+                    yield ranges[range_pos][2], parse(buffer)
+                    buffer = []
+                range_pos += 1
+            if range_pos == len(ranges):
+                break
+            start, _, label = ranges[range_pos]
+            if line_no < start:
+                continue
+            buffer.append(line)
+            if len(buffer) == chunk_size:
+                yield label, parse(buffer)
+                buffer = []
+        if buffer:
+            yield ranges[range_pos][2], parse(buffer)
+
+def parse_class_rows(file_path: str, class_indices: tuple, columns: list, chunk_size: int = 10000,
+                     start_line: int = 0, start_offset: int = 0) -> pd.DataFrame:
+    """Parse the class rows of the raw data file into a frame with a ``class`` column.
+
+    Args:
+        file_path (str): Path to the file containing the data.
+        class_indices (tuple): Start and end line indices of each class.
+        columns (list): List of column names for the DataFrame.
+        chunk_size (int): Number of rows parsed at a time while streaming the file.
+        start_line (int): Index of the line at ``start_offset``.
+        start_offset (int): Byte offset of the first line to parse.
+
+    Returns:
+        pd.DataFrame: The parsed rows, grouped by class in class order.
+    """
+    chunks = {label: [] for label in range(len(class_indices))}
+    try:
+        for label, rows in iter_class_rows(file_path, class_indices, len(columns), chunk_size,
+                                           start_line, start_offset):
+            chunks[label].append(rows)
+    except ValueError as e:
+        logger.error("Error occurred while importing data from file: %s", e, exc_info=True)
+        raise
+
+    # Stack each class into a typed frame, in class order
+    class_frames = []
+    for label, arrays in chunks.items():
+        values = np.concatenate(arrays) if arrays else np.empty((0, len(columns)))
+        class_df = pd.DataFrame(values, columns=columns)
+        class_df["class"] = label
+        class_frames.append(class_df)
+
+    # Concatenate dataframes
+    return pd.concat(class_frames, ignore_index=True)
+
+def create_dataset(file_path: str, class_indices: tuple, columns: list,
+                   chunk_size: int = 10000) -> pd.DataFrame:
     """Imports data from file and splits it into two classes.
 
     Args:
         file_path (str): Path to the file containing the data.
         class_indices (tuple): Tuple containing the start and end indices of the two classes.
         columns (list): List of column names for the DataFrame.
+        chunk_size (int): Number of rows parsed at a time while streaming the file.
 
     Returns:
         pd.DataFrame: DataFrame containing the imported data with class labels.
@@ -46,25 +152,7 @@ def create_dataset(file_path: str, class_indices: tuple, columns: list) -> pd.Da
     logger.debug("Creating dataset from file: %s", file_path)
     logger.debug("Columns used: %s", columns)
 
-    with open(file_path, "r") as f:
-        try:
-            data = [[s for s in line.split(" ") if s!=""] for line in f.readlines()]
-        except Exception as e:
-            logger.error("Error occurred while importing data from file: %s", e, exc_info=True)
-
-
-    # Extract first class
-    first_class_data = data[class_indices[0][0]:class_indices[0][1]]
-    first_class_df = pd.DataFrame(first_class_data, columns=columns)
-    first_class_df["class"] = 0
-
-    # Extract second class
-    second_class_data = data[class_indices[1][0]:class_indices[1][1]]
-    second_class_df = pd.DataFrame(second_class_data, columns=columns)
-    second_class_df["class"] = 1
-
-    # Concatenate dataframes
-    merged_df = pd.concat([first_class_df, second_class_df], ignore_index=True)
+    merged_df = parse_class_rows(file_path, class_indices, columns, chunk_size)
 
     # Log the size of the resulting DataFrame
     logger.info("Dataset created.")
@@ -72,25 +160,26 @@ def create_dataset(file_path: str, class_indices: tuple, columns: list) -> pd.Da
 
     # Log the count of rows for each class
     class_counts = merged_df["class"].value_counts()
-    logger.debug("Class 0 count: %d", class_counts[0])
-    logger.debug("Class 1 count: %d", class_counts[1])
+    logger.debug("Class 0 count: %d", class_counts.get(0, 0))
+    logger.debug("Class 1 count: %d", class_counts.get(1, 0))
 
     if merged_df.empty:
         logger.warning("The created dataset is empty.")
 
     return merged_df
 
-def save_dataset(dataset: pd.DataFrame, save_path: Path) -> None:
+def save_dataset(dataset: pd.DataFrame, save_path: Path, compression: str = None) -> None:
     """Save structured dataset to disk.
 
     Args:
         dataset (pd.DataFrame): DataFrame containing the structured dataset.
-        save_path (Path): Path to save the dataset.
+        save_path (Path): Path to save the dataset; the suffix selects the format.
+        compression (str): Compression codec for columnar formats.
     """
 
     logger.debug("Saving dataset to path: %s", save_path)
     try:
-        dataset.to_csv(save_path, index=False)
+        write_table(dataset, save_path, compression)
         logger.info("Dataset saved successfully.")
     except Exception as e:
         logger.error("Error occurred while trying to save dataset: %s", e)
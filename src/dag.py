@@ -0,0 +1,156 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Stage:
+    """A node of the pipeline graph.
+
+    Attributes:
+        name (str): Unique name of the stage.
+        func (Callable): Called with a dict of the results of ``depends_on``, keyed by stage name;
+            its return value is the stage's result.
+        depends_on (tuple): Names of the stages that must finish before this one starts.
+        resources (tuple): Names of shared resources the stage uses; stages holding the same
+            resource never run at the same time (e.g. ``"pyplot"``, which is not thread-safe).
+    """
+    name: str
+    func: Callable[[dict], Any]
+    depends_on: tuple = ()
+    resources: tuple = ()
+
+def topological_order(stages: list[Stage]) -> list[str]:
+    """Return the stage names in an order that respects every dependency.
+
+    Args:
+        stages (list[Stage]): Stages of the graph.
+
+    Returns:
+        list[str]: Stage names, each after all of its dependencies.
+
+    Raises:
+        ValueError: If a name is duplicated, a dependency is unknown or the graph has a cycle.
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name '{stage.name}'.")
+        by_name[stage.name] = stage
+    for stage in stages:
+        unknown = [dep for dep in stage.depends_on if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {unknown}.")
+
+    order = []
+    state = {}  # 1 while visiting, 2 once done
+
+    def visit(name, path):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Stage graph has a cycle: {' -> '.join(path + [name])}.")
+        state[name] = 1
+        for dep in by_name[name].depends_on:
+            visit(dep, path + [name])
+        state[name] = 2
+        order.append(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return order
+
+def subgraph(stages: list[Stage], names: list[str], loaders: dict) -> list[Stage]:
+    """Select some stages of a graph, loading the results of their other dependencies instead of running them.
+
+    Args:
+        stages (list[Stage]): Stages of the full graph.
+        names (list[str]): Names of the stages to run.
+        loaders (dict): Function for each stage name that returns the stage's result
+            from its saved outputs, called like a stage function.
+
+    Returns:
+        list[Stage]: The selected stages and a loader stage for each dependency outside them.
+
+    Raises:
+        ValueError: If a stage name is unknown or a dependency has no loader.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}.")
+    selected = [by_name[name] for name in names]
+    external = [dep for stage in selected for dep in stage.depends_on if dep not in names]
+    missing = sorted({dep for dep in external if dep not in loaders})
+    if missing:
+        raise ValueError(f"No loader for the results of stages {missing}.")
+    return [Stage(dep, loaders[dep]) for dep in dict.fromkeys(external)] + selected
+
+def run_dag(stages: list[Stage], max_workers: int = 4) -> dict:
+    """Run a stage graph, starting every stage as soon as its dependencies have finished.
+
+    Independent stages run concurrently on a thread pool, so the wall time of the
+    graph approaches its critical path. When a stage fails no further stages are
+    started, the running ones are allowed to finish and the first error is raised.
+
+    Args:
+        stages (list[Stage]): Stages of the graph.
+        max_workers (int): Maximum number of stages running at once; 1 runs the graph sequentially.
+
+    Returns:
+        dict: Result of each stage, keyed by stage name.
+
+    Raises:
+        ValueError: If the graph is invalid (see :func:`topological_order`).
+        Exception: The error of the first stage that failed.
+    """
+    order = topological_order(stages)
+    by_name = {stage.name: stage for stage in stages}
+    results = {}
+    running = {}  # future -> stage name
+    held = set()
+    failure = None
+    start_time = time.perf_counter()
+
+    def ready(name):
+        stage = by_name[name]
+        return all(dep in results for dep in stage.depends_on) and not held.intersection(stage.resources)
+
+    pending = list(order)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="stage") as pool:
+        while pending or running:
+            if failure is None:
+                for name in list(pending):
+                    if len(running) >= max(1, max_workers):
+                        break
+                    if not ready(name):
+                        continue
+                    stage = by_name[name]
+                    held.update(stage.resources)
+                    inputs = {dep: results[dep] for dep in stage.depends_on}
+                    running[pool.submit(stage.func, inputs)] = name
+                    pending.remove(name)
+                    logger.debug("Started stage %s.", name)
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                held.difference_update(by_name[name].resources)
+                try:
+                    results[name] = future.result()
+                    logger.debug("Finished stage %s.", name)
+                except Exception as e:
+                    logger.error("Stage %s failed: %s", name, e)
+                    if failure is None:
+                        failure = e
+
+    if failure is not None:
+        logger.error("Stages not run because of the failure: %s", pending)
+        raise failure
+    logger.debug("Ran %d stages in %.2f seconds.", len(order), time.perf_counter() - start_time)
+    return results
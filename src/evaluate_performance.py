@@ -2,18 +2,21 @@ import time
 from pathlib import Path
 import logging
 from sklearn import metrics
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import yaml
 
 logger = logging.getLogger(__name__)
 
-def evaluate_performance(scores: pd.DataFrame, evaluation_metrics: list) -> dict:
+def evaluate_performance(scores: pd.DataFrame, evaluation_metrics: list, bootstrap: dict = None) -> dict:
     """Evaluate the model performance metrics.
 
     Args:
         scores (pd.DataFrame): DataFrame containing model scores.
         evaluation_metrics (list): List of evaluation metrics to compute.
+        bootstrap (dict): Settings of :func:`bootstrap_metrics` (``threshold``, ``n_resamples``,
+            ``confidence``, ``random_state``); if given, bootstrap confidence intervals are added
+            under ``bootstrap``.
 
     Returns:
         dict: Dictionary containing the computed evaluation metrics.
@@ -46,52 +49,214 @@ def evaluate_performance(scores: pd.DataFrame, evaluation_metrics: list) -> dict
         evaluation_results["classification_report"] = metrics.classification_report(y_true, y_pred_bin,
                                                                                     output_dict=True)
 
+    if bootstrap:
+        evaluation_results["bootstrap"] = bootstrap_metrics(y_true, y_pred_proba, **bootstrap)
+        for name, interval in evaluation_results["bootstrap"].items():
+            logger.info("Model %s: %.4f (%.4f - %.4f)", name, interval["estimate"], interval["lower"],
+                        interval["upper"])
+
     end_time = time.time()
     logger.debug("Model performance evaluation completed in %.2f seconds.", end_time - start_time)
     logger.info("Model performance evaluation completed.")
 
     return evaluation_results
 
+def _score_groups(y_true: np.ndarray, y_score: np.ndarray) -> tuple:
+    """Sort the samples by descending score once and find the groups of tied scores.
+
+    Returns:
+        tuple: Sort order, start index of each tied group and the group scores (descending).
+    """
+    order = np.argsort(-y_score, kind="mergesort")
+    sorted_scores = y_score[order]
+    starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    return order, starts, sorted_scores[starts]
+
+def _threshold_metrics(tp: np.ndarray, fp: np.ndarray, positives: np.ndarray, negatives: np.ndarray) -> dict:
+    """Compute positive-class threshold metrics from (weighted) confusion counts.
+
+    All arguments broadcast against each other; precision is 0 where nothing is predicted
+    positive and recall is 0 where there are no positives, as in scikit-learn.
+    """
+    predicted = tp + fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(positives > 0, tp / positives, 0.0)
+        f1_denominator = predicted + positives
+        f1 = np.where(f1_denominator > 0, 2 * tp / f1_denominator, 0.0)
+        accuracy = (tp + negatives - fp) / (positives + negatives)
+    return {"accuracy": accuracy, "precision": precision, "recall": recall, "f1": f1}
+
+def _group_metrics(positive_weights: np.ndarray, negative_weights: np.ndarray, group_scores: np.ndarray,
+                   threshold: float) -> dict:
+    """Compute AUC and threshold metrics from the positive and negative weight of each tied-score group.
+
+    Both weight arrays have shape (resamples, groups), with the groups ordered by descending score.
+    """
+    cum_tp = np.cumsum(positive_weights, axis=1)
+    positives = cum_tp[:, -1]
+    negatives = negative_weights.sum(axis=1)
+
+    # Each negative outranks the positives in higher groups and ties with half of its own group
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = (negative_weights * (cum_tp - positive_weights / 2)).sum(axis=1) / (positives * negatives)
+
+    # Groups above the threshold are predicted positive
+    above = np.count_nonzero(group_scores > threshold)
+    if above:
+        tp = cum_tp[:, above - 1]
+        fp = negative_weights[:, :above].sum(axis=1)
+    else:
+        tp = fp = np.zeros(len(positive_weights))
+    results = {"auc": auc}
+    results.update(_threshold_metrics(tp, fp, positives, negatives))
+    return results
+
+def resample_metrics(y_true: np.ndarray, y_score: np.ndarray, weights: np.ndarray, threshold: float = 0.5) -> dict:
+    """Compute AUC and threshold metrics for many weighted resamples at once.
+
+    Each row of ``weights`` is one resample, given as the number of times every
+    sample is drawn. The samples are sorted once; per resample the positive and
+    negative weight of each tied-score group is summed and accumulated, which
+    yields the weighted ROC curve, the AUC and the confusion counts at
+    ``threshold`` (a sample is predicted positive when its score is above it).
+
+    Args:
+        y_true (np.ndarray): Binary labels, 1 for the positive class.
+        y_score (np.ndarray): Positive-class probabilities.
+        weights (np.ndarray): Resample weights of shape (resamples, samples).
+        threshold (float): Decision threshold for the threshold metrics.
+
+    Returns:
+        dict: Array of each metric (auc, accuracy, precision, recall, f1) with one value per resample.
+    """
+    order, starts, group_scores = _score_groups(y_true, y_score)
+    positive = y_true[order].astype(np.float64)
+    weights = np.asarray(weights, dtype=np.float64)[:, order]
+
+    positive_weights = np.add.reduceat(weights * positive, starts, axis=1)
+    negative_weights = np.add.reduceat(weights, starts, axis=1) - positive_weights
+    return _group_metrics(positive_weights, negative_weights, group_scores, threshold)
+
+def bootstrap_metrics(y_true, y_score, threshold: float = 0.5, n_resamples: int = 2000,
+                      confidence: float = 0.95, random_state: int = None, max_cells: int = 1 << 22) -> dict:
+    """Estimate AUC, accuracy, precision, recall and F1 with bootstrap confidence intervals.
+
+    The samples are sorted once and each is coded by its tied-score group and
+    label. Every resample's draws are then counted per group and label with a
+    single ``bincount``, and the metrics of all resamples follow from cumulative
+    sums over the groups (see :func:`resample_metrics`). Resamples are drawn in
+    chunks of at most ``max_cells`` draws.
+
+    Args:
+        y_true: Binary labels, 1 for the positive class.
+        y_score: Positive-class probabilities.
+        threshold (float): Decision threshold for the threshold metrics.
+        n_resamples (int): Number of bootstrap resamples.
+        confidence (float): Coverage of the percentile confidence intervals.
+        random_state (int): Seed for the resamples.
+        max_cells (int): Maximum number of draws held in memory at once.
+
+    Returns:
+        dict: Estimate on the full sample and lower and upper confidence bounds of each metric.
+    """
+    y_true = np.asarray(y_true).astype(np.int64)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n_samples = len(y_true)
+    order, starts, group_scores = _score_groups(y_true, y_score)
+    n_codes = 2 * len(group_scores)
+    group_starts = np.zeros(n_samples, dtype=np.int64)
+    group_starts[starts] = 1
+    group = np.empty(n_samples, dtype=np.int64)
+    group[order] = np.cumsum(group_starts) - 1
+    codes = 2 * group + y_true
+
+    def metrics_from_counts(counts):
+        counts = counts.reshape(len(counts), -1, 2).astype(np.float64)
+        return _group_metrics(counts[:, :, 1], counts[:, :, 0], group_scores, threshold)
+
+    estimates = metrics_from_counts(np.bincount(codes, minlength=n_codes)[None, :])
+    rng = np.random.default_rng(random_state)
+    chunk = max(1, max_cells // max(n_samples, 1))
+    draws = {name: [] for name in estimates}
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        drawn_codes = codes[rng.integers(0, n_samples, (size, n_samples))] + n_codes * np.arange(size)[:, None]
+        counts = np.bincount(drawn_codes.ravel(), minlength=size * n_codes).reshape(size, n_codes)
+        for name, values in metrics_from_counts(counts).items():
+            draws[name].append(values)
+
+    alpha = (1 - confidence) / 2
+    results = {}
+    for name, values in draws.items():
+        values = np.concatenate(values)
+        # Resamples without one of the classes have no AUC
+        lower, upper = np.nanquantile(values, [alpha, 1 - alpha])
+        results[name] = {"estimate": float(estimates[name][0]), "lower": float(lower), "upper": float(upper)}
+    return results
+
+def threshold_sweep(y_true, y_score) -> pd.DataFrame:
+    """Compute the threshold metrics at every distinct score from a single sort.
+
+    Args:
+        y_true: Binary labels, 1 for the positive class.
+        y_score: Positive-class probabilities.
+
+    Returns:
+        pd.DataFrame: Confusion counts and metrics when samples scoring above each threshold are
+        predicted positive, from the highest threshold to the lowest.
+    """
+    y_true = np.asarray(y_true)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order, starts, group_scores = _score_groups(y_true, y_score)
+    positive = y_true[order].astype(np.int64)
+    group_positives = np.add.reduceat(positive, starts)
+    group_sizes = np.diff(np.r_[starts, len(y_true)])
+    # Predicted positive at threshold g: every group above it
+    tp = np.r_[0, np.cumsum(group_positives)[:-1]]
+    fp = np.r_[0, np.cumsum(group_sizes - group_positives)[:-1]]
+    positives = positive.sum()
+    negatives = len(y_true) - positives
+
+    sweep = pd.DataFrame({"threshold": group_scores, "tp": tp, "fp": fp,
+                          "tn": negatives - fp, "fn": positives - tp})
+    for name, values in _threshold_metrics(tp, fp, positives, negatives).items():
+        sweep[name] = values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sweep["fpr"] = fp / negatives if negatives else 0.0
+    return sweep
+
+def save_threshold_sweep(sweep: pd.DataFrame, save_path: Path) -> None:
+    """Save the threshold sweep to disk as CSV.
+
+    Args:
+        sweep (pd.DataFrame): Threshold sweep from :func:`threshold_sweep`.
+        save_path (Path): Path to save the sweep.
+    """
+    logger.debug("Saving threshold sweep to %s.", save_path)
+    try:
+        sweep.to_csv(save_path, index=False)
+        logger.info("Threshold sweep saved.")
+    except Exception as e:
+        logger.error("Error occurred while saving threshold sweep to disk: %s", e)
+        raise
+
 def plot_metrics_bar_chart(used_metrics: dict, save_dir: str) -> None:
     """Plot and save selected evaluation metrics as a bar chart."""
+    from src.reporting import build_report, render_figures
 
     logger.debug("Creating Evaluation metrics bar chart.")
-    # Extract relevant metrics for plotting
-    accuracy = used_metrics["accuracy"]
-    auc = used_metrics["auc"]
-    f1_score = used_metrics["classification_report"]["macro avg"]["f1-score"]
-    precision = used_metrics["classification_report"]["macro avg"]["precision"]
-    recall = used_metrics["classification_report"]["macro avg"]["recall"]
-
-    # Plot the bar chart
-    metrics_names = ["Accuracy", "AUC", "F1-Score", "Precision", "Recall"]
-    metrics_values = [accuracy, auc, f1_score, precision, recall]
-
-    plt.figure(figsize=(8, 6))
-    plt.bar(metrics_names, metrics_values, color="skyblue")
-    plt.xlabel("Metrics")
-    plt.ylabel("Value")
-    plt.title("Evaluation Metrics")
-    plt.grid(axis="y")
-
-    # Set y-axis limit to truncate at 0.8
-    plt.ylim(bottom=0.8)
-
-    # Save the chart
-    chart_path = save_dir / "metrics_bar_chart.png"
-    plt.savefig(chart_path)
-
+    chart_path = render_figures(build_report(used_metrics), Path(save_dir))[0]
     logger.info("Evaluation metrics bar chart saved at: %s", chart_path)
 
-    # Close the plot to release memory
-    plt.close()
-
-def save_metrics(metrics_object: dict, save_path: str) -> None:
+def save_metrics(metrics_object: dict, save_path: str, plot: bool = True) -> None:
     """Save the evaluation metrics to disk.
 
     Args:
         metrics (dict): Dictionary containing the evaluation metrics.
         save_path (str): Path to save the metrics.
+        plot (bool): Also save the metrics bar chart next to them; see :mod:`src.reporting`
+            for rendering it in the background or without matplotlib.
     """
     logger.debug("Saving evaluation metrics to %s.", save_path)
     try:
@@ -102,5 +267,6 @@ def save_metrics(metrics_object: dict, save_path: str) -> None:
         logger.error("Error occurred while saving evaluation metrics to disk: %s", e)
         raise
 
-    # Plot and save the bar chart
-    plot_metrics_bar_chart(metrics_object, Path(save_path).parent)
+    if plot:
+        # Plot and save the bar chart
+        plot_metrics_bar_chart(metrics_object, Path(save_path).parent)
@@ -1,17 +1,24 @@
+import json
 import sys
 import logging
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List
 import pandas as pd
 import numpy as np
 
+from src.artifact_store import read_table, write_table
+
 logger = logging.getLogger(__name__)
 
-def read_enriched_dataset(file_path: str) -> pd.DataFrame:
-    """Reads the enriched dataset from disk."""
+# Version of the serialized feature plan format written by save_feature_plan
+FEATURE_PLAN_VERSION = 1
+
+def read_enriched_dataset(file_path: str, columns: List[str] = None) -> pd.DataFrame:
+    """Reads the enriched dataset from disk, optionally only some of its columns."""
     try:
         # Read the enriched dataset from disk
-        enriched_dataset = pd.read_csv(file_path)
+        enriched_dataset = read_table(file_path, columns)
         return enriched_dataset
     except FileNotFoundError as e:
         error_msg = f"File '{file_path}' not found."
@@ -82,36 +89,221 @@ def perform_feature_multiplication(features: pd.DataFrame, columns: List[str]) -
             features[new_feature_name] = features[col_a] * features[col_b]
     return features
 
-def generate_features(data: pd.DataFrame, feature_config: dict) -> pd.DataFrame:
-    """Generate additional features from the input data."""
-    logger.debug("Generating additional features from input data.")
+@dataclass
+class FeaturePlan:
+    """Validated, dependency-ordered set of derived feature computations.
+
+    Attributes:
+        input_columns (List[str]): Source columns the plan reads that it does not derive itself.
+        steps (List[tuple]): ``(operation, target, sources)`` triples in execution order.
+        output_columns (List[str]): Columns the plan is meant to produce, e.g. a model's
+            selected features; empty if the plan was not pruned to specific outputs.
+    """
+    input_columns: List[str] = field(default_factory=list)
+    steps: List[tuple] = field(default_factory=list)
+    output_columns: List[str] = field(default_factory=list)
+
+    @property
+    def derived_columns(self) -> List[str]:
+        """Names of the derived columns, in the order they are first produced."""
+        return list(dict.fromkeys(target for _, target, _ in self.steps))
+
+    def to_dict(self) -> dict:
+        """Convert the plan to plain lists and strings for JSON serialization."""
+        return {
+            "version": FEATURE_PLAN_VERSION,
+            "input_columns": list(self.input_columns),
+            "steps": [[operation, target, list(sources)] for operation, target, sources in self.steps],
+            "output_columns": list(self.output_columns),
+        }
+
+    @classmethod
+    def from_dict(cls, plan: dict) -> "FeaturePlan":
+        """Rebuild a plan from the output of :meth:`to_dict`."""
+        if plan.get("version") != FEATURE_PLAN_VERSION:
+            raise ValueError(f"Unsupported feature plan version: {plan.get('version')}")
+        return cls(
+            input_columns=list(plan["input_columns"]),
+            steps=[(operation, target, tuple(sources)) for operation, target, sources in plan["steps"]],
+            output_columns=list(plan.get("output_columns", [])),
+        )
+
+def _require_columns(available: dict, columns: List[str]) -> None:
+    """Check that the specified columns are available to the plan."""
+    for column in columns:
+        if column not in available:
+            error_message = f"Column '{column}' required for feature calculation is missing."
+            logger.error(error_message)
+            raise ValueError(error_message)
+
+def compile_feature_plan(feature_config: dict, columns: List[str]) -> FeaturePlan:
+    """Validate the feature config once and resolve it into a feature plan.
+
+    Args:
+        feature_config (dict): The ``generate_features`` section of the config.
+        columns (List[str]): Columns available in the input data.
+
+    Returns:
+        FeaturePlan: Plan that can be applied to any frame with these columns.
 
-    # Copy the DataFrame to avoid modifying the original data
-    features = data.copy()
+    Raises:
+        KeyError: If the config contains an unknown feature type.
+        ValueError: If a feature depends on a column that is not available.
+    """
+    # Map each available column to whether it is derived by the plan
+    available = dict.fromkeys(columns, False)
+    input_columns = []
+    steps = []
 
-    # Convert columns to float
-    features = convert_columns_to_float(features)
+    def add_step(operation: str, target: str, sources: tuple) -> None:
+        _require_columns(available, sources)
+        for source in sources:
+            if not available[source] and source not in input_columns:
+                input_columns.append(source)
+        steps.append((operation, target, sources))
+        available[target] = True
 
-    # Iterate over each feature type to generate
-    for feature_type, columns in feature_config.items():
+    for feature_type, feature_columns in feature_config.items():
         if feature_type == "calculate_range":
-            logger.debug("Calculating range features.")
-            features = calculate_range_features(features, columns)
+            for column in feature_columns:
+                add_step("range", f"{column}_range", (f"{column}_max", f"{column}_min"))
         elif feature_type == "calculate_norm_range":
-            logger.debug("Calculating normalized range features.")
-            features = calculate_normalized_range_features(features, columns)
+            for column in feature_columns:
+                add_step("norm_range", f"{column}_norm_range",
+                         (f"{column}_min", f"{column}_max", f"{column}_mean"))
         elif feature_type == "log_transform":
-            logger.debug("Performing log transformation.")
-            features = perform_log_transformation(features, columns)
+            for column in feature_columns:
+                add_step("log", f"log_{column}", (column,))
         elif feature_type == "multiply":
-            logger.debug("Performing multiplication of features.")
-            features = perform_feature_multiplication(features, columns)
+            for i in range(len(feature_columns) - 1):
+                for j in range(i + 1, len(feature_columns)):
+                    col_a = feature_columns[i]
+                    col_b = feature_columns[j]
+                    new_feature_name = f"{col_a}_x_{col_b}"
+                    if new_feature_name in available:
+                        warning_message = (
+                            f"New feature '{new_feature_name}' already exists in the DataFrame. "
+                            "Will be overwritten"
+                        )
+                        logger.warning(warning_message)
+                    add_step("multiply", new_feature_name, (col_a, col_b))
         else:
             raise KeyError(f"Invalid feature type: {feature_type}")
 
+    logger.debug("Compiled feature plan with %d steps.", len(steps))
+    return FeaturePlan(input_columns=input_columns, steps=steps)
+
+def prune_feature_plan(plan: FeaturePlan, outputs: List[str]) -> FeaturePlan:
+    """Reduce a plan to the steps and raw inputs needed for the given outputs.
+
+    Args:
+        plan (FeaturePlan): Plan produced by :func:`compile_feature_plan`.
+        outputs (List[str]): Columns that must be produced, e.g. a model's selected features.
+
+    Returns:
+        FeaturePlan: Plan whose ``input_columns`` are the raw columns the outputs depend on.
+    """
+    needed = set(outputs)
+    steps = []
+    for operation, target, sources in reversed(plan.steps):
+        if target in needed:
+            steps.append((operation, target, sources))
+            needed.discard(target)
+            needed.update(sources)
+    steps.reverse()
+
+    ordered = [column for column in plan.input_columns + list(outputs) if column in needed]
+    return FeaturePlan(input_columns=list(dict.fromkeys(ordered)), steps=steps, output_columns=list(outputs))
+
+def apply_feature_plan(data: pd.DataFrame, plan: FeaturePlan, checked: bool = False) -> pd.DataFrame:
+    """Compute every derived column of a feature plan in a single pass.
+
+    All columns of ``data`` are converted to float and copied once into a
+    contiguous column-major block that also holds the derived columns, and
+    the resulting DataFrame is assembled from that block at the end.
+
+    Args:
+        data (pd.DataFrame): Input data containing the plan's input columns.
+        plan (FeaturePlan): Plan produced by :func:`compile_feature_plan`.
+        checked (bool): Skip the zero-mean and missing-value scans of normalized
+            ranges over input columns, for data that :mod:`src.validate_data`
+            already checked; ranges over derived columns are always scanned.
+
+    Returns:
+        pd.DataFrame: Input columns as float followed by the new derived columns.
+
+    Raises:
+        ValueError: If an input column is missing, or a normalized range has
+            zero means or missing values.
+    """
+    _require_columns(dict.fromkeys(data.columns), plan.input_columns)
+    inputs = set(plan.input_columns)
+
+    names = list(data.columns)
+    positions = {name: i for i, name in enumerate(names)}
+    for target in plan.derived_columns:
+        if target not in positions:
+            positions[target] = len(names)
+            names.append(target)
+
+    block = np.empty((len(data), len(names)), dtype=np.float64, order="F")
+    block[:, :data.shape[1]] = data.to_numpy(dtype=np.float64)
+
+    for operation, target, sources in plan.steps:
+        out = block[:, positions[target]]
+        args = [block[:, positions[source]] for source in sources]
+        if operation == "range":
+            np.subtract(args[0], args[1], out=out)
+        elif operation == "norm_range":
+            min_values, max_values, mean_values = args
+            # Validation only checks input columns, not columns derived by earlier steps
+            scan = not checked or not inputs.issuperset(sources)
+            if scan and (mean_values == 0).any():
+                raise ValueError(f"Column '{sources[2]}' has zero mean value.")
+            if scan and any(np.isnan(values).any() for values in args):
+                raise ValueError("One or more columns have missing values.")
+            np.divide(max_values - min_values, mean_values, out=out)
+        elif operation == "log":
+            np.log(args[0], out=out)
+        elif operation == "multiply":
+            np.multiply(args[0], args[1], out=out)
+
+    return pd.DataFrame(block, index=data.index, columns=names, copy=False)
+
+def generate_features(data: pd.DataFrame, feature_config: dict, checked: bool = False) -> pd.DataFrame:
+    """Generate additional features from the input data; see :func:`apply_feature_plan` for ``checked``."""
+    logger.debug("Generating additional features from input data.")
+
+    # Validate the config and resolve column dependencies once
+    plan = compile_feature_plan(feature_config, list(data.columns))
+
+    # Compute all derived columns in one pass over a single float block
+    features = apply_feature_plan(data, plan, checked)
+
     logger.info("Feature generation completed.")
     return features
 
+def save_feature_plan(plan: FeaturePlan, save_path: Path) -> None:
+    """Save a feature plan to disk as JSON.
+
+    Args:
+        plan (FeaturePlan): Plan to save.
+        save_path (Path): Path to save the plan.
+    """
+    logger.debug("Saving feature plan to %s.", save_path)
+    try:
+        with open(save_path, "w") as f:
+            json.dump(plan.to_dict(), f, indent=2)
+        logger.info("Feature plan saved to %s", save_path)
+    except Exception as e:
+        logger.error("Error occurred while trying to save feature plan: %s", e)
+        raise
+
+def load_feature_plan(file_path: Path) -> FeaturePlan:
+    """Load a feature plan saved by :func:`save_feature_plan`."""
+    with open(file_path, "r") as f:
+        return FeaturePlan.from_dict(json.load(f))
+
 def calculate_norm_range(features: pd.DataFrame, min_col: str, max_col: str, mean_col: str) -> pd.Series:
     """Calculate normalized range feature."""
     logger.debug("Calculating normalized range feature.")
@@ -126,16 +318,17 @@ def calculate_norm_range(features: pd.DataFrame, min_col: str, max_col: str, mea
 
     return (features[max_col] - features[min_col]) / features[mean_col]
 
-def save_enriched_dataset(dataset: pd.DataFrame, save_path: Path) -> None:
+def save_enriched_dataset(dataset: pd.DataFrame, save_path: Path, compression: str = None) -> None:
     """Save structured dataset to disk.
 
     Args:
         dataset (pd.DataFrame): DataFrame containing the structured dataset.
-        save_path (Path): Path to save the dataset.
+        save_path (Path): Path to save the dataset; the suffix selects the format.
+        compression (str): Compression codec for columnar formats.
     """
     logger.debug("Saving enriched dataset to disk.")
     try:
-        dataset.to_csv(save_path, index=False)
+        write_table(dataset, save_path, compression)
         logger.info("Dataset saved to %s", save_path)
     except Exception as e:
         logger.error("Error occurred while trying to save dataset: %s", e)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from src.artifact_store import FORMATS, read_table, write_table
+from src.create_dataset import parse_class_rows
+from src.generate_features import generate_features
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+def _settings_hash(settings) -> str:
+    """Hash the settings that determine the contents of a partition."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+def _block_hash(path: Path, start: int, end: int, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 of bytes ``[start, end)`` of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def _count_lines(path: Path, start: int, chunk_size: int = 1 << 20) -> tuple:
+    """Count the complete lines from byte ``start`` to the end of a file.
+
+    A last line without a newline may still be being written, so it is not counted.
+
+    Returns:
+        tuple: Number of complete lines and the byte offset just after the last newline.
+    """
+    lines = 0
+    end = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            newlines = chunk.count(b"\n")
+            if newlines:
+                lines += newlines
+                end = position + chunk.rindex(b"\n") + 1
+            position += len(chunk)
+    return lines, end
+
+def _empty_manifest() -> dict:
+    """Return the manifest of an empty store."""
+    return {"version": MANIFEST_VERSION, "dataset_settings": None, "feature_settings": None, "partitions": []}
+
+def load_manifest(store_dir: Path) -> dict:
+    """Load the manifest of a partitioned dataset store, or an empty one if there is none."""
+    path = Path(store_dir) / MANIFEST
+    if not path.exists():
+        return _empty_manifest()
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest: dict, store_dir: Path) -> None:
+    """Save the manifest of a partitioned dataset store atomically."""
+    path = Path(store_dir) / MANIFEST
+    tmp_path = path.with_name(f"{MANIFEST}.tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _drop_partitions(store_dir: Path, partitions: list, kinds: tuple = ("dataset", "features")) -> None:
+    """Delete the files of the given partitions."""
+    for partition in partitions:
+        for kind in kinds:
+            if partition.get(kind):
+                (Path(store_dir) / partition[kind]).unlink(missing_ok=True)
+
+def append_dataset(raw_path: Path, store_dir: Path, class_indices: list, columns: list, fmt: str = "parquet",
+                   compression: str = None, chunk_size: int = 10000) -> dict:
+    """Parse only the new or changed part of the raw file into the partitioned dataset store.
+
+    Every partition records the byte and line range of the raw file it was
+    parsed from and the SHA-256 of those bytes. On each call the stored
+    partitions are checked against the current file in order; the first
+    partition whose bytes changed and all later ones are dropped, and
+    everything after the last unchanged partition is parsed into one new
+    partition. Partitions end at the last newline; a trailing line without one
+    is left for the next call. A change of ``class_indices``, ``columns`` or ``fmt`` rebuilds the store.
+
+    Args:
+        raw_path (Path): Raw data file.
+        store_dir (Path): Directory of the partitioned store; kept across runs.
+        class_indices (list): Start and end line indices of each class; see
+            :func:`src.create_dataset.iter_class_rows`.
+        columns (list): Column names of the raw values.
+        fmt (str): Artifact format of the partition files.
+        compression (str): Compression codec for columnar formats.
+        chunk_size (int): Number of rows parsed at a time.
+
+    Returns:
+        dict: The updated manifest.
+    """
+    store_dir = Path(store_dir)
+    (store_dir / "dataset").mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    settings = _settings_hash({"class_indices": class_indices, "columns": columns, "format": fmt,
+                               "compression": compression})
+    if manifest["dataset_settings"] != settings:
+        if manifest["partitions"]:
+            logger.info("Dataset settings changed; rebuilding the incremental store.")
+        _drop_partitions(store_dir, manifest["partitions"])
+        manifest = {**_empty_manifest(), "dataset_settings": settings}
+
+    # Keep the partitions whose raw bytes are unchanged
+    raw_size = Path(raw_path).stat().st_size
+    kept = []
+    for partition in manifest["partitions"]:
+        if partition["end_offset"] > raw_size or \
+                _block_hash(raw_path, partition["start_offset"], partition["end_offset"]) != partition["sha256"]:
+            break
+        kept.append(partition)
+    dropped = manifest["partitions"][len(kept):]
+    if dropped:
+        logger.info("Raw data changed from line %d; reprocessing %d partition(s).", dropped[0]["start_line"],
+                    len(dropped))
+        _drop_partitions(store_dir, dropped)
+    manifest["partitions"] = kept
+
+    start_offset = kept[-1]["end_offset"] if kept else 0
+    start_line = kept[-1]["end_line"] if kept else 0
+    n_lines, end_offset = _count_lines(raw_path, start_offset)
+    if end_offset == start_offset:
+        logger.info("No new raw data since the last run.")
+        save_manifest(manifest, store_dir)
+        return manifest
+
+    # Stop at the last complete line, so that a line still being written is parsed on the next run
+    end_line = start_line + n_lines
+    bounded = [[start, end_line if end is None else min(end, end_line)] for start, end in class_indices]
+    delta = parse_class_rows(raw_path, bounded, columns, chunk_size, start_line, start_offset)
+    name = f"part-{start_line:09d}"
+    partition = {"name": name, "start_line": start_line, "end_line": end_line,
+                 "start_offset": start_offset, "end_offset": end_offset,
+                 "sha256": _block_hash(raw_path, start_offset, end_offset), "rows": len(delta),
+                 "dataset": None, "features": None}
+    if len(delta):
+        partition["dataset"] = f"dataset/{name}{FORMATS[fmt]}"
+        write_table(delta, store_dir / partition["dataset"], compression)
+    manifest["partitions"].append(partition)
+    save_manifest(manifest, store_dir)
+    logger.info("Appended %d rows from lines %d-%d to the incremental store.", len(delta), start_line,
+                end_line)
+    return manifest
+
+def append_features(store_dir: Path, feature_config: dict, compression: str = None) -> dict:
+    """Generate features only for the dataset partitions that do not have them yet.
+
+    The features are computed row by row, so each partition is featurized on
+    its own. A change of ``feature_config`` regenerates the features of every partition.
+
+    Args:
+        store_dir (Path): Directory of the partitioned store.
+        feature_config (dict): The ``generate_features`` configuration.
+        compression (str): Compression codec for columnar formats.
+
+    Returns:
+        dict: The updated manifest.
+    """
+    store_dir = Path(store_dir)
+    (store_dir / "features").mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    settings = _settings_hash(feature_config)
+    if manifest["feature_settings"] != settings:
+        _drop_partitions(store_dir, manifest["partitions"], ("features",))
+        for partition in manifest["partitions"]:
+            partition["features"] = None
+        manifest["feature_settings"] = settings
+
+    featurized = 0
+    for partition in manifest["partitions"]:
+        if partition["dataset"] is None or partition["features"] is not None:
+            continue
+        dataset_path = store_dir / partition["dataset"]
+        features = generate_features(read_table(dataset_path), feature_config)
+        partition["features"] = f"features/{partition['name']}{dataset_path.suffix}"
+        write_table(features, store_dir / partition["features"], compression)
+        featurized += partition["rows"]
+    save_manifest(manifest, store_dir)
+    logger.info("Generated features for %d new rows.", featurized)
+    return manifest
+
+def read_store(store_dir: Path, kind: str = "dataset", columns: list = None) -> pd.DataFrame:
+    """Read all partitions of the store in line order.
+
+    Args:
+        store_dir (Path): Directory of the partitioned store.
+        kind (str): ``dataset`` or ``features``.
+        columns (list): Columns to read; ``None`` reads all columns.
+
+    Returns:
+        pd.DataFrame: The concatenated partitions.
+    """
+    manifest = load_manifest(store_dir)
+    frames = [read_table(Path(store_dir) / partition[kind], columns)
+              for partition in manifest["partitions"] if partition.get(kind)]
+    if not frames:
+        raise ValueError(f"The incremental store in '{store_dir}' has no {kind} partitions.")
+    return pd.concat(frames, ignore_index=True)
+
+def store_fingerprint(manifest: dict) -> str:
+    """Return a hash of the store's contents, for use as an upstream stage cache key."""
+    return _settings_hash([manifest["dataset_settings"], manifest["feature_settings"],
+                           [partition["sha256"] for partition in manifest["partitions"]]])
@@ -0,0 +1,46 @@
+import importlib
+import threading
+import time
+
+# Seconds each lazily imported module took to import, in the order they were first used
+_import_times = {}
+_lock = threading.Lock()
+
+class LazyModule:
+    """Stand-in for a module that is only imported when one of its attributes is first used.
+
+    Commands that never touch a stage module do not pay for importing it and its
+    dependencies (e.g. boto3, matplotlib or scikit-learn). The time of the import
+    is recorded for :func:`import_times`; a module whose dependencies were
+    already imported by another module is correspondingly cheaper.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            # import_module is thread-safe; concurrent first uses wait for the same import
+            module = importlib.import_module(self._name)
+            with _lock:
+                _import_times.setdefault(self._name, time.perf_counter() - start)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "imported" if self._module is not None else "not imported"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a module stand-in that imports ``name`` on first attribute access."""
+    return LazyModule(name)
+
+def import_times() -> dict:
+    """Return the import time in seconds of every lazily imported module used so far."""
+    with _lock:
+        return dict(_import_times)
@@ -0,0 +1,133 @@
+import cProfile
+import datetime
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+def new_report() -> dict:
+    """Create an empty run profile."""
+    return {
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        "stages": [],
+        "_start": time.perf_counter(),
+    }
+
+def _peak_rss_mb(who: int) -> Optional[float]:
+    """Return the peak resident set size of this process or its children in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def _children_cpu_time() -> float:
+    """Return the CPU time used by terminated child processes in seconds."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def frame_size(data) -> tuple:
+    """Return the number of rows and in-memory bytes of a DataFrame or Series."""
+    # Imported here so that commands which never hold a frame do not import pandas
+    import pandas as pd
+    if isinstance(data, pd.DataFrame):
+        return len(data), int(data.memory_usage(index=True).sum())
+    if isinstance(data, pd.Series):
+        return len(data), int(data.memory_usage(index=True))
+    return None, None
+
+def path_size(path: Path) -> int:
+    """Return the size in bytes of a file, or of all files below a directory."""
+    path = Path(path)
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+@contextmanager
+def profile_stage(report: dict, stage: str, cprofile_dir: Optional[Path] = None):
+    """Record wall time, CPU time and peak memory of a pipeline stage.
+
+    The yielded dict is added to ``report["stages"]``; the caller can add
+    ``rows_in``, ``bytes_in``, ``rows_out`` and ``bytes_out`` to it (see
+    :func:`frame_size` and :func:`path_size`). If ``cprofile_dir`` is given,
+    the stage also runs under cProfile and its stats are written to
+    ``<cprofile_dir>/<stage>.prof``. CPU time is measured for the whole process,
+    so it includes the work of stages that run at the same time.
+
+    Peak memory is the process-wide high-water mark (``ru_maxrss``), not the
+    stage's own peak: ``process_peak_rss_mb`` is its value when the stage
+    ends, and ``peak_rss_increase_mb`` how much the stage raised it. A stage
+    that stays below an earlier peak shows no increase, and stages running at
+    the same time share the increase.
+
+    Args:
+        report (dict): Run profile from :func:`new_report`.
+        stage (str): Name of the stage.
+        cprofile_dir (Path): Directory for cProfile dumps; ``None`` disables cProfile.
+
+    Yields:
+        dict: The stage record.
+    """
+    record = {"stage": stage}
+    profiler = cProfile.Profile() if cprofile_dir else None
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_children_cpu = _children_cpu_time()
+    start_peak_rss = _peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+    if profiler:
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Only one profiler can be active at a time on Python 3.12+
+            logger.warning("cProfile not enabled for stage %s: %s", stage, e)
+            profiler = None
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException:
+        record["status"] = "failed"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+            Path(cprofile_dir).mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(Path(cprofile_dir) / f"{stage}.prof")
+        record["wall_time_s"] = time.perf_counter() - start_wall
+        record["cpu_time_s"] = time.process_time() - start_cpu
+        record["children_cpu_time_s"] = _children_cpu_time() - start_children_cpu
+        record["process_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+        record["peak_rss_increase_mb"] = (record["process_peak_rss_mb"] - start_peak_rss) if resource else None
+        record["children_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+        report["stages"].append(record)
+        logger.debug("Stage %s took %.2f s wall, %.2f s CPU.", stage, record["wall_time_s"],
+                     record["cpu_time_s"])
+
+def write_profile(report: dict, save_path: Path) -> None:
+    """Save the run profile to disk as JSON.
+
+    Args:
+        report (dict): Run profile from :func:`new_report`.
+        save_path (Path): Path to save the profile.
+    """
+    profile = {key: value for key, value in report.items() if not key.startswith("_")}
+    profile["wall_time_s"] = time.perf_counter() - report["_start"]
+    profile["stages_wall_time_s"] = sum(stage["wall_time_s"] for stage in report["stages"])
+    try:
+        with open(save_path, "w") as f:
+            json.dump(profile, f, indent=2)
+        logger.info("Run profile saved to %s", save_path)
+    except Exception as e:
+        logger.error("Error occurred while saving run profile: %s", e)
+        raise
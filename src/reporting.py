@@ -0,0 +1,247 @@
+import html
+import json
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Output formats; only png imports matplotlib
+FORMATS = ("png", "html", "json")
+
+# Size in inches of the one figure every chart is drawn on
+FIGURE_SIZE = (8, 6)
+
+# Bars of the metrics chart and where to find them in the evaluation metrics
+BAR_METRICS = {
+    "Accuracy": ("accuracy",),
+    "AUC": ("auc",),
+    "F1-Score": ("classification_report", "macro avg", "f1-score"),
+    "Precision": ("classification_report", "macro avg", "precision"),
+    "Recall": ("classification_report", "macro avg", "recall"),
+}
+
+def _thin(n: int, max_points: int) -> np.ndarray:
+    """Return at most ``max_points`` evenly spaced indices of ``n`` points, keeping both ends."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
+
+def metric_bars(metrics: dict) -> dict:
+    """Return the values of the metrics bar chart that are present in the evaluation metrics."""
+    bars = {}
+    for label, keys in BAR_METRICS.items():
+        value = metrics
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            bars[label] = float(value)
+    return bars
+
+def curves(sweep: pd.DataFrame, max_points: int = 500) -> dict:
+    """Build the ROC and precision-recall curves from a threshold sweep without re-sorting the scores.
+
+    Args:
+        sweep (pd.DataFrame): Threshold sweep from :func:`src.evaluate_performance.threshold_sweep`.
+        max_points (int): Maximum number of points kept per curve.
+
+    Returns:
+        dict: ``roc`` with ``fpr`` and ``tpr``, and ``pr`` with ``recall`` and ``precision`` lists.
+    """
+    tp, fp = sweep["tp"].to_numpy(dtype=float), sweep["fp"].to_numpy(dtype=float)
+    positives = float(sweep["tp"].iloc[0] + sweep["fn"].iloc[0])
+    negatives = float(sweep["fp"].iloc[0] + sweep["tn"].iloc[0])
+    # The sweep stops above the lowest score; every sample predicted positive closes both curves
+    tp, fp = np.r_[tp, positives], np.r_[fp, negatives]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tpr = tp / positives if positives else np.zeros_like(tp)
+        fpr = fp / negatives if negatives else np.zeros_like(fp)
+        precision = tp / (tp + fp)
+    roc = _thin(len(tp), max_points)
+    # Precision is undefined where nothing is predicted positive
+    predicted = np.flatnonzero(tp + fp > 0)
+    pr = predicted[_thin(len(predicted), max_points)]
+    return {"roc": {"fpr": fpr[roc].tolist(), "tpr": tpr[roc].tolist()},
+            "pr": {"recall": tpr[pr].tolist(), "precision": precision[pr].tolist()}}
+
+def build_report(metrics: dict, sweep: pd.DataFrame = None, max_points: int = 500) -> dict:
+    """Collect the data of every evaluation chart, so that each output format only draws it.
+
+    Args:
+        metrics (dict): Evaluation metrics from :func:`src.evaluate_performance.evaluate_performance`.
+        sweep (pd.DataFrame): Threshold sweep for the ROC and precision-recall curves; without
+            it the report only holds the metrics bars.
+        max_points (int): Maximum number of points kept per curve.
+
+    Returns:
+        dict: ``metrics`` bar values and, with a sweep, the ``roc`` and ``pr`` curves.
+    """
+    report = {"metrics": metric_bars(metrics)}
+    if sweep is not None and len(sweep):
+        report.update(curves(sweep, max_points))
+    return report
+
+def _draw_bars(ax, report: dict) -> None:
+    bars = report["metrics"]
+    ax.bar(list(bars), list(bars.values()), color="skyblue")
+    ax.set_xlabel("Metrics")
+    ax.set_ylabel("Value")
+    ax.set_title("Evaluation Metrics")
+    ax.grid(axis="y")
+    # Truncate the axis at 0.8 unless a metric is lower
+    ax.set_ylim(bottom=max(0.0, min(0.8, min(bars.values()) - 0.05)), top=1.0)
+
+def _draw_roc(ax, report: dict) -> None:
+    ax.plot(report["roc"]["fpr"], report["roc"]["tpr"])
+    ax.plot([0, 1], [0, 1], linestyle="--", color="#888b8d", linewidth=1)
+    ax.set_xlabel("False positive rate")
+    ax.set_ylabel("True positive rate")
+    ax.set_title("ROC Curve")
+
+def _draw_pr(ax, report: dict) -> None:
+    ax.plot(report["pr"]["recall"], report["pr"]["precision"])
+    ax.set_xlabel("Recall")
+    ax.set_ylabel("Precision")
+    ax.set_title("Precision-Recall Curve")
+
+# File name, report key and drawing function of each chart
+CHARTS = (("metrics_bar_chart", "metrics", _draw_bars), ("roc_curve", "roc", _draw_roc),
+          ("pr_curve", "pr", _draw_pr))
+
+def render_figures(report: dict, save_dir: Path) -> list[Path]:
+    """Draw every chart of the report on one reused figure and save each as PNG.
+
+    Args:
+        report (dict): Report from :func:`build_report`.
+        save_dir (Path): Directory to save the figures to.
+
+    Returns:
+        list[Path]: Paths of the saved figures.
+    """
+    import matplotlib.pyplot as plt
+
+    saved_paths = []
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE)
+    try:
+        for name, key, draw in CHARTS:
+            if not report.get(key):
+                continue
+            ax.clear()
+            draw(ax, report)
+            fig.savefig(Path(save_dir) / f"{name}.png")
+            saved_paths.append(Path(save_dir) / f"{name}.png")
+            logger.debug("Figure saved: %s", saved_paths[-1])
+    finally:
+        # Close the figure to release memory
+        plt.close(fig)
+    return saved_paths
+
+def _svg_chart(title: str, x_label: str, y_label: str, body: str, width: int = 360, height: int = 270) -> str:
+    """Wrap chart contents drawn on a unit square in an SVG with axes and labels."""
+    return (f'<figure><figcaption>{html.escape(title)}</figcaption>'
+            f'<svg viewBox="-0.15 -0.05 1.2 1.2" width="{width}" height="{height}" '
+            f'font-size="0.05" font-family="sans-serif">'
+            f'<g transform="translate(0,1) scale(1,-1)">'
+            f'<path d="M0 1V0H1" fill="none" stroke="#677385" stroke-width="0.005"/>{body}</g>'
+            f'<text x="0.5" y="1.1" text-anchor="middle">{html.escape(x_label)}</text>'
+            f'<text transform="translate(-0.1,0.5) rotate(-90)" text-anchor="middle">'
+            f'{html.escape(y_label)}</text></svg></figure>')
+
+def _svg_line(x: list, y: list, color: str = "#0085ca") -> str:
+    points = " ".join(f"{a:.4f},{b:.4f}" for a, b in zip(x, y))
+    return f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="0.008"/>'
+
+def to_html(report: dict) -> str:
+    """Render the report as a self-contained HTML page with inline SVG charts; matplotlib is not used."""
+    bars = report["metrics"]
+    rows = "".join(f"<tr><td>{html.escape(name)}</td><td>{value:.4f}</td></tr>" for name, value in bars.items())
+    charts = []
+    if bars:
+        width = 1 / len(bars)
+        body = "".join(f'<rect x="{i * width + width * 0.1:.4f}" y="0" width="{width * 0.8:.4f}" '
+                       f'height="{min(max(value, 0.0), 1.0):.4f}" fill="skyblue"/>'
+                       for i, value in enumerate(bars.values()))
+        charts.append(_svg_chart("Evaluation Metrics", " / ".join(bars), "Value", body))
+    if report.get("roc"):
+        body = _svg_line([0, 1], [0, 1], "#888b8d") + _svg_line(report["roc"]["fpr"], report["roc"]["tpr"])
+        charts.append(_svg_chart("ROC Curve", "False positive rate", "True positive rate", body))
+    if report.get("pr"):
+        body = _svg_line(report["pr"]["recall"], report["pr"]["precision"])
+        charts.append(_svg_chart("Precision-Recall Curve", "Recall", "Precision", body))
+    return ("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Evaluation Report</title>"
+            "<style>body{font-family:sans-serif;color:#677385}figure{display:inline-block}"
+            "td{padding:0 1em}</style></head><body><h1>Evaluation Report</h1>"
+            f"<table>{rows}</table>{''.join(charts)}</body></html>")
+
+def save_report(report: dict, save_dir: Path, formats: list) -> list[Path]:
+    """Save the report in each of the given formats.
+
+    ``html`` and ``json`` are written without matplotlib; ``png`` draws the
+    figures in this process, see :func:`render_in_background` to draw them in
+    a worker instead.
+
+    Args:
+        report (dict): Report from :func:`build_report`.
+        save_dir (Path): Directory to save to.
+        formats (list): Any of ``png``, ``html`` and ``json``.
+
+    Returns:
+        list[Path]: The saved files.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown report formats {unknown}; expected any of {list(FORMATS)}.")
+    save_dir = Path(save_dir)
+    saved_paths = []
+    try:
+        if "json" in formats:
+            with open(save_dir / "evaluation_report.json", "w") as f:
+                json.dump(report, f)
+            saved_paths.append(save_dir / "evaluation_report.json")
+        if "html" in formats:
+            (save_dir / "evaluation_report.html").write_text(to_html(report))
+            saved_paths.append(save_dir / "evaluation_report.html")
+        if "png" in formats:
+            saved_paths += render_figures(report, save_dir)
+        logger.info("Evaluation report saved to %s", save_dir)
+    except Exception as e:
+        logger.error("Error occurred while saving the evaluation report: %s", e)
+        raise
+    return saved_paths
+
+def _init_worker() -> None:
+    """Set up a rendering worker with the Agg backend and the shared figure style, once."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from src.analysis import update_matplotlib_defaults
+    update_matplotlib_defaults()
+
+def render_in_background(report: dict, save_dir: Path) -> Future:
+    """Start drawing the report's PNG figures in a worker process and return at once.
+
+    matplotlib is imported and styled in the worker only, so the caller neither
+    pays for it nor has to keep pyplot, which is not thread-safe, away from
+    other stages running in its threads.
+
+    Args:
+        report (dict): Report from :func:`build_report`.
+        save_dir (Path): Directory to save the figures to.
+
+    Returns:
+        Future: Resolves to the paths of the saved figures.
+    """
+    # Spawned workers do not inherit the locks of threads running other pipeline stages
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker)
+    try:
+        return pool.submit(render_figures, report, Path(save_dir))
+    finally:
+        # The worker finishes the submitted figures and exits
+        pool.shutdown(wait=False)
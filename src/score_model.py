@@ -1,11 +1,53 @@
 import logging
 import time
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from src.artifact_store import iter_table, read_table, write_table
+
 # Define logger
 logger = logging.getLogger(__name__)
 
-def score_model(test: pd.DataFrame, y_test: pd.Series, model, initial_features: list) -> pd.DataFrame:
+def predict_positive_probabilities(model, features: pd.DataFrame, batch_size: int = None) -> np.ndarray:
+    """Run inference once and return the probability of the positive class.
+
+    Args:
+        model: Trained binary classifier with a ``predict_proba`` method.
+        features (pd.DataFrame): Features to score, in the order the model expects.
+        batch_size (int): Maximum number of rows scored at a time; ``None`` scores all rows at once.
+
+    Returns:
+        np.ndarray: Positive-class probability for every row.
+    """
+    if not batch_size:
+        return model.predict_proba(features)[:, 1]
+
+    probabilities = np.empty(len(features), dtype=np.float64)
+    for start in range(0, len(features), batch_size):
+        batch = features.iloc[start:start + batch_size]
+        probabilities[start:start + len(batch)] = model.predict_proba(batch)[:, 1]
+    return probabilities
+
+def labels_from_probabilities(probabilities: np.ndarray, classes: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """Derive binary predictions from positive-class probabilities.
+
+    A row is assigned the positive class when its probability is strictly
+    above the threshold, which reproduces ``model.predict`` at 0.5.
+
+    Args:
+        probabilities (np.ndarray): Positive-class probabilities.
+        classes (np.ndarray): The model's ``classes_``, negative class first.
+        threshold (float): Decision threshold.
+
+    Returns:
+        np.ndarray: Predicted labels.
+    """
+    return np.where(probabilities > threshold, classes[1], classes[0])
+
+def score_model(test: pd.DataFrame, y_test: pd.Series, model, initial_features: list,
+                threshold: float = 0.5, batch_size: int = None) -> pd.DataFrame:
     """Score the model on the test set and return a DataFrame with true labels, 
     predicted probabilities, and binary predictions.
 
@@ -14,14 +56,16 @@ def score_model(test: pd.DataFrame, y_test: pd.Series, model, initial_features:
         y_test (pd.Series): Series containing the true labels for the test set.
         model: Trained machine learning model.
         initial_features (list): List of initial features used for prediction.
+        threshold (float): Probability above which a row is labelled as the positive class.
+        batch_size (int): Maximum number of rows scored at a time; ``None`` scores all rows at once.
 
     Returns:
         pd.DataFrame: DataFrame containing true labels, predicted probabilities, and binary predictions.
     """
     logger.debug("Scoring the model on the test set.")
     start_time = time.time()
-    y_pred_proba = model.predict_proba(test[initial_features])[:, 1]
-    y_pred_bin = model.predict(test[initial_features])
+    y_pred_proba = predict_positive_probabilities(model, test[initial_features], batch_size)
+    y_pred_bin = labels_from_probabilities(y_pred_proba, model.classes_, threshold)
     end_time = time.time()
     logger.info("Scoring completed.")
     logger.debug("Scoring completed in %.2f seconds.", end_time - start_time)
@@ -35,27 +79,64 @@ def score_model(test: pd.DataFrame, y_test: pd.Series, model, initial_features:
 
     return scores
 
+def score_file(data_path: Path, save_path: Path, model, initial_features: list, target: str = "class",
+               threshold: float = 0.5, batch_size: int = 100000) -> int:
+    """Score a dataset on disk in batches and append the scores to a file.
+
+    Only one batch of rows is held in memory at a time, so the input may be
+    larger than the available memory.
+
+    Args:
+        data_path (Path): Artifact with the features and the target column.
+        save_path (Path): CSV file to write the scores to.
+        model: Trained machine learning model.
+        initial_features (list): List of initial features used for prediction.
+        target (str): Name of the column holding the true labels.
+        threshold (float): Probability above which a row is labelled as the positive class.
+        batch_size (int): Number of rows read and scored at a time.
+
+    Returns:
+        int: Number of rows scored.
+    """
+    logger.debug("Scoring %s in batches of %d rows.", data_path, batch_size)
+    start_time = time.time()
+    n_rows = 0
+    try:
+        batches = iter_table(data_path, initial_features + [target], batch_size)
+        for i, batch in enumerate(batches):
+            scores = score_model(batch, batch[target], model, initial_features, threshold)
+            scores.to_csv(save_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            n_rows += len(batch)
+    except Exception as e:
+        logger.error("Error occurred while scoring %s: %s", data_path, e)
+        raise
+    logger.info("Scored %d rows from %s.", n_rows, data_path)
+    logger.debug("Batch scoring completed in %.2f seconds.", time.time() - start_time)
+    return n_rows
+
 
-def save_scores(scores: pd.DataFrame, save_path: str) -> None:
+def save_scores(scores: pd.DataFrame, save_path: str, compression: str = None) -> None:
     """Save the model scores to disk.
 
     Args:
         scores (pd.DataFrame): DataFrame containing model scores.
-        save_path (str): Path to save the scores.
+        save_path (str): Path to save the scores; the suffix selects the format.
+        compression (str): Compression codec for columnar formats.
     """
     logger.debug("Saving model scores to %s.", save_path)
     try:
-        scores.to_csv(save_path, index=False)
+        write_table(scores, save_path, compression)
         logger.info("Scores saved.")
     except Exception as e:
         logger.error("Error occurred while saving scores to disk: %s", e)
         raise
 
-def read_scores(scores_path: str) -> pd.DataFrame:
+def read_scores(scores_path: str, columns: list = None) -> pd.DataFrame:
     """Reads the model scores from disk.
 
     Args:
         scores_path (str): Path to the scores file.
+        columns (list): Columns to read; ``None`` reads all columns.
 
     Returns:
         pd.DataFrame: DataFrame containing the model scores.
@@ -63,7 +144,7 @@ def read_scores(scores_path: str) -> pd.DataFrame:
     logger.debug("Reading model scores from %s.", scores_path)
     try:
         # Read the scores from disk
-        scores = pd.read_csv(scores_path)
+        scores = read_table(scores_path, columns)
         logger.info("Scores read.")
         return scores
     except Exception as e:
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Marker file whose modification time records when a cache entry was last used
+LAST_USED = ".last_used"
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path (Path): File to hash.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hex digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stage_key(stage: str, config_section, inputs: Iterable = ()) -> str:
+    """Compute the cache key of a pipeline stage.
+
+    The key covers the stage name, its config section and its inputs. Inputs
+    that are paths to existing files are hashed by content; any other input
+    (e.g. a URL or the key of an upstream stage) is hashed by value.
+
+    Args:
+        stage (str): Name of the stage.
+        config_section: Config values that affect the stage's output.
+        inputs (Iterable): Files and values the stage depends on.
+
+    Returns:
+        str: Hex digest identifying the stage's output.
+    """
+    digest = hashlib.sha256()
+    digest.update(stage.encode())
+    digest.update(json.dumps(config_section, sort_keys=True, default=str).encode())
+    for item in inputs:
+        if isinstance(item, Path) and item.is_file():
+            digest.update(hash_file(item).encode())
+        else:
+            digest.update(json.dumps(item, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def entry_path(cache_dir: Path, stage: str, key: str) -> Path:
+    """Return the directory holding the cached outputs of a stage run."""
+    return Path(cache_dir) / f"{stage}-{key[:32]}"
+
+def _touch(entry: Path) -> None:
+    """Mark a cache entry as most recently used."""
+    (entry / LAST_USED).touch()
+
+def restore(cache_dir: Path, stage: str, key: str, destination: Path) -> bool:
+    """Copy the cached outputs of a stage into the destination directory.
+
+    Args:
+        cache_dir (Path): Root directory of the stage cache.
+        stage (str): Name of the stage.
+        key (str): Cache key from :func:`stage_key`.
+        destination (Path): Run directory to restore the outputs into.
+
+    Returns:
+        bool: True if the entry existed and was restored, False on a cache miss.
+    """
+    entry = entry_path(cache_dir, stage, key)
+    if not entry.is_dir():
+        logger.debug("Cache miss for stage %s (%s).", stage, key[:12])
+        return False
+
+    for cached in entry.rglob("*"):
+        if cached.is_file() and cached.name != LAST_USED:
+            target = destination / cached.relative_to(entry)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(cached, target)
+    _touch(entry)
+    logger.debug("Cache hit for stage %s (%s).", stage, key[:12])
+    return True
+
+def store(cache_dir: Path, stage: str, key: str, outputs: List[Path], base_dir: Path) -> Path:
+    """Store the outputs of a stage run in the cache.
+
+    Args:
+        cache_dir (Path): Root directory of the stage cache.
+        stage (str): Name of the stage.
+        key (str): Cache key from :func:`stage_key`.
+        outputs (List[Path]): Files or directories produced by the stage, inside ``base_dir``.
+        base_dir (Path): Run directory the outputs are relative to.
+
+    Returns:
+        Path: The cache entry directory.
+    """
+    entry = entry_path(cache_dir, stage, key)
+    tmp_entry = entry.with_name(f"{entry.name}.tmp-{os.getpid()}")
+    tmp_entry.mkdir(parents=True, exist_ok=True)
+    for output in outputs:
+        target = tmp_entry / Path(output).relative_to(base_dir)
+        if Path(output).is_dir():
+            shutil.copytree(output, target, dirs_exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(output, target)
+    _touch(tmp_entry)
+
+    # Publish the entry atomically; another run may have stored it meanwhile
+    try:
+        os.replace(tmp_entry, entry)
+    except OSError:
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+    logger.debug("Stored stage %s in cache (%s).", stage, key[:12])
+    return entry
+
+def evict(cache_dir: Path, max_bytes: int) -> List[Path]:
+    """Remove least recently used cache entries until the cache fits in ``max_bytes``.
+
+    Args:
+        cache_dir (Path): Root directory of the stage cache.
+        max_bytes (int): Maximum total size of the cache.
+
+    Returns:
+        List[Path]: Entries that were removed.
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.is_dir():
+        return []
+
+    entries = []
+    for entry in cache_dir.iterdir():
+        if not entry.is_dir() or ".tmp-" in entry.name:
+            continue
+        size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+        marker = entry / LAST_USED
+        last_used = marker.stat().st_mtime if marker.exists() else entry.stat().st_mtime
+        entries.append((last_used, size, entry))
+
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        removed.append(entry)
+        logger.debug("Evicted cache entry %s (%d bytes).", entry.name, size)
+
+    if removed:
+        logger.info("Evicted %d stage cache entries.", len(removed))
+    return removed
@@ -1,15 +1,24 @@
+import hashlib
+import json
 import logging
+import math
 import time
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 
+from src.artifact_store import artifact_path, iter_table, read_table, write_table
+
 # Define logger
 logger = logging.getLogger(__name__)
 
+MODEL_FORMAT_VERSION = 1
+
 def split_data(features: pd.DataFrame, target: pd.Series, test_size: float = 0.4) -> tuple:
     """Split data into training and testing sets."""
     logger.debug("Splitting data into training and testing sets.")
@@ -18,18 +27,127 @@ def split_data(features: pd.DataFrame, target: pd.Series, test_size: float = 0.4
     logger.info("Data split completed.")
     return X_train, X_test, y_train, y_test
 
-def train_model(X_train: pd.DataFrame, y_train: pd.Series, initial_features: list, n_estimators: int = 10, max_depth: int = 10) -> RandomForestClassifier:
-    """Train a random forest classifier."""
+def write_split(features: pd.DataFrame, target: pd.Series, split_dir: Path, test_size: float = 0.4,
+                random_state: int = None, dtype: str = "float32") -> dict:
+    """Write the feature matrix once to a memory-mappable ``.npy`` file, split into train and test.
+
+    The rows are shuffled as they are written so that the training rows come
+    first and the test rows last; train and test are then contiguous slices of
+    the one file, and :func:`open_split` returns them as zero-copy views. The
+    random forest works in float32, so ``float32`` matrices are used by
+    training and scoring without conversion.
+
+    Args:
+        features (pd.DataFrame): Feature columns to store, in model order.
+        target (pd.Series): Labels.
+        split_dir (Path): Directory for the split files.
+        test_size (float): Share of rows in the test set.
+        random_state (int): Seed for the shuffle.
+        dtype (str): Data type of the stored feature matrix.
+
+    Returns:
+        dict: Split metadata, also saved as ``split.json``.
+    """
+    logger.debug("Writing memory-mapped train/test split to %s.", split_dir)
+    split_dir = Path(split_dir)
+    split_dir.mkdir(parents=True, exist_ok=True)
+    n_rows = len(features)
+    n_test = math.ceil(test_size * n_rows)
+    rows = np.random.default_rng(random_state).permutation(n_rows)
+
+    # Fill the file one column at a time so that the whole frame is never copied at once
+    matrix = np.lib.format.open_memmap(split_dir / "features.npy", mode="w+", dtype=dtype,
+                                       shape=(n_rows, features.shape[1]))
+    for position, column in enumerate(features.columns):
+        matrix[:, position] = features[column].to_numpy()[rows]
+    matrix.flush()
+    del matrix
+    np.save(split_dir / "labels.npy", target.to_numpy()[rows])
+    np.save(split_dir / "rows.npy", features.index.to_numpy()[rows])
+
+    metadata = {"columns": list(features.columns), "target": target.name, "n_train": n_rows - n_test,
+                "n_test": n_test, "dtype": dtype}
+    with open(split_dir / "split.json", "w") as f:
+        json.dump(metadata, f, indent=2)
+    logger.info("Data split completed.")
+    return metadata
+
+def open_split(split_dir: Path) -> tuple:
+    """Open a split written by :func:`write_split` as views of the memory-mapped files.
+
+    Args:
+        split_dir (Path): Directory of the split files.
+
+    Returns:
+        tuple: X_train, X_test, y_train and y_test, backed by the read-only memory-mapped files.
+    """
+    split_dir = Path(split_dir)
+    with open(split_dir / "split.json") as f:
+        metadata = json.load(f)
+    # Plain ndarray views of the mapped files, so pandas does not propagate the memmap class
+    matrix = np.load(split_dir / "features.npy", mmap_mode="r").view(np.ndarray)
+    labels = np.load(split_dir / "labels.npy", mmap_mode="r").view(np.ndarray)
+    rows = np.load(split_dir / "rows.npy")
+    n_train = metadata["n_train"]
+
+    def frame(part):
+        return pd.DataFrame(matrix[part], index=rows[part], columns=metadata["columns"], copy=False)
+
+    def series(part):
+        return pd.Series(labels[part], index=rows[part], name=metadata["target"], copy=False)
+
+    train, test = slice(0, n_train), slice(n_train, None)
+    return frame(train), frame(test), series(train), series(test)
+
+def resolve_n_jobs(n_jobs: int = None) -> int:
+    """Resolve a scikit-learn style ``n_jobs`` setting to a number of cores.
+
+    Args:
+        n_jobs (int): ``None`` or 1 for one core, -1 for all cores, or a positive count.
+
+    Returns:
+        int: Number of cores that training will use.
+    """
+    return joblib.effective_n_jobs(n_jobs)
+
+def train_model(X_train: pd.DataFrame, y_train: pd.Series, initial_features: list, n_estimators: int = 10,
+                max_depth: int = 10, n_jobs: int = None, **hyperparameters) -> RandomForestClassifier:
+    """Train a random forest classifier.
+
+    Args:
+        X_train (pd.DataFrame): Training features.
+        y_train (pd.Series): Training labels.
+        initial_features (list): Features used to fit the model.
+        n_estimators (int): Number of trees in the forest.
+        max_depth (int): Maximum depth of each tree.
+        n_jobs (int): Number of cores to fit trees on; -1 uses all cores.
+        **hyperparameters: Further keyword arguments for RandomForestClassifier.
+
+    Returns:
+        RandomForestClassifier: The fitted model.
+    """
     logger.debug("Training random forest classifier.")
+    cores = resolve_n_jobs(n_jobs)
+    logger.debug("Fitting trees on %d core(s).", cores)
     start_time = time.time()
-    rf_model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth)
+    start_cpu = time.process_time()
+    rf_model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs,
+                                      **hyperparameters)
     rf_model.fit(X_train[initial_features], y_train)
     end_time = time.time()
+    cpu_time = time.process_time() - start_cpu
     logger.info("Training completed.")
     logger.debug("Training completed in %.2f seconds.", end_time - start_time)
 
+    # Log how well the fit used the available cores
+    wall_time = max(end_time - start_time, 1e-9)
+    speed_up = cpu_time / wall_time
+    logger.debug("Training CPU time %.2f seconds, %.2f seconds per core.", cpu_time, cpu_time / cores)
+    logger.debug("Training speed-up %.2fx on %d core(s) (%.0f%% efficiency).",
+                 speed_up, cores, 100 * speed_up / cores)
+
     # Log basic model specs
-    logger.debug("Model specifications - n_estimators: %d, max_depth: %d.", n_estimators, max_depth)
+    logger.debug("Model specifications - n_estimators: %d, max_depth: %s.", n_estimators, max_depth)
 
     # Log warning if training time exceeds threshold
     threshold_time = 60  # in seconds
@@ -37,38 +155,240 @@ def train_model(X_train: pd.DataFrame, y_train: pd.Series, initial_features: lis
         logger.warning("Training time exceeded threshold.")
 
     # Log warning if training size is very small compared to the depth of the model
-    if len(X_train) < max_depth * 10:
+    if max_depth is not None and len(X_train) < max_depth * 10:
         logger.warning("Training size is very small compared to the depth of the model.")
 
     return rf_model
 
-def save_model(model: RandomForestClassifier, model_path: Path) -> None:
-    """Save the trained model to disk.
+def holdout_mask(rows: np.ndarray, test_size: float = 0.4, random_state: int = None) -> np.ndarray:
+    """Assign rows to the holdout set by a hash of their position in the dataset.
+
+    The assignment of a row depends only on its position and the seed, not on
+    how the dataset is chunked, so it can be decided one chunk at a time.
+
+    Args:
+        rows (np.ndarray): Positions of the rows in the dataset.
+        test_size (float): Expected share of rows in the holdout set.
+        random_state (int): Seed of the hash.
+
+    Returns:
+        np.ndarray: True for the holdout rows.
+    """
+    # splitmix64 of the row position, scaled to [0, 1)
+    x = rows.astype(np.uint64) + np.uint64(random_state or 0) * np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)) * 2.0 ** -53 < test_size
+
+def _iter_chunks(data_paths: list, columns: list, chunk_size: int):
+    """Yield the position of the first row and the rows of each chunk of the tables, in order."""
+    start = 0
+    for path in data_paths:
+        for chunk in iter_table(path, columns, chunk_size):
+            yield start, chunk
+            start += len(chunk)
+
+def train_model_out_of_core(data_paths: list, initial_features: list, target: str = "class",
+                            n_estimators: int = 10, trees_per_batch: int = 2, sample_rows: int = 100000,
+                            chunk_size: int = 100000, test_size: float = 0.4, random_state: int = None,
+                            holdout_path: Path = None, max_depth: int = 10, n_jobs: int = None,
+                            **hyperparameters) -> RandomForestClassifier:
+    """Train a random forest on tables that do not fit in memory.
+
+    The tables are streamed in chunks. Every batch of ``trees_per_batch`` trees
+    is fitted on its own Poisson bootstrap sample of the training rows: each
+    row enters the sample of a batch a Poisson-distributed number of times, with
+    a rate chosen so that the sample has about ``sample_rows`` rows, and that
+    count is used as its sample weight. The samples of all batches are drawn in
+    one pass over the data. The batches are added to one forest with
+    ``warm_start``. Peak memory is about ``n_estimators / trees_per_batch *
+    sample_rows`` rows of ``initial_features`` plus one chunk, whatever the size of the data.
+
+    Rows are assigned to the holdout set by :func:`holdout_mask`; with
+    ``holdout_path`` they are written there as CSV, for scoring with
+    :func:`src.score_model.score_file`.
+
+    Args:
+        data_paths (list): Tables holding ``initial_features`` and ``target``, read in order.
+        initial_features (list): Features used to fit the model.
+        target (str): Name of the label column.
+        n_estimators (int): Number of trees in the forest.
+        trees_per_batch (int): Number of trees fitted on each bootstrap sample.
+        sample_rows (int): Expected number of rows in each bootstrap sample.
+        chunk_size (int): Number of rows read at a time.
+        test_size (float): Expected share of rows held out from training.
+        random_state (int): Seed of the holdout hash, the bootstrap samples and the trees.
+        holdout_path (Path): CSV file to write the holdout rows to.
+        max_depth (int): Maximum depth of each tree.
+        n_jobs (int): Number of cores to fit trees on; -1 uses all cores.
+        **hyperparameters: Further keyword arguments for RandomForestClassifier.
+
+    Returns:
+        RandomForestClassifier: The fitted model.
+
+    Raises:
+        ValueError: If there are no training rows or a bootstrap sample lacks a class.
+    """
+    logger.debug("Training random forest out of core on %s.", [str(path) for path in data_paths])
+    start_time = time.time()
+    columns = list(initial_features) + [target]
+
+    # First pass: count the training rows to set the sampling rate
+    n_train = 0
+    for start, chunk in _iter_chunks(data_paths, [target], chunk_size):
+        n_train += int((~holdout_mask(np.arange(start, start + len(chunk)), test_size, random_state)).sum())
+    if n_train == 0:
+        raise ValueError("There are no training rows to fit the model on.")
+    rate = sample_rows / n_train
+    n_batches = math.ceil(n_estimators / trees_per_batch)
+    logger.debug("Drawing %d bootstrap samples of about %d of %d training rows.", n_batches,
+                 min(sample_rows, n_train), n_train)
+
+    # Second pass: draw every batch's sample and write the holdout rows
+    generators = [np.random.default_rng(seed) for seed in np.random.SeedSequence(random_state).spawn(n_batches)]
+    samples = [[] for _ in range(n_batches)]
+    n_holdout = 0
+    for start, chunk in _iter_chunks(data_paths, columns, chunk_size):
+        holdout = holdout_mask(np.arange(start, start + len(chunk)), test_size, random_state)
+        if holdout_path is not None:
+            chunk[holdout].to_csv(holdout_path, mode="a" if n_holdout else "w", header=not n_holdout, index=False)
+        n_holdout += int(holdout.sum())
+        train = chunk[~holdout]
+        X = train[initial_features].to_numpy(dtype=np.float32)
+        y = train[target].to_numpy()
+        for generator, sample in zip(generators, samples):
+            counts = generator.poisson(rate, len(train))
+            drawn = counts > 0
+            sample.append((X[drawn], y[drawn], counts[drawn]))
+
+    rf_model = RandomForestClassifier(n_estimators=0, max_depth=max_depth, n_jobs=n_jobs, warm_start=True,
+                                      bootstrap=False, random_state=random_state, **hyperparameters)
+    for i, sample in enumerate(samples):
+        X = pd.DataFrame(np.concatenate([part[0] for part in sample]), columns=initial_features)
+        y = np.concatenate([part[1] for part in sample])
+        weights = np.concatenate([part[2] for part in sample])
+        samples[i] = None
+        if len(np.unique(y)) < 2:
+            raise ValueError(f"Bootstrap sample {i} has fewer than two classes; increase sample_rows.")
+        rf_model.set_params(n_estimators=min(n_estimators, (i + 1) * trees_per_batch))
+        rf_model.fit(X, y, sample_weight=weights)
+        logger.debug("Fitted trees %d of %d on %d sampled rows.", rf_model.n_estimators, n_estimators, len(y))
+
+    logger.info("Training completed.")
+    logger.debug("Out-of-core training on %d training and %d holdout rows completed in %.2f seconds.",
+                 n_train, n_holdout, time.time() - start_time)
+    return rf_model
+
+def metadata_path(model_path: Path) -> Path:
+    """Return the path of the metadata file saved next to a model."""
+    return Path(model_path).with_suffix(".json")
+
+def feature_plan_path(model_path: Path) -> Path:
+    """Return the path of the feature plan saved next to a model, e.g. ``model.feature_plan.json``."""
+    return Path(model_path).with_suffix(".feature_plan.json")
+
+def _file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_model(model: RandomForestClassifier, model_path: Path, compress: int = 0, features: list = None) -> dict:
+    """Save the trained model to disk with a metadata file next to it.
+
+    With ``compress=0`` the forest's tree arrays are stored as raw array
+    buffers that :func:`load_model` reads through a memory map;
+    ``compress`` 1-9 zlib-compresses the file, which is several times smaller to
+    upload but slower to load. The metadata file (``<model>.json``) records
+    the format version, the scikit-learn version, the features, the classes,
+    the compression and the SHA-256 of the model file.
 
     Args:
         model (RandomForestClassifier): Trained model to be saved.
         model_path (Path): Path to save the trained model.
+        compress (int): joblib compression level; 0 stores memory-mappable arrays.
+        features (list): Features the model was fitted on, in order.
+
+    Returns:
+        dict: The model metadata.
     """
     try:
         logger.debug("Saving trained model to disk at %s.", model_path)
-        joblib.dump(model, model_path)
+        start_time = time.time()
+        joblib.dump(model, model_path, compress=compress)
+        if features is None:
+            features = getattr(model, "feature_names_in_", [])
+        metadata = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "sklearn_version": sklearn.__version__,
+            "model_type": type(model).__name__,
+            "features": list(features),
+            "classes": np.asarray(model.classes_).tolist(),
+            "n_estimators": len(getattr(model, "estimators_", [])),
+            "compress": compress,
+            "bytes": Path(model_path).stat().st_size,
+            "sha256": _file_sha256(model_path),
+        }
+        with open(metadata_path(model_path), "w") as f:
+            json.dump(metadata, f, indent=2)
         logger.info("Model saved.")
+        logger.debug("Model saved in %.2f seconds, %.2f MB.", time.time() - start_time, metadata["bytes"] / 1e6)
+        return metadata
     except Exception as e:
         error_msg = f"An unexpected error occurred while saving the model to '{model_path}': {e}."
         logger.error(error_msg)
         raise Exception(error_msg) from e
 
-def read_model_and_data(model_path: str, train_data_path: str, test_data_path: str) -> tuple:
-    """Reads the trained model and data from disk."""
+def load_model(model_path: Path, mmap: bool = True, verify: bool = False) -> RandomForestClassifier:
+    """Load a trained model from disk.
+
+    Uncompressed models are opened memory-mapped, so the tree arrays are
+    copied straight from the page cache instead of through the unpickler's buffers.
+
+    Args:
+        model_path (Path): Path of the saved model.
+        mmap (bool): Memory-map the tree arrays of uncompressed models.
+        verify (bool): Check the model file against the SHA-256 in its metadata file.
+
+    Returns:
+        RandomForestClassifier: The trained model.
+
+    Raises:
+        ValueError: If ``verify`` is set and the model file does not match its metadata.
+    """
+    logger.debug("Loading trained model from %s.", model_path)
+    try:
+        metadata = {}
+        if metadata_path(model_path).exists():
+            with open(metadata_path(model_path)) as f:
+                metadata = json.load(f)
+            if metadata.get("sklearn_version") != sklearn.__version__:
+                logger.warning("Model was saved with scikit-learn %s but %s is installed.",
+                               metadata.get("sklearn_version"), sklearn.__version__)
+        if verify and metadata and _file_sha256(model_path) != metadata["sha256"]:
+            raise ValueError(f"Model file '{model_path}' does not match the SHA-256 in its metadata.")
+        mmap_mode = "r" if mmap and not metadata.get("compress") else None
+        return joblib.load(model_path, mmap_mode=mmap_mode)
+    except Exception as e:
+        logger.error("Error occurred while loading model from '%s': %s", model_path, e)
+        raise
+
+def read_model_and_data(model_path: str, train_data_path: str, test_data_path: str, columns: list = None) -> tuple:
+    """Reads the trained model and data from disk, optionally only some of the data columns."""
     logger.info("Reading trained model and data from disk.")
     try:
         # Read the trained model from disk
-        trained_model = joblib.load(model_path)
+        trained_model = load_model(model_path)
         logger.info("Trained model loaded.")
 
         # Read the training and testing data from disk
-        train_data = pd.read_csv(train_data_path)
-        test_data = pd.read_csv(test_data_path)
+        train_data = read_table(train_data_path, columns)
+        test_data = read_table(test_data_path, columns)
         logger.info("Training and testing data loaded.")
 
         return trained_model, train_data, test_data
@@ -76,15 +396,16 @@ def read_model_and_data(model_path: str, train_data_path: str, test_data_path: s
         logger.error("Error occurred while reading model and data from disk: %s", e)
         raise
 
-def save_data(X_train: pd.DataFrame, X_test: pd.DataFrame, y_train: pd.Series, y_test: pd.Series, artifacts_dir: Path) -> None:
-    """Save the train and test datasets to disk."""
+def save_data(X_train: pd.DataFrame, X_test: pd.DataFrame, y_train: pd.Series, y_test: pd.Series, artifacts_dir: Path,
+              fmt: str = "csv", compression: str = None) -> None:
+    """Save the train and test datasets to disk in the given artifact format."""
     logger.debug("Saving train and test datasets to disk.")
     try:
         # Save train and test datasets to disk
-        X_train.to_csv(artifacts_dir / "X_train.csv", index=False)
-        X_test.to_csv(artifacts_dir / "X_test.csv", index=False)
-        y_train.to_csv(artifacts_dir / "y_train.csv", index=False)
-        y_test.to_csv(artifacts_dir / "y_test.csv", index=False)
+        write_table(X_train, artifact_path(artifacts_dir, "X_train", fmt), compression)
+        write_table(X_test, artifact_path(artifacts_dir, "X_test", fmt), compression)
+        write_table(y_train, artifact_path(artifacts_dir, "y_train", fmt), compression)
+        write_table(y_test, artifact_path(artifacts_dir, "y_test", fmt), compression)
         logger.info("Train and test datasets saved.")
     except Exception as e:
         logger.error("Error occurred while saving train and test datasets to disk: %s", e)
@@ -0,0 +1,180 @@
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, RandomizedSearchCV
+
+from src.artifact_store import artifact_path, read_table
+from src.train_model import open_split
+
+logger = logging.getLogger(__name__)
+
+SEARCHES = {"grid": GridSearchCV, "random": RandomizedSearchCV, "halving": HalvingGridSearchCV}
+
+def share_training_matrix(X: pd.DataFrame, y: pd.Series, directory: Path) -> tuple:
+    """Write the training matrix to disk once and open it memory-mapped.
+
+    joblib passes memory-mapped arrays to worker processes by file name, so every
+    worker of the search reads the same copy instead of receiving its own.
+
+    Args:
+        X (pd.DataFrame): Training features.
+        y (pd.Series): Training labels.
+        directory (Path): Directory for the ``.npy`` files.
+
+    Returns:
+        tuple: Read-only memory-mapped feature matrix and label vector.
+    """
+    X_path = Path(directory) / "X_train.npy"
+    y_path = Path(directory) / "y_train.npy"
+    # float32 is what the forest fits on, so the workers use the mapped matrix without converting it
+    np.save(X_path, np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+    np.save(y_path, y.to_numpy())
+    return np.load(X_path, mmap_mode="r"), np.load(y_path, mmap_mode="r")
+
+def tune_model(X_train: pd.DataFrame, y_train: pd.Series, initial_features: list, param_grid: dict,
+               search: str = "halving", cv: int = 5, scoring: str = "roc_auc", n_iter: int = 10,
+               factor: int = 3, n_jobs: int = -1, random_state: int = None, base_params: dict = None,
+               work_dir: Path = None):
+    """Search random forest hyperparameters with cross-validation on a process pool.
+
+    Each candidate and fold is fitted in a separate worker process, with the
+    forest itself on one core. ``halving`` (successive halving) fits all
+    candidates on a small share of the samples and only keeps the best
+    ``1 / factor`` of them for the next, larger round, so poor candidates are
+    dropped early.
+
+    Args:
+        X_train (pd.DataFrame): Training features.
+        y_train (pd.Series): Training labels.
+        initial_features (list): Features used to fit the model.
+        param_grid (dict): Candidate values of each RandomForestClassifier parameter.
+        search (str): ``grid``, ``random`` or ``halving``.
+        cv (int): Number of cross-validation folds.
+        scoring (str): scikit-learn scoring name used to rank the candidates.
+        n_iter (int): Number of sampled candidates for ``random`` search.
+        factor (int): Share of candidates kept in each ``halving`` round is ``1 / factor``.
+        n_jobs (int): Number of worker processes; -1 uses all cores.
+        random_state (int): Seed for the forests, the sampled candidates and the halving subsamples.
+        base_params (dict): Fixed RandomForestClassifier parameters that the grid overrides.
+        work_dir (Path): Directory for the memory-mapped training matrix; a temporary one by default.
+
+    Returns:
+        The fitted search object; see :func:`leaderboard` for its results.
+
+    Raises:
+        ValueError: If ``search`` is not a supported search type.
+    """
+    if search not in SEARCHES:
+        raise ValueError(f"Unsupported search '{search}'; expected one of {sorted(SEARCHES)}.")
+
+    estimator = RandomForestClassifier(**{**(base_params or {}), "n_jobs": 1, "random_state": random_state})
+    options = {"cv": cv, "scoring": scoring, "n_jobs": n_jobs, "refit": False}
+    if search == "random":
+        options.update(n_iter=n_iter, random_state=random_state)
+    elif search == "halving":
+        options.update(factor=factor, random_state=random_state)
+    searcher = SEARCHES[search](estimator, param_grid, **options)
+
+    logger.debug("Running %s search over %s on %d worker(s).", search, param_grid, joblib.effective_n_jobs(n_jobs))
+    start_time = time.time()
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        X, y = share_training_matrix(X_train[initial_features], y_train, tmp_dir)
+        searcher.fit(X, y)
+        # Drop the references to the memory-mapped files before they are removed
+        del X, y
+    logger.info("Hyperparameter search completed in %.2f seconds; best %s %.4f with %s.",
+                time.time() - start_time, scoring, searcher.best_score_, searcher.best_params_)
+    return searcher
+
+def leaderboard(searcher) -> pd.DataFrame:
+    """Rank the candidates of a fitted search.
+
+    Args:
+        searcher: Fitted search object from :func:`tune_model`.
+
+    Returns:
+        pd.DataFrame: One row per candidate (per round for ``halving``), best first.
+    """
+    results = pd.DataFrame(searcher.cv_results_)
+    params = pd.json_normalize(results["params"].tolist())
+    columns = [column for column in ("iter", "n_resources") if column in results]
+    columns += ["rank_test_score", "mean_test_score", "std_test_score", "mean_fit_time"]
+    board = pd.concat([results[columns], params], axis=1)
+    sort_by = ["iter", "rank_test_score"] if "iter" in board else ["rank_test_score"]
+    ascending = [False, True] if "iter" in board else [True]
+    return board.sort_values(sort_by, ascending=ascending).reset_index(drop=True)
+
+def save_leaderboard(board: pd.DataFrame, save_path: Path) -> None:
+    """Save the search leaderboard to disk as CSV.
+
+    Args:
+        board (pd.DataFrame): Leaderboard from :func:`leaderboard`.
+        save_path (Path): Path to save the leaderboard.
+    """
+    try:
+        board.to_csv(save_path, index=False)
+        logger.info("Tuning leaderboard saved to %s", save_path)
+    except Exception as e:
+        logger.error("Error occurred while saving tuning leaderboard: %s", e)
+        raise
+
+def tune_from_config(X_train: pd.DataFrame, y_train: pd.Series, config: dict, work_dir: Path = None):
+    """Run :func:`tune_model` with the ``tune_model`` and ``train_model`` config sections.
+
+    Args:
+        X_train (pd.DataFrame): Training features.
+        y_train (pd.Series): Training labels.
+        config (dict): The pipeline configuration.
+        work_dir (Path): Directory for the memory-mapped training matrix.
+
+    Returns:
+        The fitted search object.
+    """
+    tune_config = config["tune_model"]
+    train_config = config["train_model"]
+    return tune_model(X_train, y_train, train_config["selected_features"], tune_config["param_grid"],
+                      search=tune_config.get("search", "halving"),
+                      cv=tune_config.get("cv", 5),
+                      scoring=tune_config.get("scoring", "roc_auc"),
+                      n_iter=tune_config.get("n_iter", 10),
+                      factor=tune_config.get("factor", 3),
+                      n_jobs=tune_config.get("n_jobs", -1),
+                      random_state=tune_config.get("random_state"),
+                      base_params=train_config.get("hyperparameters", {}),
+                      work_dir=work_dir)
+
+def main():
+    """Command line entry point: retune on the training split of an existing pipeline run."""
+    parser = argparse.ArgumentParser(description="Random forest hyperparameter search")
+    parser.add_argument("--run-dir", required=True, help="Pipeline run directory with the train split")
+    parser.add_argument("--config", help="Configuration file; defaults to the run's config.yaml")
+    parser.add_argument("--output", help="Leaderboard CSV; defaults to tuning_leaderboard.csv in the run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run_dir = Path(args.run_dir)
+    with open(args.config or run_dir / "config.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.FullLoader)
+    if (run_dir / "split").exists():
+        X_train, _, y_train, _ = open_split(run_dir / "split")
+    else:
+        artifact_format = config.get("run_config", {}).get("artifact_format", "csv")
+        X_train = read_table(artifact_path(run_dir, "X_train", artifact_format),
+                             config["train_model"]["selected_features"])
+        y_train = read_table(artifact_path(run_dir, "y_train", artifact_format))["class"]
+
+    searcher = tune_from_config(X_train, y_train, config, run_dir)
+    save_leaderboard(leaderboard(searcher), Path(args.output or run_dir / "tuning_leaderboard.csv"))
+    print(yaml.dump({"hyperparameters": searcher.best_params_}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.generate_features import FeaturePlan
+
+logger = logging.getLogger(__name__)
+
+# Rows checked at a time, so that all checks of a chunk run while it is in cache
+CHUNK_ROWS = 1 << 16
+
+def checks_from_plan(plan: FeaturePlan) -> dict:
+    """Derive the data quality checks that a feature plan needs from its input columns.
+
+    Log transforms need positive inputs, normalized ranges need non-missing
+    inputs and a nonzero mean column.
+
+    Args:
+        plan (FeaturePlan): Plan from :func:`src.generate_features.compile_feature_plan`.
+
+    Returns:
+        dict: ``required``, ``not_null``, ``positive`` and ``nonzero`` column lists.
+    """
+    inputs = set(plan.input_columns)
+    checks = {"required": list(plan.input_columns), "not_null": [], "positive": [], "nonzero": []}
+    for operation, _, sources in plan.steps:
+        if operation == "log":
+            checks["positive"] += [source for source in sources if source in inputs]
+        elif operation == "norm_range":
+            checks["not_null"] += [source for source in sources if source in inputs]
+            checks["nonzero"] += [source for source in sources[2:] if source in inputs]
+    return {name: list(dict.fromkeys(columns)) for name, columns in checks.items()}
+
+def validate_dataset(data: pd.DataFrame, required: list = None, not_null: list = None, positive: list = None,
+                     nonzero: list = None, ranges: dict = None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Check the schema and values of a dataset in one vectorized pass.
+
+    The checked columns are read as one float64 block, and every check runs on
+    all of them at once, chunk by chunk: missing values, values outside the
+    ``ranges``, nonpositive values in ``positive`` columns and zeros in
+    ``nonzero`` columns. Missing and non-numeric columns are found from the
+    schema without reading any values.
+
+    Args:
+        data (pd.DataFrame): Dataset to validate.
+        required (list): Columns that must exist and be numeric; defaults to all columns.
+        not_null (list): Columns that must not have missing values.
+        positive (list): Columns whose values must be above zero, e.g. inputs of log transforms.
+        nonzero (list): Columns that must not be zero, e.g. denominators.
+        ranges (dict): Inclusive ``[low, high]`` bounds per column; ``None`` leaves a side open.
+        chunk_rows (int): Number of rows checked at a time.
+
+    Returns:
+        dict: The report: the number of rows, per-column statistics and counts of
+            failed values, the list of ``errors`` and whether all checks ``passed``.
+    """
+    required = list(data.columns) if required is None else list(required)
+    not_null, positive, nonzero = list(not_null or []), list(positive or []), list(nonzero or [])
+    ranges = dict(ranges or {})
+    errors = []
+
+    # Schema checks
+    referenced = list(dict.fromkeys(required + not_null + positive + nonzero + list(ranges)))
+    missing = [column for column in referenced if column not in data.columns]
+    for column in missing:
+        errors.append(f"Column '{column}' is missing.")
+    present = [column for column in referenced if column in data.columns]
+    non_numeric = [column for column in present if not pd.api.types.is_numeric_dtype(data[column])]
+    for column in non_numeric:
+        errors.append(f"Column '{column}' has non-numeric dtype {data[column].dtype}.")
+    columns = [column for column in present if column not in non_numeric]
+
+    # Value checks, all columns at once
+    n_columns = len(columns)
+    bounded = [i for i, column in enumerate(columns) if column in ranges]
+    low = np.array([ranges[columns[i]][0] for i in bounded], dtype=float)
+    high = np.array([ranges[columns[i]][1] for i in bounded], dtype=float)
+    low, high = np.where(np.isnan(low), -np.inf, low), np.where(np.isnan(high), np.inf, high)
+    check_positive = [i for i, column in enumerate(columns) if column in positive]
+    check_nonzero = [i for i, column in enumerate(columns) if column in nonzero]
+    nulls = np.zeros(n_columns, dtype=np.int64)
+    out_of_range = np.zeros(n_columns, dtype=np.int64)
+    nonpositive = np.zeros(n_columns, dtype=np.int64)
+    zeros = np.zeros(n_columns, dtype=np.int64)
+    minimum = np.full(n_columns, np.nan)
+    maximum = np.full(n_columns, np.nan)
+    block = data[columns].to_numpy(dtype=np.float64)
+    for start in range(0, len(block), chunk_rows):
+        chunk = block[start:start + chunk_rows]
+        nulls += np.isnan(chunk).sum(axis=0)
+        # fmin and fmax skip missing values
+        minimum = np.fmin(minimum, np.fmin.reduce(chunk, axis=0))
+        maximum = np.fmax(maximum, np.fmax.reduce(chunk, axis=0))
+        if bounded:
+            values = chunk[:, bounded]
+            out_of_range[bounded] += ((values < low) | (values > high)).sum(axis=0)
+        if check_positive:
+            nonpositive[check_positive] += (chunk[:, check_positive] <= 0).sum(axis=0)
+        if check_nonzero:
+            zeros[check_nonzero] += (chunk[:, check_nonzero] == 0).sum(axis=0)
+
+    report_columns = {}
+    for i, column in enumerate(columns):
+        stats = {"dtype": str(data[column].dtype), "nulls": int(nulls[i]),
+                 "min": None if np.isnan(minimum[i]) else float(minimum[i]),
+                 "max": None if np.isnan(maximum[i]) else float(maximum[i])}
+        if column in ranges:
+            stats["out_of_range"] = int(out_of_range[i])
+            if out_of_range[i]:
+                errors.append(f"Column '{column}' has {out_of_range[i]} values outside {ranges[column]}.")
+        if column in not_null and nulls[i]:
+            errors.append(f"Column '{column}' has {nulls[i]} missing values.")
+        if column in positive:
+            stats["nonpositive"] = int(nonpositive[i])
+            if nonpositive[i]:
+                errors.append(f"Column '{column}' has {nonpositive[i]} values that are not positive.")
+        if column in nonzero:
+            stats["zeros"] = int(zeros[i])
+            if zeros[i]:
+                errors.append(f"Column '{column}' has {zeros[i]} zero values.")
+        report_columns[column] = stats
+
+    report = {"rows": len(data), "columns": report_columns, "errors": errors, "passed": not errors}
+    logger.info("Data validation %s with %d error(s).", "passed" if not errors else "failed", len(errors))
+    for error in errors:
+        logger.warning(error)
+    return report
+
+def validate_for_features(data: pd.DataFrame, plan: FeaturePlan, ranges: dict = None) -> dict:
+    """Validate a dataset against the checks its feature plan needs; see :func:`validate_dataset`."""
+    return validate_dataset(data, ranges=ranges, **checks_from_plan(plan))
+
+def save_report(report: dict, save_path: Path) -> None:
+    """Save a data quality report to disk as JSON.
+
+    Args:
+        report (dict): Report from :func:`validate_dataset`.
+        save_path (Path): Path to save the report.
+    """
+    try:
+        with open(save_path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info("Data quality report saved to %s", save_path)
+    except Exception as e:
+        logger.error("Error occurred while saving data quality report: %s", e)
+        raise
+
+def enforce(report: dict, on_error: str = "raise") -> None:
+    """Raise if the report has errors and ``on_error`` is ``raise``; ``warn`` only logs them.
+
+    Raises:
+        ValueError: If the data failed validation and ``on_error`` is ``raise``.
+    """
+    if report["passed"]:
+        return
+    if on_error == "raise":
+        error_msg = f"Data validation failed: {' '.join(report['errors'])}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    logger.warning("Continuing despite %d data validation error(s).", len(report["errors"]))
@@ -1,9 +1,9 @@
-import boto3
 import streamlit as st
 import pandas as pd
 import logging.config
-from src.aws_utils import fetch_model_from_s3
 from src.load_config import get_config
+from src.feature_transformer import transform
+from src.model_registry import load_model, load_model_feature_plan
 
 # Set up logging
 logging.config.fileConfig('config/logging.conf')
@@ -14,9 +14,8 @@ config = get_config('config/config.yaml')
 S3_BUCKET_NAME = config['aws']['s3_bucket']
 PREFIX = config['aws']['bucket_prefix']
 MODEL_VERSIONS_LIST = config['aws']['model_versions']
-
-# Initialize S3 client
-s3_client = boto3.client('s3')
+MODEL_CACHE_DIR = config['aws'].get('model_cache_dir', 'model_cache')
+REVALIDATE_SECONDS = config['aws'].get('revalidate_seconds', 300)
 
 # Custom CSS for styling
 st.markdown("""
@@ -43,29 +42,46 @@ st.markdown("### Which model do you want to use??", unsafe_allow_html=True)
 chosen_model_version = st.selectbox('Choose Model Version', MODEL_VERSIONS_LIST)
 logging.info(f'Selected model version: {chosen_model_version}')
 
-# Load model
-model = fetch_model_from_s3(S3_BUCKET_NAME, PREFIX, chosen_model_version)
+# Load model (served from the in-process and on-disk caches after the first load)
+model = load_model(S3_BUCKET_NAME, PREFIX, chosen_model_version, MODEL_CACHE_DIR, REVALIDATE_SECONDS)
 logging.info(f'Model loaded successfully: {chosen_model_version}')
 
+# Load the feature transforms saved next to the chosen model, if available
+feature_plan = load_model_feature_plan(S3_BUCKET_NAME, PREFIX, chosen_model_version, MODEL_CACHE_DIR,
+                                       REVALIDATE_SECONDS)
+
 # Feature input section with columns
-st.markdown("### Adjust the features as needed", unsafe_allow_html=True)
-col1, col2, col3 = st.columns(3)
+if feature_plan:
+    # Ask for the raw observations and derive the model features like the pipeline does
+    st.markdown("### Adjust the observations as needed", unsafe_allow_html=True)
+    input_columns = st.columns(3)
+    raw_values = []
+    for i, name in enumerate(feature_plan['input_columns']):
+        with input_columns[i % 3]:
+            raw_values.append(st.number_input(' '.join(name.split('_')), value=1.0, step=0.1))
+else:
+    st.markdown("### Adjust the features as needed", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
 
-with col1:
-    log_entropy = st.number_input('log visible entropy', value=0, step=1)
+    with col1:
+        log_entropy = st.number_input('log visible entropy', value=0, step=1)
 
-with col2:
-    IR_norm_range = st.number_input('IR norm range', value=0, step=1)
+    with col2:
+        IR_norm_range = st.number_input('IR norm range', value=0, step=1)
 
-with col3:
-    entropy_x_contrast = st.number_input('visible contrast x visible entropy', value=0, step=1)
+    with col3:
+        entropy_x_contrast = st.number_input('visible contrast x visible entropy', value=0, step=1)
 
 # Generate predictions
 if st.button('Predict'):
-    features = pd.DataFrame([[log_entropy, IR_norm_range, entropy_x_contrast]], 
-                            columns=['log_visible_entropy', 'IR_norm_range', 'visible_contrast_x_visible_entropy'])
-    
     try:
+        if feature_plan:
+            raw = pd.DataFrame([raw_values], columns=feature_plan['input_columns'])
+            features = transform(feature_plan, raw)
+        else:
+            features = pd.DataFrame([[log_entropy, IR_norm_range, entropy_x_contrast]],
+                                    columns=['log_visible_entropy', 'IR_norm_range',
+                                             'visible_contrast_x_visible_entropy'])
         prediction = model.predict(features)
         st.markdown(f'### For these Features the Prediction is: {prediction[0]}', unsafe_allow_html=True)
         logging.info(f'Successful prediction with features: {features.values.tolist()} - Prediction: {prediction[0]}')
@@ -0,0 +1,64 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+# Version of the feature plan format written by the pipeline's save_feature_plan
+FEATURE_PLAN_VERSION = 1
+
+def load_feature_plan(file_path):
+    """
+    Load a feature plan saved by the pipeline next to its trained model.
+
+    Parameters:
+        file_path (str): Path of the ``<model>.feature_plan.json`` file.
+
+    Returns:
+        dict: The plan with its input columns, steps and output columns.
+    """
+    with open(file_path, 'r') as f:
+        plan = json.load(f)
+    if plan.get('version') != FEATURE_PLAN_VERSION:
+        raise ValueError(f"Unsupported feature plan version: {plan.get('version')}")
+    return plan
+
+def transform(plan, raw):
+    """
+    Apply a feature plan to a batch of raw observations in one vectorized pass.
+
+    The steps are the ones the pipeline's generate_features ran at training
+    time, so served features match the training features.
+
+    Parameters:
+        plan (dict): Plan from :func:`load_feature_plan`.
+        raw (pd.DataFrame): Raw observations containing the plan's input columns.
+
+    Returns:
+        pd.DataFrame: The plan's output columns, in the order the model expects.
+    """
+    block = raw[plan['input_columns']].to_numpy(dtype=np.float64)
+    columns = {name: block[:, i] for i, name in enumerate(plan['input_columns'])}
+
+    for operation, target, sources in plan['steps']:
+        args = [columns[source] for source in sources]
+        if operation == 'range':
+            columns[target] = args[0] - args[1]
+        elif operation == 'norm_range':
+            if (args[2] == 0).any():
+                raise ValueError(f"Column '{sources[2]}' has zero mean value.")
+            if any(np.isnan(values).any() for values in args):
+                raise ValueError("One or more columns have missing values.")
+            columns[target] = (args[1] - args[0]) / args[2]
+        elif operation == 'log':
+            columns[target] = np.log(args[0])
+        elif operation == 'multiply':
+            columns[target] = args[0] * args[1]
+        else:
+            raise ValueError(f"Unknown feature operation: {operation}")
+
+    return pd.DataFrame({name: columns[name] for name in plan['output_columns']}, index=raw.index)
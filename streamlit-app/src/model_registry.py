@@ -0,0 +1,166 @@
+import logging
+import os
+import time
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import boto3
+import joblib
+from botocore.exceptions import ClientError
+
+from src.feature_transformer import load_feature_plan
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+# Time and result of the last S3 validation of each (bucket, prefix, model_name)
+_last_validated = {}
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Return one S3 client shared by every model load in this process."""
+    return boto3.client('s3')
+
+@lru_cache(maxsize=8)
+def _load_model_file(bucket_name, prefix, model_name, etag, path):
+    """
+    Deserialize a downloaded model; cached per bucket, prefix, model name and ETag.
+
+    Uncompressed models are opened memory-mapped, so their arrays are read
+    straight from the cached file; compressed models are loaded normally.
+    """
+    log.info(f"Deserializing model '{model_name}' (ETag {etag}).")
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='mmap_mode .* is not compatible with compressed file')
+        return joblib.load(path, mmap_mode='r')
+
+def fetch_model_artifact(s3_client, bucket_name, prefix, model_name, cache_dir):
+    """
+    Download a model artifact to the local cache unless the cached copy is current.
+
+    The request is a conditional GET: if the object's ETag still matches the
+    cached copy, S3 answers 304 Not Modified and nothing is downloaded.
+
+    Parameters:
+        s3_client: boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket.
+        prefix (str): The prefix path in the bucket.
+        model_name (str): The name of the model file.
+        cache_dir (str): Local directory for downloaded artifacts.
+
+    Returns:
+        tuple: Local path of the artifact and its ETag.
+    """
+    local_path = Path(cache_dir) / bucket_name / prefix / model_name
+    etag_path = local_path.with_name(f"{local_path.name}.etag")
+    cached_etag = etag_path.read_text() if local_path.exists() and etag_path.exists() else None
+
+    request = {'Bucket': bucket_name, 'Key': f"{prefix}/{model_name}"}
+    if cached_etag:
+        request['IfNoneMatch'] = cached_etag
+    try:
+        response = s3_client.get_object(**request)
+    except ClientError as e:
+        if cached_etag and e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+            log.info(f"Cached model '{model_name}' is up to date.")
+            return local_path, cached_etag
+        raise
+
+    # Stream the body to a temporary file and move it into place atomically
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = local_path.with_name(f"{local_path.name}.tmp-{os.getpid()}")
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter(lambda: response['Body'].read(1 << 20), b''):
+            f.write(chunk)
+    os.replace(tmp_path, local_path)
+    etag_path.write_text(response['ETag'])
+    log.info(f"Downloaded model '{model_name}' from bucket '{bucket_name}' with prefix '{prefix}'.")
+    return local_path, response['ETag']
+
+def _current_artifact(bucket_name, prefix, name, cache_dir, revalidate_seconds, s3_client):
+    """
+    Return the local path and ETag of an artifact, revalidating it against S3 when due.
+    """
+    key = (bucket_name, prefix, name)
+    validated = _last_validated.get(key)
+    if validated is None or time.monotonic() - validated[0] >= revalidate_seconds:
+        path, etag = fetch_model_artifact(s3_client or get_s3_client(), bucket_name, prefix, name, cache_dir)
+        validated = (time.monotonic(), str(path), etag)
+        _last_validated[key] = validated
+    return validated[1], validated[2]
+
+def load_model(bucket_name, prefix, model_name, cache_dir='model_cache', revalidate_seconds=300, s3_client=None):
+    """
+    Load a model through the local disk cache and the in-process model cache.
+
+    S3 is asked at most once every ``revalidate_seconds`` per model whether the
+    cached artifact is still current, so switching between already loaded
+    versions does not touch the network or deserialize the model again.
+
+    Parameters:
+        bucket_name (str): The name of the S3 bucket.
+        prefix (str): The prefix path in the bucket.
+        model_name (str): The name of the model file.
+        cache_dir (str): Local directory for downloaded artifacts.
+        revalidate_seconds (float): Seconds before a loaded model is checked against S3 again.
+        s3_client: Optional boto3 S3 client; a shared client is used by default.
+
+    Returns:
+        model: The loaded model object, or None if an error occurs.
+    """
+    try:
+        path, etag = _current_artifact(bucket_name, prefix, model_name, cache_dir, revalidate_seconds, s3_client)
+        return _load_model_file(bucket_name, prefix, model_name, etag, path)
+
+    except Exception as e:
+        log.error(f"Failed to load model '{model_name}' from S3: {e}")
+        return None
+
+def feature_plan_name(model_name):
+    """
+    Return the name of the feature plan the pipeline saves next to a model, e.g. ``model.feature_plan.json``.
+    """
+    return f"{Path(model_name).stem}.feature_plan.json"
+
+@lru_cache(maxsize=8)
+def _load_plan_file(bucket_name, prefix, plan_name, etag, path):
+    """
+    Parse a downloaded feature plan; cached per bucket, prefix, file name and ETag.
+    """
+    return load_feature_plan(path)
+
+def load_model_feature_plan(bucket_name, prefix, model_name, cache_dir='model_cache', revalidate_seconds=300,
+                            s3_client=None):
+    """
+    Load the feature plan saved next to a model, through the same caches as the model.
+
+    Each model version has its own plan, so a version trained with other
+    features or transforms gets its own inputs.
+
+    Parameters:
+        bucket_name (str): The name of the S3 bucket.
+        prefix (str): The prefix path in the bucket.
+        model_name (str): The name of the model file the plan belongs to.
+        cache_dir (str): Local directory for downloaded artifacts.
+        revalidate_seconds (float): Seconds before a loaded plan is checked against S3 again.
+        s3_client: Optional boto3 S3 client; a shared client is used by default.
+
+    Returns:
+        dict: The feature plan, or None if the model has none or an error occurs.
+    """
+    plan_name = feature_plan_name(model_name)
+    try:
+        path, etag = _current_artifact(bucket_name, prefix, plan_name, cache_dir, revalidate_seconds, s3_client)
+        return _load_plan_file(bucket_name, prefix, plan_name, etag, path)
+
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            log.info(f"Model '{model_name}' has no feature plan.")
+            return None
+        log.error(f"Failed to load feature plan '{plan_name}' from S3: {e}")
+        return None
+    except Exception as e:
+        log.error(f"Failed to load feature plan '{plan_name}' from S3: {e}")
+        return None
@@ -0,0 +1,39 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.feature_transformer import load_feature_plan, transform
+
+@pytest.fixture
+def plan_path(tmp_path):
+    plan = {
+        'version': 1,
+        'input_columns': ['visible_entropy', 'IR_min', 'IR_max', 'IR_mean', 'visible_contrast'],
+        'steps': [
+            ['norm_range', 'IR_norm_range', ['IR_min', 'IR_max', 'IR_mean']],
+            ['log', 'log_visible_entropy', ['visible_entropy']],
+            ['multiply', 'visible_contrast_x_visible_entropy', ['visible_contrast', 'visible_entropy']],
+        ],
+        'output_columns': ['log_visible_entropy', 'IR_norm_range', 'visible_contrast_x_visible_entropy'],
+    }
+    path = tmp_path / 'feature_plan.json'
+    path.write_text(json.dumps(plan))
+    return path
+
+def test_transform(plan_path):
+    """Test that raw observations are turned into the model features."""
+    raw = pd.DataFrame({'visible_entropy': [1.0, np.e], 'IR_min': [100.0, 120.0], 'IR_max': [200.0, 180.0],
+                        'IR_mean': [150.0, 150.0], 'visible_contrast': [2.0, 3.0]})
+    features = transform(load_feature_plan(plan_path), raw)
+
+    assert list(features.columns) == ['log_visible_entropy', 'IR_norm_range', 'visible_contrast_x_visible_entropy']
+    np.testing.assert_allclose(features['log_visible_entropy'], [0.0, 1.0])
+    np.testing.assert_allclose(features['IR_norm_range'], [100 / 150, 60 / 150])
+    np.testing.assert_allclose(features['visible_contrast_x_visible_entropy'], [2.0, 3 * np.e])
+
+def test_transform_zero_mean(plan_path):
+    """Test that a zero mean raises a ValueError."""
+    raw = pd.DataFrame({'visible_entropy': [1.0], 'IR_min': [1.0], 'IR_max': [2.0], 'IR_mean': [0.0],
+                        'visible_contrast': [2.0]})
+    with pytest.raises(ValueError):
+        transform(load_feature_plan(plan_path), raw)
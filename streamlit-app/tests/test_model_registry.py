@@ -0,0 +1,80 @@
+import pytest
+import joblib
+import numpy as np
+from io import BytesIO
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from src import model_registry
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    model_registry._last_validated.clear()
+    model_registry._load_model_file.cache_clear()
+    model_registry._load_plan_file.cache_clear()
+
+@pytest.fixture
+def model_bytes():
+    buffer = BytesIO()
+    joblib.dump({'name': 'example_model'}, buffer)
+    return buffer.getvalue()
+
+@pytest.fixture
+def s3_client(model_bytes):
+    s3 = MagicMock()
+    s3.get_object.side_effect = lambda **kwargs: {'Body': BytesIO(model_bytes), 'ETag': '"abc"'}
+    return s3
+
+def test_load_model_uses_caches(s3_client, tmp_path):
+    """Test that a second load within the revalidation window does not call S3 or deserialize again."""
+    first = model_registry.load_model('bucket', 'prefix', 'model.pkl', tmp_path, 300, s3_client)
+    second = model_registry.load_model('bucket', 'prefix', 'model.pkl', tmp_path, 300, s3_client)
+
+    assert first == {'name': 'example_model'}
+    assert second is first
+    assert s3_client.get_object.call_count == 1
+    assert (tmp_path / 'bucket' / 'prefix' / 'model.pkl').exists()
+
+def test_load_model_conditional_get(s3_client, tmp_path):
+    """Test that revalidation sends the cached ETag and reuses the cached model on 304."""
+    first = model_registry.load_model('bucket', 'prefix', 'model.pkl', tmp_path, 0, s3_client)
+    s3_client.get_object.side_effect = ClientError({'Error': {'Code': '304'}}, 'GetObject')
+    second = model_registry.load_model('bucket', 'prefix', 'model.pkl', tmp_path, 0, s3_client)
+
+    assert second is first
+    assert s3_client.get_object.call_args.kwargs['IfNoneMatch'] == '"abc"'
+
+def test_load_model_failure(s3_client, tmp_path, caplog):
+    """Test to ensure None is returned on model loading failure."""
+    s3_client.get_object.side_effect = Exception('Mocked S3 error')
+
+    assert model_registry.load_model('bucket', 'prefix', 'model.pkl', tmp_path, 300, s3_client) is None
+    assert "Failed to load model 'model.pkl' from S3" in caplog.text
+
+def test_load_model_memory_maps_uncompressed_arrays(tmp_path):
+    """Test that arrays of an uncompressed model are memory-mapped and compressed models still load."""
+    for compress in (0, 3):
+        buffer = BytesIO()
+        joblib.dump({'values': np.arange(10)}, buffer, compress=compress)
+        s3 = MagicMock()
+        s3.get_object.side_effect = lambda **kwargs: {'Body': BytesIO(buffer.getvalue()), 'ETag': f'"{compress}"'}
+
+        model = model_registry.load_model('bucket', 'prefix', f'model_{compress}.pkl', tmp_path, 300, s3)
+
+        assert isinstance(model['values'], np.memmap) == (compress == 0)
+        np.testing.assert_array_equal(model['values'], np.arange(10))
+
+def test_load_model_feature_plan_per_model(tmp_path):
+    """Test that each model version loads the plan saved next to it, and None when it has none."""
+    plans = {'prefix/model_a.feature_plan.json': b'{"version": 1, "input_columns": ["a"]}'}
+    s3 = MagicMock()
+
+    def get_object(Bucket, Key, **kwargs):
+        if Key not in plans:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': BytesIO(plans[Key]), 'ETag': '"plan"'}
+
+    s3.get_object.side_effect = get_object
+    plan = model_registry.load_model_feature_plan('bucket', 'prefix', 'model_a.pkl', tmp_path, 300, s3)
+
+    assert plan['input_columns'] == ['a']
+    assert model_registry.load_model_feature_plan('bucket', 'prefix', 'model_b.pkl', tmp_path, 300, s3) is None
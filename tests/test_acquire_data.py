@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import logging.config
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src import acquire_data as ad
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+PAYLOAD = bytes(range(256)) * 400
+ETAG = '"v1"'
+
+class FlakyRangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range and If-Range support, dropping the first response halfway through."""
+    requests_seen = []
+    if_ranges_seen = []
+    # Send only half of every body, without a Content-Length, and close the connection
+    truncate = False
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.requests_seen.append(range_header)
+        self.if_ranges_seen.append(self.headers.get("If-Range"))
+        if self.headers.get("If-Range") not in (None, ETAG):
+            # The validator does not match: send the whole body
+            range_header = None
+        start = int(range_header.split("=")[1].split("-")[0]) if range_header else 0
+        if start >= len(PAYLOAD):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = PAYLOAD[start:]
+
+        self.send_response(206 if range_header else 200)
+        if range_header:
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        self.send_header("ETag", ETAG)
+        if self.truncate:
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if len(self.requests_seen) == 1:
+            # Send half of the body, then drop the connection
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+# Fixture for a local HTTP server
+@pytest.fixture
+def server_url():
+    """
+    Fixture for a local HTTP server that fails the first transfer midway.
+    """
+    logger.debug("Starting local HTTP server fixture")
+    FlakyRangeHandler.requests_seen = []
+    FlakyRangeHandler.if_ranges_seen = []
+    FlakyRangeHandler.truncate = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyRangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/clouds.data"
+    server.shutdown()
+    server.server_close()
+
+# Happy path test for a resumed download
+def test_download_data_resumes(server_url, tmp_path):
+    """
+    Test that an interrupted download resumes from the received bytes.
+    """
+    logger.debug("Running happy path test for download_data")
+    save_path = tmp_path / "clouds.data"
+    checksum = f"sha256:{hashlib.sha256(PAYLOAD).hexdigest()}"
+    ad.download_data(server_url, save_path, attempts=3, wait=0, chunk_size=1024, checksum=checksum)
+
+    assert save_path.read_bytes() == PAYLOAD
+    assert not (tmp_path / "clouds.data.part").exists()
+    assert FlakyRangeHandler.requests_seen == [None, f"bytes={len(PAYLOAD) // 2}-"]
+    assert FlakyRangeHandler.if_ranges_seen == [None, ETAG]
+    assert not (tmp_path / "clouds.data.part.validator").exists()
+    logger.info("Happy path test for download_data successful")
+
+# Test that stale partial downloads are not spliced onto the source
+@pytest.mark.parametrize("part, validator", [
+    (b"stale", '"v0"'),  # The source changed since the part was written
+    (b"stale", None),  # The part has no validator to check the source against
+    (PAYLOAD + b"extra", ETAG),  # The part is longer than the source
+])
+def test_download_data_discards_stale_part(server_url, tmp_path, part, validator):
+    """
+    Test that a partial file from an earlier run is replaced when it cannot be resumed safely.
+    """
+    logger.debug("Running test for download_data with a stale partial file")
+    FlakyRangeHandler.requests_seen = ["connection already dropped once"]
+    save_path = tmp_path / "clouds.data"
+    (tmp_path / "clouds.data.part").write_bytes(part)
+    if validator:
+        (tmp_path / "clouds.data.part.validator").write_text(validator)
+    ad.download_data(server_url, save_path, attempts=2, wait=0, chunk_size=1024)
+
+    assert save_path.read_bytes() == PAYLOAD
+    logger.info("Test for download_data with a stale partial file successful")
+
+# Unhappy path test for a checksum mismatch
+def test_download_data_checksum_mismatch(server_url, tmp_path):
+    """
+    Test that a checksum mismatch raises a ValueError and leaves no file behind.
+    """
+    logger.debug("Running unhappy path test for download_data")
+    save_path = tmp_path / "clouds.data"
+    with pytest.raises(ValueError):
+        ad.download_data(server_url, save_path, attempts=3, wait=0, checksum="sha256:0000")
+
+    assert not save_path.exists()
+    assert not (tmp_path / "clouds.data.part").exists()
+    logger.info("Unhappy path test for download_data successful")
+
+# Test that only the appended bytes are fetched
+def test_download_appended(server_url, tmp_path):
+    """
+    Test that an earlier copy is extended with the new bytes, and rejected if its tail changed.
+    """
+    logger.debug("Running test for download_appended")
+    FlakyRangeHandler.requests_seen = ["connection already dropped once"]
+    previous = tmp_path / "previous.data"
+    previous.write_bytes(PAYLOAD[:60000])
+    save_path = tmp_path / "clouds.data"
+
+    assert ad.download_appended(server_url, previous, save_path, overlap=1000, chunk_size=4096)
+    assert save_path.read_bytes() == PAYLOAD
+    assert FlakyRangeHandler.requests_seen[-1] == "bytes=59000-"
+
+    # A rewritten source does not match the previous copy's tail
+    previous.write_bytes(PAYLOAD[:59999] + b"x")
+    save_path.unlink()
+    assert not ad.download_appended(server_url, previous, save_path, overlap=1000, chunk_size=4096)
+    assert not save_path.exists()
+    logger.info("Test for download_appended successful")
+
+# Test that a range response that ends early is not kept
+def test_download_appended_truncated(server_url, tmp_path):
+    """
+    Test that fewer bytes than the Content-Range total are rejected without writing the copy.
+    """
+    logger.debug("Running test for download_appended with a truncated response")
+    FlakyRangeHandler.truncate = True
+    previous = tmp_path / "previous.data"
+    previous.write_bytes(PAYLOAD[:60000])
+    save_path = tmp_path / "clouds.data"
+
+    assert not ad.download_appended(server_url, previous, save_path, overlap=1000, chunk_size=4096)
+    assert not save_path.exists()
+    assert not (tmp_path / "clouds.data.part").exists()
+    logger.info("Test for download_appended with a truncated response successful")
@@ -0,0 +1,53 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from src import analysis as eda
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for a small feature frame
+@pytest.fixture
+def features():
+    """
+    Fixture for a small frame of features with a class column.
+    """
+    logger.debug("Creating features fixture")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(40, 3)), columns=["IR_min", "IR_max", "visible_entropy"])
+    data["class"] = np.arange(40) % 2
+    return data
+
+# Test that the process pool saves the same figures as the serial path
+def test_save_figures_in_workers(features, tmp_path):
+    """
+    Test that rendering on two workers saves the same figure files as rendering in-process.
+    """
+    logger.debug("Running test for save_figures with workers")
+    serial = eda.save_figures(features, tmp_path / "serial", n_workers=1)
+    parallel = eda.save_figures(features, tmp_path / "parallel", n_workers=2)
+
+    assert [path.name for path in parallel] == [path.name for path in serial]
+    assert len(parallel) == len(features.columns)
+    assert all(path.stat().st_size > 0 for path in parallel)
+    logger.info("Test for save_figures with workers successful")
+
+# Unhappy path test for a figure that cannot be saved
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_save_figures_failure(features, tmp_path, n_workers):
+    """
+    Test that a figure that cannot be saved is skipped and the others are saved on both paths.
+    """
+    logger.debug("Running unhappy path test for save_figures")
+    # The name points into a directory that does not exist
+    features = features.rename(columns={"IR_max": "missing_dir/IR_max"})
+    saved = eda.save_figures(features, tmp_path, n_workers=n_workers)
+    assert len(saved) == len(features.columns) - 1
+    assert not any("IR_max" in path.name for path in saved)
+    assert all(path.exists() for path in saved)
+    logger.info("Unhappy path test for save_figures successful")
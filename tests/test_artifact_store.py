@@ -0,0 +1,55 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from src import artifact_store as store
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for sample data
+@pytest.fixture
+def sample_data():
+    """
+    Fixture for sample data with a non-default index.
+    """
+    logger.debug("Creating sample data fixture")
+    data = pd.DataFrame({
+        "A": np.arange(10, dtype=float) / 3,
+        "B": np.arange(10, dtype=float) * 2,
+        "class": [0, 1] * 5,
+    })
+    return data.iloc[::-1]
+
+# Round trip test for every artifact format
+@pytest.mark.parametrize("fmt", list(store.FORMATS))
+def test_write_read_round_trip(sample_data, tmp_path, fmt):
+    """
+    Test that each format reads back the written data, with and without column selection.
+    """
+    logger.debug("Running round trip test for %s", fmt)
+    path = store.artifact_path(tmp_path, "data", fmt)
+    store.write_table(sample_data, path)
+
+    expected = sample_data.reset_index(drop=True)
+    pd.testing.assert_frame_equal(expected, store.read_table(path))
+    pd.testing.assert_frame_equal(expected[["B"]], store.read_table(path, ["B"]))
+
+    chunks = list(store.iter_table(path, ["A", "class"], chunksize=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    pd.testing.assert_frame_equal(expected[["A", "class"]], pd.concat(chunks, ignore_index=True))
+    logger.info("Round trip test for %s successful", fmt)
+
+# Unhappy path test for an unsupported format
+def test_artifact_path_invalid_format(tmp_path):
+    """
+    Test that an unknown format is rejected.
+    """
+    logger.debug("Running unhappy path test for artifact_path")
+    with pytest.raises(ValueError):
+        store.artifact_path(tmp_path, "data", "xlsx")
+    logger.info("Unhappy path test for artifact_path successful")
@@ -0,0 +1,178 @@
+import json
+import logging
+import logging.config
+import threading
+import urllib.error
+import urllib.request
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from sklearn.ensemble import RandomForestClassifier
+from src import batch_service as bs
+from src import generate_features as gf
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+FEATURE_CONFIG = {
+    "calculate_range": ["IR"],
+    "calculate_norm_range": ["IR"],
+    "log_transform": ["visible_entropy"],
+    "multiply": ["visible_contrast", "visible_entropy"],
+}
+SELECTED_FEATURES = ["log_visible_entropy", "IR_norm_range", "visible_contrast_x_visible_entropy"]
+
+# Fixture for raw observations
+@pytest.fixture
+def raw_data():
+    """
+    Fixture for raw cloud observations.
+    """
+    logger.debug("Creating raw data fixture")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "visible_contrast": rng.uniform(1, 10, 100),
+        "visible_entropy": rng.uniform(1, 3, 100),
+        "IR_min": rng.uniform(100, 150, 100),
+        "IR_max": rng.uniform(150, 250, 100),
+        "IR_mean": rng.uniform(150, 200, 100),
+    })
+    data["class"] = (data["visible_entropy"] > 2).astype(int)
+    return data
+
+# Fixture for a pipeline run directory
+@pytest.fixture
+def run_dir(raw_data, tmp_path):
+    """
+    Fixture for a run directory with a trained model and its config.
+    """
+    logger.debug("Creating run directory fixture")
+    features = gf.generate_features(raw_data, FEATURE_CONFIG)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(features[SELECTED_FEATURES],
+                                                                        raw_data["class"])
+    joblib.dump(model, tmp_path / "trained_model_object.pkl")
+    config = {"generate_features": FEATURE_CONFIG, "train_model": {"selected_features": SELECTED_FEATURES}}
+    with open(tmp_path / "config.yaml", "w") as f:
+        yaml.dump(config, f)
+    return tmp_path
+
+# Test that raw observations are transformed like the pipeline does
+def test_score_batch_matches_pipeline(raw_data, run_dir):
+    """
+    Test that scoring raw observations matches scoring pipeline features.
+    """
+    logger.debug("Running test for score_batch")
+    bundle = bs.load_scoring_bundle(run_dir)
+    features = gf.generate_features(raw_data, FEATURE_CONFIG)
+    expected = bundle["model"].predict_proba(features[SELECTED_FEATURES])[:, 1]
+
+    np.testing.assert_allclose(bs.score_batch(bundle, raw_data.drop(columns="class")), expected)
+    logger.info("Test for score_batch successful")
+
+# Test that concurrent requests are coalesced into micro-batches
+def test_micro_batcher_coalesces_requests(raw_data):
+    """
+    Test that requests submitted together are scored in one call.
+    """
+    logger.debug("Running test for MicroBatcher")
+    calls = []
+
+    def score_fn(batch):
+        calls.append(len(batch))
+        return batch["visible_entropy"].to_numpy()
+
+    batcher = bs.MicroBatcher(score_fn, max_batch_rows=1000, max_wait_ms=200)
+    chunks = [raw_data.iloc[i:i + 10] for i in range(0, 100, 10)]
+    futures = [batcher.submit(chunk) for chunk in chunks]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    assert calls == [100]
+    for chunk, result in zip(chunks, results):
+        np.testing.assert_array_equal(result, chunk["visible_entropy"].to_numpy())
+    logger.info("Test for MicroBatcher successful")
+
+# Test that a failing request does not fail the others in its micro-batch
+def test_micro_batcher_isolates_failures(raw_data):
+    """
+    Test that only the request that cannot be scored gets the exception.
+    """
+    logger.debug("Running test for MicroBatcher with a bad request")
+    calls = []
+
+    def score_fn(batch):
+        calls.append(len(batch))
+        if (batch["visible_entropy"] <= 0).any():
+            raise ValueError("visible_entropy must be positive.")
+        return batch["visible_entropy"].to_numpy()
+
+    batcher = bs.MicroBatcher(score_fn, max_batch_rows=1000, max_wait_ms=200)
+    good, bad = raw_data.iloc[:10], raw_data.iloc[10:20].assign(visible_entropy=0.0)
+    futures = [batcher.submit(good), batcher.submit(bad)]
+    np.testing.assert_array_equal(futures[0].result(timeout=5), good["visible_entropy"].to_numpy())
+    with pytest.raises(ValueError, match="must be positive"):
+        futures[1].result(timeout=5)
+    batcher.close()
+
+    assert calls == [20, 10, 10]
+    logger.info("Test for MicroBatcher with a bad request successful")
+
+# Test the HTTP endpoint
+def test_predict_endpoint(raw_data, run_dir):
+    """
+    Test that POST /predict returns probabilities and latency percentiles.
+    """
+    logger.debug("Running test for the HTTP endpoint")
+    bundle = bs.load_scoring_bundle(run_dir)
+    server = bs.serve(bundle, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/predict",
+            data=raw_data.drop(columns="class").to_csv(index=False).encode(),
+            headers={"Content-Type": "text/csv"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            body = json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(body["probabilities"]) == len(raw_data)
+    assert body["latency"]["requests"] == 1
+    logger.info("Test for the HTTP endpoint successful")
+
+# Test the error statuses of the endpoint with a saved feature plan
+def test_predict_endpoint_errors(raw_data, run_dir):
+    """
+    Test that a missing column returns 400 and an unknown content type 415.
+    """
+    logger.debug("Running test for HTTP endpoint errors")
+    plan = gf.compile_feature_plan(FEATURE_CONFIG, list(raw_data.columns))
+    gf.save_feature_plan(gf.prune_feature_plan(plan, SELECTED_FEATURES),
+                         run_dir / "trained_model_object.feature_plan.json")
+    server = bs.serve(bs.load_scoring_bundle(run_dir), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(data, content_type):
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/predict",
+                                         data=data.to_csv(index=False).encode(),
+                                         headers={"Content-Type": content_type})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=10)
+        return error.value.code, json.loads(error.value.read())
+
+    try:
+        status, body = post(raw_data.drop(columns=["class", "IR_mean"]), "text/csv")
+        assert status == 400 and "IR_mean" in body["error"]
+        status, body = post(raw_data.drop(columns="class"), "text/plain")
+        assert status == 415
+    finally:
+        server.shutdown()
+        server.server_close()
+    logger.info("Test for HTTP endpoint errors successful")
@@ -0,0 +1,60 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src import compare_models as cm
+from src import train_model as tm
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for test data and two saved models using different features
+@pytest.fixture
+def models(tmp_path):
+    """
+    Fixture for a test set and two saved models, one per feature subset.
+    """
+    logger.debug("Creating models fixture")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"], index=np.arange(1000, 1300))
+    target = pd.Series((data["a"] + 0.5 * data["b"] > 0).astype(int), index=data.index, name="class")
+    paths = []
+    for i, features in enumerate((["a", "b"], ["c"])):
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(data[features], target)
+        paths.append(tmp_path / f"model_{i}" / "trained_model_object.pkl")
+        paths[-1].parent.mkdir()
+        tm.save_model(model, paths[-1], features=features)
+    return data, target, paths
+
+# Test that every model is scored from shared memory and compared
+def test_compare_models(models, tmp_path):
+    """
+    Test that the worker probabilities match in-process scoring and the comparison is saved.
+    """
+    logger.debug("Running test for compare_models")
+    data, target, paths = models
+    model_paths = cm.model_names(paths)
+
+    scores, comparison, model_metrics = cm.compare_models(data, target, model_paths, ["auc", "accuracy"],
+                                                          batch_size=128, n_workers=2)
+
+    assert list(model_paths) == ["model_0_trained_model_object", "model_1_trained_model_object"]
+    for name, path in model_paths.items():
+        model = tm.load_model(path)
+        expected = model.predict_proba(data[list(model.feature_names_in_)])[:, 1]
+        np.testing.assert_allclose(scores[name], expected)
+    pd.testing.assert_series_equal(scores["true_labels"], target.rename("true_labels"))
+    # The informative model ranks first
+    assert comparison["model"].tolist() == list(model_paths)
+    assert comparison["auc"].iloc[0] > comparison["auc"].iloc[1]
+    assert model_metrics[comparison["model"].iloc[0]]["auc"] == comparison["auc"].iloc[0]
+
+    saved = cm.save_comparison(scores, comparison, model_metrics, tmp_path)
+    assert all(path.exists() for path in saved)
+    assert len(list((tmp_path / "model_metrics").glob("*.yaml"))) == 2
+    logger.info("Test for compare_models successful")
@@ -0,0 +1,63 @@
+import logging
+import logging.config
+import numpy as np
+import pytest
+from src import create_dataset as cd
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for a raw data file with a header and two class blocks
+@pytest.fixture
+def raw_file(tmp_path):
+    """
+    Fixture for a whitespace-delimited raw data file.
+    """
+    logger.debug("Creating raw data file fixture")
+    lines = ["Header line describing the data\n", "\n"]
+    lines += [f"  {i}.000000  {i + 1}.500000  {i * 2}.250000\n" for i in range(5)]
+    lines += ["\n", "Second class\n"]
+    lines += [f"  {i}.000000  {i + 3}.500000  {i * 3}.250000\n" for i in range(10, 14)]
+    file_path = tmp_path / "clouds.data"
+    file_path.write_text("".join(lines))
+    return file_path
+
+# Happy path test for create_dataset
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_create_dataset_happy_path(raw_file, chunk_size):
+    """
+    Happy path test for create_dataset with different chunk sizes.
+    """
+    logger.debug("Running happy path test for create_dataset")
+    result = cd.create_dataset(raw_file, [[2, 7], [9, 13]], ["a", "b", "c"], chunk_size)
+
+    assert list(result.columns) == ["a", "b", "c", "class"]
+    assert result["class"].tolist() == [0] * 5 + [1] * 4
+    assert result["a"].dtype == np.float64
+    assert result["b"].tolist() == [1.5, 2.5, 3.5, 4.5, 5.5, 13.5, 14.5, 15.5, 16.5]
+    logger.info("Happy path test for create_dataset successful")
+
+# Unhappy path test for create_dataset
+def test_create_dataset_ragged_rows(raw_file):
+    """
+    Unhappy path test for rows with the wrong number of values.
+    """
+    logger.debug("Running unhappy path test for create_dataset")
+    with pytest.raises(ValueError):
+        cd.create_dataset(raw_file, [[0, 7], [9, 13]], ["a", "b", "c"])
+    logger.info("Unhappy path test for create_dataset successful")
+
+# Unhappy path test for ragged rows whose values add up to whole rows
+def test_iter_class_rows_ragged_rows_same_total(tmp_path):
+    """
+    Test that a long row followed by a short one raises instead of being reshaped.
+    """
+    logger.debug("Running unhappy path test for iter_class_rows")
+    file_path = tmp_path / "ragged.data"
+    file_path.write_text("1 2 3\n4\n")
+    with pytest.raises(ValueError, match="do not all have 2 values"):
+        list(cd.iter_class_rows(file_path, [[0, 2]], 2))
+    logger.info("Unhappy path test for iter_class_rows successful")
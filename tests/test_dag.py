@@ -0,0 +1,120 @@
+import logging
+import logging.config
+import threading
+import pytest
+from src.dag import Stage, run_dag, subgraph, topological_order
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Test that independent stages run concurrently and results flow downstream
+def test_run_dag_runs_independent_stages_concurrently():
+    """
+    Test that two independent branches overlap and their results reach the join stage.
+    """
+    logger.debug("Running test for run_dag concurrency")
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value):
+        def func(inputs):
+            # Both branches must be running at once to pass the barrier
+            barrier.wait()
+            return inputs["source"] + value
+        return func
+
+    stages = [
+        Stage("join", lambda inputs: inputs["left"] + inputs["right"], ("left", "right")),
+        Stage("left", branch(1), ("source",)),
+        Stage("right", branch(2), ("source",)),
+        Stage("source", lambda inputs: 10),
+    ]
+    results = run_dag(stages, max_workers=2)
+
+    assert results == {"source": 10, "left": 11, "right": 12, "join": 23}
+    logger.info("Test for run_dag concurrency successful")
+
+# Test that a failure stops downstream stages and is raised
+def test_run_dag_propagates_failure():
+    """
+    Test that the first error is raised and stages depending on it are not run.
+    """
+    logger.debug("Running test for run_dag failure propagation")
+    ran = []
+
+    def fail(inputs):
+        raise ValueError("broken stage")
+
+    stages = [
+        Stage("broken", fail),
+        Stage("downstream", lambda inputs: ran.append("downstream"), ("broken",)),
+    ]
+    with pytest.raises(ValueError, match="broken stage"):
+        run_dag(stages)
+    assert ran == []
+    logger.info("Test for run_dag failure propagation successful")
+
+# Test that stages sharing a resource do not overlap
+def test_run_dag_serializes_shared_resources():
+    """
+    Test that stages holding the same resource never run at the same time.
+    """
+    logger.debug("Running test for run_dag resources")
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def plot(inputs):
+        with lock:
+            active.append(1)
+            overlaps.append(len(active))
+        threading.Event().wait(0.05)
+        with lock:
+            active.pop()
+
+    stages = [Stage(f"plot_{i}", plot, resources=("pyplot",)) for i in range(3)]
+    run_dag(stages, max_workers=3)
+
+    assert overlaps == [1, 1, 1]
+    logger.info("Test for run_dag resources successful")
+
+# Test that invalid graphs are rejected
+def test_topological_order_rejects_cycles_and_unknown_stages():
+    """
+    Test that cycles and unknown dependencies raise ValueError.
+    """
+    logger.debug("Running test for topological_order")
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order([Stage("a", None, ("b",)), Stage("b", None, ("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        topological_order([Stage("a", None, ("missing",))])
+    logger.info("Test for topological_order successful")
+
+# Test that a subgraph loads the results of the stages it does not run
+def test_subgraph_replaces_upstream_stages_with_loaders():
+    """
+    Test that only the selected stages run and their other dependencies come from the loaders.
+    """
+    logger.debug("Running test for subgraph")
+    ran = []
+
+    def stage(name, value):
+        def func(inputs):
+            ran.append(name)
+            return sum(inputs.values()) + value
+        return func
+
+    stages = [
+        Stage("source", stage("source", 1)),
+        Stage("middle", stage("middle", 10), ("source",)),
+        Stage("sink", stage("sink", 100), ("middle",)),
+    ]
+    results = run_dag(subgraph(stages, ["sink"], {"middle": lambda inputs: 5}))
+
+    assert results == {"middle": 5, "sink": 105}
+    assert ran == ["sink"]
+    with pytest.raises(ValueError, match="No loader"):
+        subgraph(stages, ["middle"], {})
+    logger.info("Test for subgraph successful")
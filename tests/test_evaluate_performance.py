@@ -0,0 +1,98 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn import metrics
+from src import evaluate_performance as ep
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for model scores with tied probabilities
+@pytest.fixture
+def scores():
+    """
+    Fixture for labels and rounded (and therefore tied) probabilities.
+    """
+    logger.debug("Creating scores fixture")
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 300)
+    y_score = np.round(np.clip(0.3 * y_true + rng.uniform(0, 0.7, 300), 0, 1), 1)
+    return y_true, y_score
+
+def sklearn_metrics(y_true, y_score, threshold, sample_weight=None):
+    """Reference metrics computed with scikit-learn."""
+    y_pred = (y_score > threshold).astype(int)
+    return {
+        "auc": metrics.roc_auc_score(y_true, y_score, sample_weight=sample_weight),
+        "accuracy": metrics.accuracy_score(y_true, y_pred, sample_weight=sample_weight),
+        "precision": metrics.precision_score(y_true, y_pred, sample_weight=sample_weight, zero_division=0),
+        "recall": metrics.recall_score(y_true, y_pred, sample_weight=sample_weight),
+        "f1": metrics.f1_score(y_true, y_pred, sample_weight=sample_weight),
+    }
+
+# Test that the vectorized resample metrics match scikit-learn with sample weights
+def test_resample_metrics_match_sklearn(scores):
+    """
+    Test each resample's metrics against scikit-learn with the same weights.
+    """
+    logger.debug("Running test for resample_metrics")
+    y_true, y_score = scores
+    weights = np.random.default_rng(1).multinomial(len(y_true), np.full(len(y_true), 1 / len(y_true)), size=5)
+    results = ep.resample_metrics(y_true, y_score, weights, threshold=0.4)
+
+    for row, weight in enumerate(weights):
+        expected = sklearn_metrics(y_true, y_score, 0.4, sample_weight=weight)
+        for name, value in expected.items():
+            assert results[name][row] == pytest.approx(value)
+    logger.info("Test for resample_metrics successful")
+
+# Test the bootstrap estimates and intervals
+def test_bootstrap_metrics(scores):
+    """
+    Test that estimates equal the full-sample metrics and lie within their intervals.
+    """
+    logger.debug("Running test for bootstrap_metrics")
+    y_true, y_score = scores
+    results = ep.bootstrap_metrics(y_true, y_score, threshold=0.5, n_resamples=500, random_state=0,
+                                   max_cells=10000)
+
+    for name, value in sklearn_metrics(y_true, y_score, 0.5).items():
+        assert results[name]["estimate"] == pytest.approx(value)
+        assert results[name]["lower"] <= value <= results[name]["upper"]
+    logger.info("Test for bootstrap_metrics successful")
+
+# Test the threshold sweep against scikit-learn at every threshold
+def test_threshold_sweep_matches_sklearn(scores):
+    """
+    Test every row of the threshold sweep against scikit-learn.
+    """
+    logger.debug("Running test for threshold_sweep")
+    y_true, y_score = scores
+    sweep = ep.threshold_sweep(y_true, y_score)
+
+    assert list(sweep["threshold"]) == sorted(np.unique(y_score), reverse=True)
+    for _, row in sweep.iterrows():
+        expected = sklearn_metrics(y_true, y_score, row["threshold"])
+        for name in ("accuracy", "precision", "recall", "f1"):
+            assert row[name] == pytest.approx(expected[name])
+    logger.info("Test for threshold_sweep successful")
+
+# Test that evaluate_performance adds the bootstrap intervals
+def test_evaluate_performance_with_bootstrap(scores):
+    """
+    Test that the bootstrap section is added as plain floats.
+    """
+    logger.debug("Running test for evaluate_performance with bootstrap")
+    y_true, y_score = scores
+    frame = pd.DataFrame({"true_labels": y_true, "predicted_probabilities": y_score,
+                          "predicted_labels": (y_score > 0.5).astype(int)})
+    results = ep.evaluate_performance(frame, ["auc"], {"n_resamples": 100, "random_state": 0})
+
+    assert results["bootstrap"]["auc"]["estimate"] == pytest.approx(results["auc"])
+    assert all(type(value) is float for value in results["bootstrap"]["f1"].values())
+    logger.info("Test for evaluate_performance with bootstrap successful")
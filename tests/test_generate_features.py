@@ -234,3 +234,41 @@ def test_generate_features_log_unhappy_path(sample_data):
         logger.error("Unhappy path test for log transformation in generate_features failed")
     except ValueError:
         logger.info("Unhappy path test for log transformation in generate_features successful")
+
+# Test that the compiled feature plan matches the step-by-step transformations
+def test_feature_plan_matches_stepwise(sample_data, feature_config):
+    """
+    Test that apply_feature_plan reproduces the individual feature steps.
+    """
+    logger.debug("Running test for compiled feature plan")
+    plan = gf.compile_feature_plan(feature_config, list(sample_data.columns))
+    result = gf.apply_feature_plan(sample_data, plan)
+
+    expected = gf.convert_columns_to_float(sample_data.copy())
+    expected = gf.calculate_range_features(expected, feature_config["calculate_range"])
+    expected = gf.calculate_normalized_range_features(expected, feature_config["calculate_norm_range"])
+    expected = gf.perform_log_transformation(expected, feature_config["log_transform"])
+    expected = gf.perform_feature_multiplication(expected, feature_config["multiply"])
+
+    assert plan.input_columns == ["B_max", "B_min", "C_max", "C_min", "C_mean", "A", "D"]
+    pd.testing.assert_frame_equal(expected, result)
+    logger.info("Test for compiled feature plan successful")
+
+# Test pruning and serializing the feature plan used at serving time
+def test_pruned_feature_plan_round_trip(sample_data, feature_config, tmp_path):
+    """
+    Test that a pruned plan keeps only the needed steps and survives a save and load.
+    """
+    logger.debug("Running test for pruned feature plan")
+    plan = gf.compile_feature_plan(feature_config, list(sample_data.columns))
+    pruned = gf.prune_feature_plan(plan, ["log_B_range", "A"])
+    gf.save_feature_plan(pruned, tmp_path / "feature_plan.json")
+    loaded = gf.load_feature_plan(tmp_path / "feature_plan.json")
+
+    assert loaded == pruned
+    assert loaded.input_columns == ["B_max", "B_min", "A"]
+    assert [target for _, target, _ in loaded.steps] == ["B_range", "log_B_range"]
+    result = gf.apply_feature_plan(sample_data[loaded.input_columns], loaded)[loaded.output_columns]
+    expected = gf.generate_features(sample_data, feature_config)[["log_B_range", "A"]]
+    pd.testing.assert_frame_equal(expected, result)
+    logger.info("Test for pruned feature plan successful")
@@ -0,0 +1,105 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from src import create_dataset as cd
+from src import generate_features as gf
+from src import incremental as inc
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["visible_entropy", "IR_min", "IR_max", "IR_mean"]
+CLASS_INDICES = [[2, 12], [14, None]]
+FEATURE_CONFIG = {"calculate_range": ["IR"], "log_transform": ["visible_entropy"]}
+
+def raw_lines(n_rows, seed):
+    """Return whitespace-delimited raw rows."""
+    values = np.random.default_rng(seed).uniform(1, 100, (n_rows, len(COLUMNS)))
+    return [" ".join(f"{value:.4f}" for value in row) + "\n" for row in values]
+
+# Fixture for a raw feed with a header, two classes and a separator
+@pytest.fixture
+def raw_path(tmp_path):
+    """
+    Fixture for a raw data file whose last class grows at the end of the file.
+    """
+    logger.debug("Creating raw data fixture")
+    path = tmp_path / "clouds.data"
+    path.write_text("".join(["header\n", "\n"] + raw_lines(10, 0) + ["\n", "separator\n"] + raw_lines(5, 1)))
+    return path
+
+def full_rebuild(raw_path):
+    """Parse and featurize the whole raw file."""
+    data = cd.create_dataset(raw_path, CLASS_INDICES, COLUMNS)
+    return data, gf.generate_features(data, FEATURE_CONFIG)
+
+# Test that appended rows are processed as a new partition
+def test_incremental_store_appends_only_new_rows(raw_path, tmp_path):
+    """
+    Test that only appended rows are parsed and the store matches a full rebuild.
+    """
+    logger.debug("Running test for incremental append")
+    store = tmp_path / "store"
+    inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+    inc.append_features(store, FEATURE_CONFIG)
+
+    with open(raw_path, "a") as f:
+        f.writelines(raw_lines(3, 2))
+    manifest = inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+    inc.append_features(store, FEATURE_CONFIG)
+
+    assert [partition["rows"] for partition in manifest["partitions"]] == [15, 3]
+    data, features = full_rebuild(raw_path)
+    pd.testing.assert_frame_equal(inc.read_store(store, "dataset"), data)
+    pd.testing.assert_frame_equal(inc.read_store(store, "features"), features)
+    logger.info("Test for incremental append successful")
+
+# Test that a changed row range is reprocessed
+def test_incremental_store_reprocesses_changed_rows(raw_path, tmp_path):
+    """
+    Test that editing rows of a stored partition reprocesses that partition and the later ones.
+    """
+    logger.debug("Running test for incremental change detection")
+    store = tmp_path / "store"
+    inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+    with open(raw_path, "a") as f:
+        f.writelines(raw_lines(3, 2))
+    inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+
+    lines = raw_path.read_text().splitlines(keepends=True)
+    lines[3] = "1.0 2.0 3.0 4.0\n"
+    raw_path.write_text("".join(lines))
+    manifest = inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+
+    assert [partition["rows"] for partition in manifest["partitions"]] == [18]
+    pd.testing.assert_frame_equal(inc.read_store(store, "dataset"), full_rebuild(raw_path)[0])
+    logger.info("Test for incremental change detection successful")
+
+# Test that a last line without a newline is left for the next run
+@pytest.mark.parametrize("continuation", ["\n", "9.0 9.0\n"])
+def test_incremental_store_waits_for_unfinished_line(raw_path, tmp_path, continuation):
+    """
+    Test that an unfinished last line is parsed only once it is complete, however it is finished.
+    """
+    logger.debug("Running test for incremental append of an unfinished line")
+    store = tmp_path / "store"
+    lines = raw_path.read_text().splitlines(keepends=True)
+    # Either the newline or the last two values of the last row are still missing
+    lines[-1] = lines[-1].rstrip("\n") if continuation == "\n" else " ".join(lines[-1].split()[:2]) + " "
+    raw_path.write_text("".join(lines))
+    manifest = inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+    assert [partition["rows"] for partition in manifest["partitions"]] == [14]
+
+    with open(raw_path, "a") as f:
+        f.write(continuation)
+        f.writelines(raw_lines(3, 2))
+    manifest = inc.append_dataset(raw_path, store, CLASS_INDICES, COLUMNS)
+
+    assert [partition["rows"] for partition in manifest["partitions"]] == [14, 4]
+    pd.testing.assert_frame_equal(inc.read_store(store, "dataset"), full_rebuild(raw_path)[0])
+    logger.info("Test for incremental append of an unfinished line successful")
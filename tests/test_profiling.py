@@ -0,0 +1,62 @@
+import json
+import logging
+import logging.config
+import pandas as pd
+import pytest
+from src import profiling as prof
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Test that stage records and the JSON report are written
+def test_profile_stage_writes_report(tmp_path):
+    """
+    Test that profiled stages are recorded with timings, sizes and cProfile dumps.
+    """
+    logger.debug("Running test for profile_stage")
+    report = prof.new_report()
+    data = pd.DataFrame({"a": range(100), "b": [0.5] * 100})
+    with prof.profile_stage(report, "sum", tmp_path / "profiles") as record:
+        record["rows_in"], record["bytes_in"] = prof.frame_size(data)
+        total = data.sum().sum()
+    with pytest.raises(ValueError):
+        with prof.profile_stage(report, "broken"):
+            raise ValueError("stage failed")
+    prof.write_profile(report, tmp_path / "profile.json")
+
+    with open(tmp_path / "profile.json") as f:
+        profile = json.load(f)
+    assert total == 5000
+    assert [stage["stage"] for stage in profile["stages"]] == ["sum", "broken"]
+    assert [stage["status"] for stage in profile["stages"]] == ["ok", "failed"]
+    assert profile["stages"][0]["rows_in"] == 100
+    assert profile["stages"][0]["wall_time_s"] >= 0
+    assert profile["wall_time_s"] >= profile["stages_wall_time_s"]
+    assert "_start" not in profile
+    assert (tmp_path / "profiles" / "sum.prof").exists()
+    logger.info("Test for profile_stage successful")
+
+# Test that peak memory is reported per stage as the growth of the process-wide peak
+def test_profile_stage_peak_rss():
+    """
+    Test that a later, lighter stage repeats the process peak but reports no increase.
+    """
+    logger.debug("Running test for profile_stage peak RSS")
+    resource = pytest.importorskip("resource")
+    report = prof.new_report()
+    # Allocate more than the peak so far, whatever earlier tests used
+    size = int((prof._peak_rss_mb(resource.RUSAGE_SELF) + 64) * 1e6)
+    with prof.profile_stage(report, "heavy"):
+        block = bytearray(size)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+    with prof.profile_stage(report, "light"):
+        pass
+    heavy, light = report["stages"]
+    assert heavy["peak_rss_increase_mb"] > 0
+    assert light["peak_rss_increase_mb"] == 0
+    assert light["process_peak_rss_mb"] >= heavy["process_peak_rss_mb"]
+    logger.info("Test for profile_stage peak RSS successful")
@@ -0,0 +1,83 @@
+import json
+import logging
+import logging.config
+import numpy as np
+import pytest
+from sklearn import metrics
+from src import evaluate_performance as ep
+from src import reporting as rp
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for evaluation metrics and the threshold sweep of tied scores
+@pytest.fixture
+def evaluation():
+    """
+    Fixture for evaluation metrics and a threshold sweep of rounded probabilities.
+    """
+    logger.debug("Creating evaluation fixture")
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 300)
+    y_score = np.round(np.clip(0.3 * y_true + rng.uniform(0, 0.7, 300), 0, 1), 2)
+    evaluation_metrics = {"auc": metrics.roc_auc_score(y_true, y_score), "accuracy": 0.9,
+                          "classification_report": {"macro avg": {"f1-score": 0.85, "precision": 0.8,
+                                                                  "recall": 0.95}}}
+    return y_true, y_score, evaluation_metrics, ep.threshold_sweep(y_true, y_score)
+
+# Test that the curves from the sweep match scikit-learn
+def test_curves_match_sklearn(evaluation):
+    """
+    Test that the ROC and precision-recall curves match scikit-learn and are thinned.
+    """
+    logger.debug("Running test for curves")
+    y_true, y_score, _, sweep = evaluation
+    curves = rp.curves(sweep, max_points=len(sweep) + 1)
+    fpr, tpr, _ = metrics.roc_curve(y_true, y_score, drop_intermediate=False)
+    np.testing.assert_allclose(curves["roc"]["fpr"], fpr)
+    np.testing.assert_allclose(curves["roc"]["tpr"], tpr)
+    precision, recall, _ = metrics.precision_recall_curve(y_true, y_score)
+    np.testing.assert_allclose(curves["pr"]["precision"], precision[-2::-1])
+    np.testing.assert_allclose(curves["pr"]["recall"], recall[-2::-1])
+
+    thinned = rp.curves(sweep, max_points=10)
+    assert len(thinned["roc"]["fpr"]) <= 10
+    assert thinned["roc"]["fpr"][0] == 0 and thinned["roc"]["tpr"][-1] == 1
+    logger.info("Test for curves successful")
+
+# Test the outputs that do not need matplotlib
+def test_save_report_without_matplotlib(evaluation, tmp_path):
+    """
+    Test that the JSON and HTML reports hold the metrics and the curves.
+    """
+    logger.debug("Running test for save_report")
+    _, _, evaluation_metrics, sweep = evaluation
+    report = rp.build_report(evaluation_metrics, sweep, max_points=50)
+    assert report["metrics"] == {"Accuracy": 0.9, "AUC": evaluation_metrics["auc"], "F1-Score": 0.85,
+                                 "Precision": 0.8, "Recall": 0.95}
+    paths = rp.save_report(report, tmp_path, ["json", "html"])
+    assert [path.name for path in paths] == ["evaluation_report.json", "evaluation_report.html"]
+    with open(paths[0]) as f:
+        assert json.load(f) == report
+    page = paths[1].read_text()
+    assert page.count("<svg") == 3 and "ROC Curve" in page
+    with pytest.raises(ValueError, match="Unknown report formats"):
+        rp.save_report(report, tmp_path, ["pdf"])
+    logger.info("Test for save_report successful")
+
+# Test that the figures render in the background worker
+def test_render_in_background(evaluation, tmp_path):
+    """
+    Test that the worker saves one PNG per chart, and only the bars without a sweep.
+    """
+    logger.debug("Running test for render_in_background")
+    _, _, evaluation_metrics, sweep = evaluation
+    paths = rp.render_in_background(rp.build_report(evaluation_metrics, sweep), tmp_path).result()
+    assert [path.name for path in paths] == ["metrics_bar_chart.png", "roc_curve.png", "pr_curve.png"]
+    assert all(path.stat().st_size > 0 for path in paths)
+    assert [path.name for path in rp.render_figures(rp.build_report(evaluation_metrics), tmp_path)] == [
+        "metrics_bar_chart.png"]
+    logger.info("Test for render_in_background successful")
@@ -0,0 +1,76 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src import score_model as sm
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+FEATURES = ["a", "b"]
+
+# Fixture for sample data
+@pytest.fixture
+def sample_data():
+    """
+    Fixture for sample data with a binary class column.
+    """
+    logger.debug("Creating sample data fixture")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.random((200, 2)), columns=FEATURES)
+    data["class"] = (data["a"] + rng.normal(0, 0.2, 200) > 0.5).astype(int)
+    return data
+
+# Fixture for a trained model
+@pytest.fixture
+def model(sample_data):
+    """
+    Fixture for a random forest trained on the sample data.
+    """
+    logger.debug("Creating model fixture")
+    return RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(
+        sample_data[FEATURES], sample_data["class"])
+
+# Test that single-inference scoring matches predict and predict_proba
+@pytest.mark.parametrize("batch_size", [None, 7])
+def test_score_model_matches_predict(sample_data, model, batch_size):
+    """
+    Test that scores match the model's own predictions.
+    """
+    logger.debug("Running test for single-inference scoring")
+    scores = sm.score_model(sample_data, sample_data["class"], model, FEATURES, batch_size=batch_size)
+
+    np.testing.assert_array_equal(scores["predicted_labels"], model.predict(sample_data[FEATURES]))
+    np.testing.assert_allclose(scores["predicted_probabilities"],
+                               model.predict_proba(sample_data[FEATURES])[:, 1])
+    logger.info("Test for single-inference scoring successful")
+
+# Test that the decision threshold is applied to the probabilities
+def test_labels_from_probabilities_threshold():
+    """
+    Test that labels follow the configured threshold.
+    """
+    logger.debug("Running test for decision threshold")
+    labels = sm.labels_from_probabilities(np.array([0.2, 0.5, 0.7]), np.array([0, 1]), threshold=0.3)
+    assert labels.tolist() == [0, 1, 1]
+    logger.info("Test for decision threshold successful")
+
+# Test batch scoring from disk
+def test_score_file(sample_data, model, tmp_path):
+    """
+    Test that scoring a file in batches matches in-memory scoring.
+    """
+    logger.debug("Running test for batch scoring from disk")
+    sample_data.to_csv(tmp_path / "data.csv", index=False)
+    n_rows = sm.score_file(tmp_path / "data.csv", tmp_path / "scores.csv", model, FEATURES, batch_size=30)
+
+    expected = sm.score_model(sample_data, sample_data["class"], model, FEATURES)
+    result = pd.read_csv(tmp_path / "scores.csv")
+    assert n_rows == len(sample_data)
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), result)
+    logger.info("Test for batch scoring from disk successful")
@@ -0,0 +1,75 @@
+import logging
+import logging.config
+import os
+import pytest
+from src import stage_cache as sc
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for a run directory with one stage output
+@pytest.fixture
+def run_dir(tmp_path):
+    """
+    Fixture for a run directory containing a stage output file.
+    """
+    logger.debug("Creating run directory fixture")
+    run = tmp_path / "run"
+    (run / "figures").mkdir(parents=True)
+    (run / "figures" / "a.png").write_bytes(b"png")
+    (run / "clouds.csv").write_text("a,b\n1,2\n")
+    return run
+
+# Test that keys change with config and input content
+def test_stage_key_depends_on_config_and_inputs(run_dir):
+    """
+    Test that the stage key covers the config section and input file contents.
+    """
+    logger.debug("Running test for stage keys")
+    data = run_dir / "clouds.csv"
+    key = sc.stage_key("generate_features", {"log_transform": ["a"]}, [data])
+
+    assert key == sc.stage_key("generate_features", {"log_transform": ["a"]}, [data])
+    assert key != sc.stage_key("generate_features", {"log_transform": ["b"]}, [data])
+    data.write_text("a,b\n1,3\n")
+    assert key != sc.stage_key("generate_features", {"log_transform": ["a"]}, [data])
+    logger.info("Test for stage keys successful")
+
+# Test storing and restoring stage outputs
+def test_store_and_restore(run_dir, tmp_path):
+    """
+    Test that stored outputs are restored into a new run directory.
+    """
+    logger.debug("Running test for store and restore")
+    cache_dir = tmp_path / "cache"
+    key = sc.stage_key("analysis", {}, ["upstream"])
+    assert not sc.restore(cache_dir, "analysis", key, tmp_path / "new_run")
+
+    sc.store(cache_dir, "analysis", key, [run_dir / "figures", run_dir / "clouds.csv"], run_dir)
+    assert sc.restore(cache_dir, "analysis", key, tmp_path / "new_run")
+    assert (tmp_path / "new_run" / "figures" / "a.png").read_bytes() == b"png"
+    assert (tmp_path / "new_run" / "clouds.csv").exists()
+    logger.info("Test for store and restore successful")
+
+# Test least recently used eviction
+def test_evict_least_recently_used(run_dir, tmp_path):
+    """
+    Test that eviction removes the least recently used entries first.
+    """
+    logger.debug("Running test for cache eviction")
+    cache_dir = tmp_path / "cache"
+    entries = [sc.store(cache_dir, "stage", sc.stage_key("stage", {}, [i]), [run_dir / "clouds.csv"], run_dir)
+               for i in range(3)]
+    for age, entry in zip([300, 100, 200], entries):
+        marker = entry / sc.LAST_USED
+        os.utime(marker, (marker.stat().st_mtime - age,) * 2)
+
+    entry_size = sum(f.stat().st_size for f in entries[0].rglob("*") if f.is_file())
+    removed = sc.evict(cache_dir, max_bytes=entry_size)
+
+    assert removed == [entries[0], entries[2]]
+    assert entries[1].exists()
+    logger.info("Test for cache eviction successful")
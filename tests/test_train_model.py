@@ -0,0 +1,121 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src import train_model as tm
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for features and labels
+@pytest.fixture
+def features():
+    """
+    Fixture for a feature frame with a non-default index and labels.
+    """
+    logger.debug("Creating features fixture")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"a": rng.normal(size=50), "b": rng.normal(size=50)}, index=np.arange(100, 150))
+    return data, pd.Series((data["a"] > 0).astype(int), name="class")
+
+# Test that the hyperparameters and cores reach the estimator
+def test_train_model_hyperparameters(features, caplog, monkeypatch):
+    """
+    Test that n_jobs and extra hyperparameters are passed to the forest, also without a depth limit.
+    """
+    logger.debug("Running test for train_model hyperparameters")
+    data, target = features
+    # Loading the test logging config disables the module logger imported before it
+    module_logger = logging.getLogger("src.train_model")
+    monkeypatch.setattr(module_logger, "disabled", False)
+    monkeypatch.setattr(module_logger, "level", logging.DEBUG)
+    module_logger.addHandler(caplog.handler)
+    try:
+        model = tm.train_model(data, target, ["a", "b"], n_estimators=3, max_depth=None, n_jobs=2,
+                               min_samples_leaf=4, random_state=0)
+    finally:
+        module_logger.removeHandler(caplog.handler)
+
+    params = model.get_params()
+    assert (params["n_estimators"], params["max_depth"], params["n_jobs"]) == (3, None, 2)
+    assert (params["min_samples_leaf"], params["random_state"]) == (4, 0)
+    assert "Fitting trees on 2 core(s)." in caplog.text
+    assert "max_depth: None." in caplog.text
+    assert not any(record.levelno >= logging.ERROR for record in caplog.records)
+    logger.info("Test for train_model hyperparameters successful")
+
+# Test that the memory-mapped split partitions the rows and is read back as views
+def test_memmap_split_round_trip(features, tmp_path):
+    """
+    Test that train and test partition the original rows and are views of the memory-mapped file.
+    """
+    logger.debug("Running test for write_split and open_split")
+    data, target = features
+    metadata = tm.write_split(data, target, tmp_path / "split", test_size=0.4, random_state=0)
+    X_train, X_test, y_train, y_test = tm.open_split(tmp_path / "split")
+
+    assert (metadata["n_train"], metadata["n_test"]) == (30, 20)
+    assert sorted(X_train.index.tolist() + X_test.index.tolist()) == data.index.tolist()
+    # Each row keeps its values and label
+    pd.testing.assert_frame_equal(X_test, data.loc[X_test.index].astype("float32"))
+    pd.testing.assert_series_equal(y_train, target.loc[y_train.index])
+    # The rows are read-only views of the memory-mapped file, not copies
+    assert not X_train.to_numpy().flags.writeable
+    logger.info("Test for write_split and open_split successful")
+
+# Test that a saved model is loaded memory-mapped and checked against its metadata
+def test_save_and_load_model(features, tmp_path):
+    """
+    Test that save_model writes a metadata file and load_model restores and verifies the model.
+    """
+    logger.debug("Running test for save_model and load_model")
+    data, target = features
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(data, target)
+    model_path = tmp_path / "model.pkl"
+
+    metadata = tm.save_model(model, model_path, compress=0, features=["a", "b"])
+    loaded = tm.load_model(model_path, verify=True)
+
+    assert metadata["features"] == ["a", "b"]
+    assert metadata["classes"] == [0, 1]
+    assert metadata["n_estimators"] == 3
+    np.testing.assert_array_equal(loaded.predict_proba(data), model.predict_proba(data))
+
+    # A model file that does not match its metadata is rejected
+    with open(model_path, "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ValueError, match="SHA-256"):
+        tm.load_model(model_path, verify=True)
+    logger.info("Test for save_model and load_model successful")
+
+# Test that out-of-core training streams a class-sorted file into a full forest and a holdout file
+def test_train_model_out_of_core(tmp_path):
+    """
+    Test that every row is either held out or used for training and the forest separates the classes.
+    """
+    logger.debug("Running test for train_model_out_of_core")
+    rng = np.random.default_rng(0)
+    n_rows = 2000
+    data = pd.DataFrame({"a": rng.normal(size=n_rows), "b": rng.normal(size=n_rows)})
+    data["class"] = (data["a"] > 0).astype(int)
+    # Rows sorted by class, as create_dataset writes them
+    data.sort_values("class").to_csv(tmp_path / "features.csv", index=False)
+
+    model = tm.train_model_out_of_core([tmp_path / "features.csv"], ["a", "b"], n_estimators=5, trees_per_batch=2,
+                                       sample_rows=300, chunk_size=250, test_size=0.25, random_state=0,
+                                       holdout_path=tmp_path / "holdout.csv")
+    holdout = pd.read_csv(tmp_path / "holdout.csv")
+
+    assert len(model.estimators_) == 5
+    expected = tm.holdout_mask(np.arange(n_rows), 0.25, 0)
+    assert len(holdout) == expected.sum()
+    assert (model.predict(holdout[["a", "b"]]) == holdout["class"]).mean() > 0.95
+    # The holdout assignment does not depend on the chunking
+    np.testing.assert_array_equal(np.concatenate([tm.holdout_mask(np.arange(i, i + 500), 0.25, 0)
+                                                  for i in range(0, n_rows, 500)]), expected)
+    logger.info("Test for train_model_out_of_core successful")
@@ -0,0 +1,56 @@
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from src import tune_model as tune
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for a training set
+@pytest.fixture
+def training_data():
+    """
+    Fixture for a small separable training set.
+    """
+    logger.debug("Creating training data fixture")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=200), "b": rng.normal(size=200), "unused": 0.0})
+    y = pd.Series((X["a"] + 0.1 * X["b"] > 0).astype(int), name="class")
+    return X, y
+
+# Test that the search ranks every candidate and writes a leaderboard
+@pytest.mark.parametrize("search", ["grid", "random", "halving"])
+def test_tune_model_leaderboard(training_data, search, tmp_path):
+    """
+    Test that each search type ranks its candidates and the leaderboard is saved.
+    """
+    logger.debug("Running test for tune_model with %s search", search)
+    X, y = training_data
+    param_grid = {"n_estimators": [5, 10], "max_depth": [1, 4]}
+    searcher = tune.tune_model(X, y, ["a", "b"], param_grid, search=search, cv=3, n_iter=3, factor=2,
+                               n_jobs=2, random_state=0, work_dir=tmp_path)
+    board = tune.leaderboard(searcher)
+    tune.save_leaderboard(board, tmp_path / "leaderboard.csv")
+
+    assert board.loc[0, "mean_test_score"] == pytest.approx(searcher.best_score_)
+    assert set(param_grid) <= set(board.columns)
+    assert len(pd.read_csv(tmp_path / "leaderboard.csv")) == len(board)
+    # The memory-mapped copy of the training matrix is removed afterwards
+    assert not list(tmp_path.glob("*/X_train.npy"))
+    logger.info("Test for tune_model with %s search successful", search)
+
+# Test that unknown search types are rejected
+def test_tune_model_rejects_unknown_search(training_data):
+    """
+    Test that an unsupported search type raises ValueError.
+    """
+    logger.debug("Running test for tune_model with an unknown search")
+    X, y = training_data
+    with pytest.raises(ValueError):
+        tune.tune_model(X, y, ["a", "b"], {"max_depth": [1]}, search="bayes")
+    logger.info("Test for tune_model with an unknown search successful")
@@ -0,0 +1,102 @@
+import logging
+import logging.config
+from unittest import mock
+import boto3
+import pytest
+from moto import mock_aws
+from src import aws_utils as aws
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+BUCKET = "test-bucket"
+
+# Fixture for a mocked S3 bucket
+@pytest.fixture
+def s3(monkeypatch):
+    """
+    Fixture for an S3 client backed by moto.
+    """
+    logger.debug("Creating mocked S3 fixture")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+# Fixture for an artifacts directory
+@pytest.fixture
+def artifacts(tmp_path):
+    """
+    Fixture for an artifacts directory with a small file, a nested figure and a multipart-sized file.
+    """
+    logger.debug("Creating artifacts fixture")
+    (tmp_path / "figures").mkdir()
+    (tmp_path / "metrics.yaml").write_text("auc: 0.9\n")
+    (tmp_path / "figures" / "IR_range.png").write_bytes(b"png" * 100)
+    (tmp_path / "X_train.csv").write_bytes(b"1,2,3\n" * (1024 * 1024))
+    return tmp_path
+
+# Fixture for the upload configuration
+@pytest.fixture
+def aws_config():
+    """
+    Fixture for the aws section of the configuration.
+    """
+    return {"bucket_name": BUCKET, "prefix": "runs", "max_workers": 4, "multipart_chunksize_mb": 5}
+
+# Test uploading all artifacts
+def test_upload_artifacts(s3, artifacts, aws_config):
+    """
+    Test that every file is uploaded under the timestamped prefix.
+    """
+    logger.debug("Running test for upload_artifacts")
+    uris = aws.upload_artifacts(artifacts, aws_config, 123)
+
+    keys = sorted(obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET)["Contents"])
+    assert keys == ["runs/123/X_train.csv", "runs/123/figures/IR_range.png", "runs/123/metrics.yaml"]
+    assert sorted(uris) == [f"s3://{BUCKET}/{key}" for key in keys]
+    body = s3.get_object(Bucket=BUCKET, Key="runs/123/X_train.csv")["Body"].read()
+    assert body == (artifacts / "X_train.csv").read_bytes()
+    logger.info("Test for upload_artifacts successful")
+
+# Test that unchanged files are skipped on a second sync
+def test_upload_artifacts_skips_unchanged(s3, artifacts, aws_config):
+    """
+    Test that a new prefix hashes no file and only changed files are uploaded again.
+    """
+    logger.debug("Running test for incremental upload")
+    with mock.patch.object(aws, "local_etag", wraps=aws.local_etag) as hashed:
+        aws.upload_artifacts(artifacts, aws_config, 123)
+    assert hashed.call_count == 0
+    (artifacts / "metrics.yaml").write_text("auc: 0.95\n")
+
+    uploaded = []
+    aws_upload_file = aws.upload_file
+
+    def upload_file(s3_client, file_path, *args, **kwargs):
+        if aws_upload_file(s3_client, file_path, *args, **kwargs):
+            uploaded.append(file_path.name)
+            return True
+        return False
+
+    with mock.patch.object(aws, "upload_file", upload_file):
+        aws.upload_artifacts(artifacts, aws_config, 123)
+
+    assert uploaded == ["metrics.yaml"]
+    logger.info("Test for incremental upload successful")
+
+# Unhappy path test for a missing bucket name
+def test_upload_artifacts_missing_bucket(s3, artifacts):
+    """
+    Test that a missing bucket name raises a ValueError.
+    """
+    logger.debug("Running unhappy path test for upload_artifacts")
+    with pytest.raises(ValueError):
+        aws.upload_artifacts(artifacts, {"prefix": "runs"}, 123)
+    logger.info("Unhappy path test for upload_artifacts successful")
@@ -0,0 +1,113 @@
+import json
+import logging
+import logging.config
+import numpy as np
+import pandas as pd
+import pytest
+from src import generate_features as gf
+from src import validate_data as vd
+
+# Load logging configuration from file
+logging.config.fileConfig("config/logging_test.conf")
+
+# Set up logging for testing
+logger = logging.getLogger(__name__)
+
+# Fixture for sample data and its feature plan
+@pytest.fixture
+def sample_plan():
+    """
+    Fixture for sample data and a plan with a normalized range and a log transform.
+    """
+    logger.debug("Creating sample plan fixture")
+    data = pd.DataFrame({
+        "C_min": [10.0, 11.0, 12.0, 13.0],
+        "C_max": [13.0, 14.0, 15.0, 16.0],
+        "C_mean": [16.0, 17.0, 18.0, 19.0],
+        "D": [5, 3, 9, 1],
+        "label": ["a", "b", "a", "b"],
+    })
+    plan = gf.compile_feature_plan({"calculate_norm_range": ["C"], "log_transform": ["D"]}, list(data.columns))
+    return data, plan
+
+# Test that the checks follow the feature plan
+def test_checks_from_plan(sample_plan):
+    """
+    Test that normalized ranges and log transforms map to their checks.
+    """
+    logger.debug("Running test for checks_from_plan")
+    _, plan = sample_plan
+    checks = vd.checks_from_plan(plan)
+    assert checks["not_null"] == ["C_min", "C_max", "C_mean"]
+    assert checks["nonzero"] == ["C_mean"]
+    assert checks["positive"] == ["D"]
+    assert "label" not in checks["required"]
+
+# Test that clean data passes in chunks
+def test_validate_dataset_passes(sample_plan, tmp_path):
+    """
+    Test that valid data passes and the report holds the column statistics.
+    """
+    logger.debug("Running test for validate_dataset with valid data")
+    data, plan = sample_plan
+    report = vd.validate_dataset(data, ranges={"D": [0, 10]}, chunk_rows=3, **vd.checks_from_plan(plan))
+    assert report["passed"] and report["rows"] == 4
+    assert report["columns"]["D"] == {"dtype": "int64", "nulls": 0, "min": 1.0, "max": 9.0,
+                                      "out_of_range": 0, "nonpositive": 0}
+    vd.save_report(report, tmp_path / "data_quality.json")
+    with open(tmp_path / "data_quality.json") as f:
+        assert json.load(f) == report
+    vd.enforce(report)
+
+# Test that every failed check is reported at once
+def test_validate_dataset_errors(sample_plan):
+    """
+    Test that missing, non-numeric, null, zero, nonpositive and out-of-range values are all reported.
+    """
+    logger.debug("Running test for validate_dataset with invalid data")
+    data, plan = sample_plan
+    data.loc[0, "C_min"] = np.nan
+    data.loc[1, "C_mean"] = 0
+    data.loc[2, "D"] = -1
+    report = vd.validate_dataset(data.drop(columns="C_max"), required=plan.input_columns + ["label"],
+                                 ranges={"C_mean": [None, 18]}, chunk_rows=2, **{
+                                     name: columns for name, columns in vd.checks_from_plan(plan).items()
+                                     if name != "required"})
+    assert not report["passed"]
+    assert report["errors"] == [
+        "Column 'C_max' is missing.",
+        f"Column 'label' has non-numeric dtype {data['label'].dtype}.",
+        "Column 'C_min' has 1 missing values.",
+        "Column 'C_mean' has 1 values outside [None, 18].",
+        "Column 'C_mean' has 1 zero values.",
+        "Column 'D' has 1 values that are not positive.",
+    ]
+    assert report["columns"]["C_min"]["min"] == 11.0
+    with pytest.raises(ValueError, match="Data validation failed"):
+        vd.enforce(report)
+    vd.enforce(report, on_error="warn")
+
+# Test that checked data skips the scans of generate_features
+def test_generate_features_checked(sample_plan):
+    """
+    Test that features of validated data match those of unvalidated data.
+    """
+    logger.debug("Running test for generate_features with checked data")
+    data, _ = sample_plan
+    feature_config = {"calculate_norm_range": ["C"], "log_transform": ["D"]}
+    numeric = data.drop(columns="label")
+    pd.testing.assert_frame_equal(gf.generate_features(numeric, feature_config, checked=True),
+                                  gf.generate_features(numeric, feature_config))
+
+# Test that normalized ranges over derived columns are still scanned
+def test_generate_features_checked_derived_sources():
+    """
+    Test that a zero mean produced by an earlier step raises even for checked data.
+    """
+    logger.debug("Running test for generate_features with checked data and derived sources")
+    data = pd.DataFrame({"IR_min": [1.0, 2.0], "IR_max": [3.0, 4.0], "IR_mean": [1.0, 3.0]})
+    feature_config = {"log_transform": ["IR_min", "IR_max", "IR_mean"], "calculate_norm_range": ["log_IR"]}
+    plan = gf.compile_feature_plan(feature_config, list(data.columns))
+    assert vd.validate_for_features(data, plan)["passed"]
+    with pytest.raises(ValueError, match="log_IR_mean"):
+        gf.generate_features(data, feature_config, checked=True)